@@ -4,55 +4,24 @@ XML'e Desi bilgisi ekleme scripti.
 Tüm ürünlere Desi = 2 değeri ekler.
 """
 
-import xml.etree.ElementTree as ET
+from feed_rules import apply_rules
+import xml_backend
+from xml_backend import Path
 
-def add_desi_to_xml(input_file, output_file, desi_value="2"):
-    """XML'e Desi alanını ekler"""
-
-    # XML'i yükle
-    tree = ET.parse(input_file)
-    root = tree.getroot()
-
-    product_count = 0
+# Doğrulama sorguları bir kez derlenir (lxml varsa XPath)
+ALL_PRODUCTS = Path.compile('.//Product')
+PRODUCTS_WITH_DESI = Path.compile('.//Product[Desi]')
 
-    # Her ürün için Desi alanı ekle
-    for product in root.findall('.//Product'):
-        product_count += 1
-
-        # Desi elementini kontrol et, yoksa ekle
-        desi_elem = product.find('Desi')
-        if desi_elem is None:
-            # Volume'dan sonra Desi ekle
-            volume_elem = product.find('Volume')
-            if volume_elem is not None:
-                # Volume'dan sonra ekle
-                idx = list(product).index(volume_elem)
-                desi_elem = ET.Element('Desi')
-                desi_elem.text = desi_value
-                product.insert(idx + 1, desi_elem)
-            else:
-                # Volume yoksa Brand'dan önce ekle
-                brand_elem = product.find('Brand')
-                if brand_elem is not None:
-                    idx = list(product).index(brand_elem)
-                    desi_elem = ET.Element('Desi')
-                    desi_elem.text = desi_value
-                    product.insert(idx, desi_elem)
-                else:
-                    # Hiçbiri yoksa en sona ekle
-                    desi_elem = ET.SubElement(product, 'Desi')
-                    desi_elem.text = desi_value
-
-        if product_count <= 3:
-            pc = product.findtext('ProductCode', 'N/A')
-            current_desi = product.findtext('Desi', 'N/A')
-            print(f"Ürün {pc}: Desi = {current_desi}")
+def add_desi_to_xml(input_file, output_file, desi_value="2"):
+    """XML'e Desi alanını ekler (feed_rules ile tek geçiş)"""
 
-    # XML'i kaydet
-    ET.indent(root, space='  ', level=0)
-    tree.write(output_file, encoding='utf-8', xml_declaration=True)
+    # Volume'dan sonra, Volume yoksa Brand'dan önce, hiçbiri yoksa en sona
+    rules = [{"op": "insert_after", "field": "Desi", "value": desi_value,
+              "after": ["Volume"], "before": ["Brand"]}]
+    plan = apply_rules(input_file, output_file, rules)
 
-    print(f"\n✅ {product_count} ürüne Desi = {desi_value} eklendi")
+    product_count = plan.stats["__products__"]
+    print(f"\n✅ {product_count} ürüne Desi = {desi_value} eklendi ({plan.stats['insert_after:Desi']} yeni)")
     print(f"💾 Dosya kaydedildi: {output_file}")
 
 def main():
@@ -66,11 +35,11 @@ def main():
 
     print("\n🔍 Doğrulama yapılıyor...")
     # Doğrulama
-    tree = ET.parse(output_file)
+    tree = xml_backend.parse(output_file)
     root = tree.getroot()
 
-    total_products = len(root.findall('.//Product'))
-    products_with_desi = len(root.findall('.//Product[Desi]'))
+    total_products = ALL_PRODUCTS.count(root)
+    products_with_desi = PRODUCTS_WITH_DESI.count(root)
 
     print(f"📊 Toplam ürün: {total_products}")
     print(f"✅ Desi alanı olan ürün: {products_with_desi}")
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+
+"""
+GTIN/EAN barkod doğrulama ve snapshot'lar arası kalıcı barkod indeksi.
+
+validate_final_xml.is_ean13 sadece 13 hane olup olmadığına bakıyordu; kontrol
+hanesi (check digit) hiç doğrulanmıyordu. Tekrar kontrolü de çalıştırma başına
+bir set ile yapıldığı için geçen haftaki yüklemede kullanılmış bir barkodun
+başka bir ürüne verilmesi fark edilmiyordu.
+
+Bu modül:
+  - GS1 kontrol hanesini (GTIN-8/12/13/14) ve GS1 önek sınıfını doğrular,
+  - doğrulamayı feed'deki bütün kodlar üzerinde toplu (sütun bazlı) yapar,
+  - yayınlanan her barkodu sahibi (ürün/varyant) ile birlikte SQLite
+    indeksinde saklar ve hem feed içi hem önceki snapshot'larla çakışmaları
+    tek sorguda bulur.
+
+Kullanım:
+  python barcode_index.py check [feed.xml]
+  python barcode_index.py publish [feed.xml] [snapshot_adı]
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import sys
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from feed_stream import PROJECTIONS, iter_products
+
+FINAL_XML = "stokmont_final_sdstep_titles_buyingprice_barcode_pretty.xml"
+INDEX_DB = "barcode_index.sqlite"
+
+GTIN_LENGTHS = (8, 12, 13, 14)
+
+# GTIN-13 ilk üç hanesine göre özel GS1 önek aralıkları; listede olmayanlar
+# ülke/üye kuruluş önekleridir ("gs1")
+PREFIX_CLASSES: List[Tuple[int, int, str]] = [
+    (20, 29, "restricted"),    # mağaza içi / sınırlı dolaşım
+    (40, 49, "restricted"),
+    (50, 59, "coupon"),
+    (140, 199, "unassigned"),
+    (200, 299, "restricted"),
+    (977, 977, "issn"),
+    (978, 979, "isbn"),
+    (980, 980, "refund"),
+    (981, 984, "coupon"),
+    (990, 999, "coupon"),
+]
+
+# Yayın için kabul edilen sınıflar; mağaza barkodları (25xxxx) "restricted"
+DEFAULT_ALLOWED = ("gs1", "restricted")
+
+_CLASS_BY_PREFIX: Dict[str, str] = {}
+for _lo, _hi, _cls in PREFIX_CLASSES:
+    for _p in range(_lo, _hi + 1):
+        _CLASS_BY_PREFIX[f"{_p:03d}"] = _cls
+
+# Sütun bazlı toplu hesap için hane -> ağırlıklı değer tabloları
+_WEIGHTED = {w: {str(d): d * w for d in range(10)} for w in (1, 3)}
+
+
+def gtin_check_digit(body: str) -> int:
+    """Kontrol hanesi hariç gövde için GS1 kontrol hanesi (sağdan 3,1,3,... ağırlık)."""
+    total = 0
+    for i, ch in enumerate(reversed(body)):
+        total += int(ch) * (3 if i % 2 == 0 else 1)
+    return (10 - total % 10) % 10
+
+
+def is_valid_gtin(code: str, lengths: Sequence[int] = GTIN_LENGTHS) -> bool:
+    code = (code or "").strip()
+    if len(code) not in lengths or not code.isdigit():
+        return False
+    return gtin_check_digit(code[:-1]) == int(code[-1])
+
+
+def prefix_class(code: str) -> str:
+    """GS1 önek sınıfı; GTIN-12/14 GTIN-13'e normalize edilerek bakılır."""
+    if len(code) == 8:
+        # GTIN-8'de 0 ve 2 ile başlayanlar sınırlı dolaşım (RCN-8)
+        return "restricted" if code[0] in "02" else "gs1"
+    normalized = code.rjust(14, "0")[1:]
+    return _CLASS_BY_PREFIX.get(normalized[:3], "gs1")
+
+
+def validate_batch(codes: Sequence[str], allowed: Sequence[str] = DEFAULT_ALLOWED,
+                   lengths: Sequence[int] = GTIN_LENGTHS) -> List[Optional[str]]:
+    """Kod listesini toplu doğrular; her kod için hata nedeni ya da None döner.
+
+    Aynı uzunluktaki kodlar gruplanır ve kontrol hanesi sütun sütun hesaplanır
+    (her sütun için tek bir map/zip), kod başına Python döngüsü kurulmaz.
+    """
+    allowed = frozenset(allowed)
+    results: List[Optional[str]] = [None] * len(codes)
+    groups: Dict[int, List[int]] = {}
+    for i, code in enumerate(codes):
+        if not code or not code.isdigit():
+            results[i] = "sayısal değil"
+        elif len(code) not in lengths:
+            results[i] = f"geçersiz uzunluk ({len(code)})"
+        else:
+            groups.setdefault(len(code), []).append(i)
+
+    for length, positions in groups.items():
+        group = [codes[i] for i in positions]
+        columns = list(zip(*group))
+        totals = [0] * len(group)
+        # Kontrol hanesinin solundaki hane ağırlık 3 ile başlar
+        for offset, column in enumerate(reversed(columns[:-1])):
+            table = _WEIGHTED[3 if offset % 2 == 0 else 1]
+            totals = list(map(int.__add__, totals, map(table.__getitem__, column)))
+        expected = [str((10 - t % 10) % 10) for t in totals]
+        for pos, code, exp, actual in zip(positions, group, expected, columns[-1]):
+            if exp != actual:
+                results[pos] = f"kontrol hanesi hatalı (beklenen {exp})"
+            else:
+                cls = prefix_class(code)
+                if cls not in allowed:
+                    results[pos] = f"GS1 önek sınıfı uygun değil: {cls}"
+    return results
+
+
+def collect_barcodes(products: Iterable[ET.Element]) -> List[Tuple[str, str]]:
+    """Feed'deki (barkod, sahip) çiftleri.
+
+    Sahip anahtarı ürün için ProductCode, varyant için
+    ProductCode/VariantCode/varyant değeri(ya da sırası)'dır.
+    """
+    pairs: List[Tuple[str, str]] = []
+    for product in products:
+        pc = (product.findtext("ProductCode") or "").strip()
+        barcode = (product.findtext("Barcode") or "").strip()
+        if barcode:
+            pairs.append((barcode, pc))
+        for n, variant in enumerate(product.iterfind("Variants/Variant"), 1):
+            vbarcode = (variant.findtext("Barcode") or "").strip()
+            if not vbarcode:
+                continue
+            vcode = (variant.findtext("VariantCode") or "").strip()
+            value = (variant.findtext("VariantValue1") or variant.findtext("VariantValue") or str(n)).strip()
+            pairs.append((vbarcode, f"{pc}/{vcode}/{value}"))
+    return pairs
+
+
+class BarcodeIndex:
+    """Yayınlanmış bütün barkodların kalıcı (SQLite) indeksi."""
+
+    def __init__(self, path: str = INDEX_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS barcodes (
+                code TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                first_snapshot TEXT NOT NULL,
+                last_snapshot TEXT NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS snapshots (
+                name TEXT PRIMARY KEY,
+                created TEXT NOT NULL,
+                barcode_count INTEGER NOT NULL
+            );
+            """
+        )
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "BarcodeIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _load_batch(self, pairs: Sequence[Tuple[str, str]]) -> None:
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch (code TEXT, owner TEXT)")
+        self.conn.execute("DELETE FROM batch")
+        self.conn.executemany("INSERT INTO batch VALUES (?, ?)", pairs)
+
+    def check(self, pairs: Sequence[Tuple[str, str]]) -> Dict[str, List]:
+        """Feed içi ve snapshot'lar arası çakışmaları döndürür.
+
+        internal: aynı barkod feed içinde birden fazla sahipte
+        history:  barkod daha önce başka bir sahip adına yayınlanmış
+        """
+        internal: Dict[str, List[str]] = {}
+        seen: Dict[str, str] = {}
+        for code, owner in pairs:
+            first = seen.setdefault(code, owner)
+            if first != owner:
+                internal.setdefault(code, [first]).append(owner)
+
+        self._load_batch(pairs)
+        history = self.conn.execute(
+            """
+            SELECT b.code, b.owner, i.owner, i.last_snapshot
+            FROM batch b JOIN barcodes i ON i.code = b.code
+            WHERE i.owner != b.owner
+            """
+        ).fetchall()
+        return {"internal": sorted(internal.items()), "history": history}
+
+    def publish(self, pairs: Sequence[Tuple[str, str]], snapshot: str) -> int:
+        """Feed'i snapshot olarak kaydeder; yeni eklenen barkod sayısını döner.
+
+        Önceden başka sahibe ait barkodların sahibi değiştirilmez; bunlar
+        check() ile raporlanmalıdır.
+        """
+        before = self.conn.execute("SELECT COUNT(*) FROM barcodes").fetchone()[0]
+        with self.conn:
+            self._load_batch(pairs)
+            self.conn.execute(
+                """
+                INSERT INTO barcodes (code, owner, first_snapshot, last_snapshot)
+                SELECT code, owner, ?, ? FROM batch WHERE true
+                ON CONFLICT(code) DO UPDATE SET last_snapshot = excluded.last_snapshot
+                WHERE barcodes.owner = excluded.owner
+                """,
+                (snapshot, snapshot),
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)",
+                (snapshot, datetime.now().isoformat(timespec="seconds"), len(pairs)),
+            )
+        after = self.conn.execute("SELECT COUNT(*) FROM barcodes").fetchone()[0]
+        return after - before
+
+    def owner_of(self, code: str) -> Optional[Tuple[str, str]]:
+        row = self.conn.execute(
+            "SELECT owner, last_snapshot FROM barcodes WHERE code = ?", (code,)
+        ).fetchone()
+        return tuple(row) if row else None
+
+
+def check_feed(path: str, index_path: str = INDEX_DB) -> Tuple[List[str], int]:
+    """Feed'deki barkodları doğrular; (hata mesajları, barkod sayısı) döner."""
+    pairs = collect_barcodes(iter_products(path, fields=PROJECTIONS["barcodes"]))
+    errors: List[str] = []
+    for (code, owner), reason in zip(pairs, validate_batch([c for c, _ in pairs])):
+        if reason:
+            errors.append(f"Barkod geçersiz: {code} ({reason}) - {owner}")
+    with BarcodeIndex(index_path) as index:
+        conflicts = index.check(pairs)
+    for code, owners in conflicts["internal"]:
+        errors.append(f"Barkod tekrar ediyor: {code} - {', '.join(owners)}")
+    for code, owner, old_owner, snapshot in conflicts["history"]:
+        errors.append(f"Barkod daha önce başka ürüne verilmiş: {code} - {owner} (önceki: {old_owner}, snapshot {snapshot})")
+    return errors, len(pairs)
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("check", "publish"):
+        print("Kullanım: python barcode_index.py check|publish [feed.xml] [snapshot_adı]")
+        sys.exit(2)
+    command = sys.argv[1]
+    path = sys.argv[2] if len(sys.argv) >= 3 else FINAL_XML
+
+    if command == "check":
+        started = time.perf_counter()
+        errors, count = check_feed(path)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"📊 {count} barkod kontrol edildi ({elapsed:.1f} ms)")
+        for e in errors:
+            print(e)
+        if errors:
+            print(f"HATA! {len(errors)} problem bulundu.")
+            sys.exit(1)
+        print("✅ Tüm barkodlar geçerli ve çakışmasız.")
+        return
+
+    snapshot = sys.argv[3] if len(sys.argv) >= 4 else datetime.now().strftime("%Y%m%d-%H%M%S")
+    pairs = collect_barcodes(iter_products(path, fields=PROJECTIONS["barcodes"]))
+    with BarcodeIndex() as index:
+        added = index.publish(pairs, snapshot)
+    print(f"💾 Snapshot {snapshot}: {len(pairs)} barkod, {added} yeni ({os.path.abspath(INDEX_DB)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+
+"""
+Yerel katalog sorgu servisi (HTTP, sadece standart kütüphane).
+
+Destek ekibinin "SD-500-BEYAZ 40 numaranın stoğu, fiyatı, barkodu ne?"
+sorusu için pretty XML'de grep yapmak yerine: servis son yayınlanan snapshot'ı
+(snapshot_store, CURRENT) ya da verilen feed dosyasını belleğe yükler ve
+ProductCode, VariantCode, barkod ve GTIN için sözlük indeksleri kurar.
+
+  GET  /product/<kod>[?variant=40]   ürün (istenirse tek varyant)
+  GET  /variant/<VariantCode>        varyant(lar) ve ürün kodu
+  GET  /barcode/<barkod>             Barcode/Gtin/VariantGtin ile ürün/varyant
+  GET  /lookup?q=<değer>             kod, varyant kodu ya da barkod
+  POST /lookup                       {"queries": ["...", ...]} toplu sorgu
+  POST /reload                       kaynağı hemen yeniden kontrol et
+  GET  /metrics                      Prometheus metin biçiminde sayaçlar
+  GET  /health
+
+Arka plandaki izleyici CURRENT'ı (ya da feed dosyasının mtime'ını) yoklar;
+yeni snapshot yayınlanınca yeni indeks ayrı kurulur ve tek bir referans
+atamasıyla devreye alınır. Sorgular o anki indeks nesnesini bir kez alıp
+onunla çalıştığı için yarım yüklenmiş bir indeks hiç görülmez.
+
+Kullanım: python catalog_service.py [port] [feed.xml]
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from feed_records import ProductRecord, iter_records
+
+PORT = 8765
+POLL_SECONDS = 5.0
+# catalog_requests_total route etiketleri
+ROUTES = frozenset(("root", "metrics", "health", "product", "variant", "barcode", "lookup", "post:reload", "post:lookup"))
+PRODUCT_BARCODE_FIELDS = ("Barcode", "Gtin")
+VARIANT_BARCODE_FIELDS = ("Barcode", "VariantGtin", "Gtin")
+VARIANT_VALUE_FIELDS = ("VariantValue", "VariantValue1", "VariantValue2")
+# Yanıtlarda yer almayan uzun alanlar
+OMITTED_FIELDS = ("FullDescription", "Description")
+
+VariantRef = Tuple[str, Optional[int]]  # (ProductCode, varyant sırası ya da None)
+
+
+class CatalogIndex:
+    """Tek bir snapshot'ın değişmez bellek içi indeksleri."""
+
+    def __init__(self, records: Iterable[ProductRecord], name: str):
+        started = time.perf_counter()
+        self.name = name
+        self.products: Dict[str, ProductRecord] = {}
+        self.variant_codes: Dict[str, List[VariantRef]] = {}
+        self.barcodes: Dict[str, VariantRef] = {}
+        self.variant_count = 0
+        for record in records:
+            code = record.code
+            if not code:
+                continue
+            self.products[code] = record
+            for field in PRODUCT_BARCODE_FIELDS:
+                if record.fields.get(field):
+                    self.barcodes.setdefault(record.fields[field], (code, None))
+            for n, variant in enumerate(record.variants):
+                self.variant_count += 1
+                if variant.get("VariantCode"):
+                    self.variant_codes.setdefault(variant["VariantCode"], []).append((code, n))
+                for field in VARIANT_BARCODE_FIELDS:
+                    if variant.get(field):
+                        self.barcodes.setdefault(variant[field], (code, n))
+        self.loaded_at = time.time()
+        self.build_seconds = time.perf_counter() - started
+
+    @classmethod
+    def from_feed(cls, path: str) -> "CatalogIndex":
+        return cls(iter_records(path), os.path.basename(path))
+
+    @classmethod
+    def from_snapshot(cls, store, name: str) -> "CatalogIndex":
+        return cls((ProductRecord.from_element(p) for p in store.products(name)), name)
+
+    def _render(self, code: str, variant: Optional[int] = None) -> Dict:
+        record = self.products[code]
+        fields = {k: v for k, v in record.fields.items() if k not in OMITTED_FIELDS}
+        variants = record.variants if variant is None else [record.variants[variant]]
+        return {"code": code, "fields": fields, "variants": variants, "pictures": record.pictures}
+
+    def product(self, code: str, variant_value: Optional[str] = None) -> Optional[Dict]:
+        record = self.products.get(code)
+        if record is None:
+            return None
+        if variant_value is None:
+            return self._render(code)
+        for n, variant in enumerate(record.variants):
+            if variant_value in (variant.get(f) for f in VARIANT_VALUE_FIELDS):
+                return self._render(code, n)
+        return None
+
+    def variant(self, variant_code: str) -> List[Dict]:
+        return [self._render(code, n) for code, n in self.variant_codes.get(variant_code, [])]
+
+    def barcode(self, barcode: str) -> Optional[Dict]:
+        ref = self.barcodes.get(barcode)
+        return self._render(*ref) if ref else None
+
+    def lookup(self, query: str) -> Dict:
+        """Değeri sırayla ürün kodu, barkod ve varyant kodu olarak arar."""
+        if query in self.products:
+            return {"query": query, "match": "product", "results": [self._render(query)]}
+        found = self.barcode(query)
+        if found:
+            return {"query": query, "match": "barcode", "results": [found]}
+        variants = self.variant(query)
+        if variants:
+            return {"query": query, "match": "variant", "results": variants}
+        return {"query": query, "match": None, "results": []}
+
+
+class CatalogService:
+    """İndeksi yükleyen, yeni snapshot'ları izleyen ve sayaçları tutan servis."""
+
+    def __init__(self, store_dir: Optional[str] = None, feed: Optional[str] = None, poll: float = POLL_SECONDS):
+        if not store_dir and not feed:
+            raise ValueError("Snapshot deposu ya da feed dosyası gerekli")
+        self.store = None
+        if store_dir:
+            from snapshot_store import SnapshotStore
+
+            self.store = SnapshotStore(store_dir)
+        self.feed = feed
+        self.poll = poll
+        self.index: Optional[CatalogIndex] = None
+        self.version: Optional[str] = None
+        self.requests: Counter = Counter()
+        self.lookup_seconds = 0.0
+        self.lookups = 0
+        self.reloads = 0
+        self.reload_errors = 0
+        self._reload_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _source_version(self) -> Optional[str]:
+        if self.store is not None and self.store.current:
+            return f"snapshot:{self.store.current}"
+        if self.feed and os.path.exists(self.feed):
+            return f"feed:{os.stat(self.feed).st_mtime_ns}"
+        return None
+
+    def reload(self) -> bool:
+        """Kaynak değiştiyse yeni indeksi kurup devreye alır."""
+        with self._reload_lock:
+            version = self._source_version()
+            if version is None or version == self.version:
+                return False
+            try:
+                if version.startswith("snapshot:"):
+                    index = CatalogIndex.from_snapshot(self.store, version.split(":", 1)[1])
+                else:
+                    index = CatalogIndex.from_feed(self.feed)
+            except Exception:
+                # Bozuk/yarım yayın: eski indeks hizmet vermeye devam eder
+                self.reload_errors += 1
+                return False
+            self.index, self.version = index, version
+            self.reloads += 1
+            return True
+
+    def watch(self) -> threading.Thread:
+        def loop():
+            while not self._stop.wait(self.poll):
+                self.reload()
+
+        thread = threading.Thread(target=loop, name="catalog-watch", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def count_request(self, route: str) -> None:
+        """İstek sayacı; bilinmeyen yollar tek "other" etiketinde toplanır (istemci
+        yolundan sınırsız metrik serisi oluşmasın)."""
+        if route not in ROUTES:
+            route = "other"
+        with self._metrics_lock:
+            self.requests[route] += 1
+
+    def timed(self, func, *args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._metrics_lock:
+                self.lookup_seconds += elapsed
+                self.lookups += 1
+
+    def metrics(self) -> str:
+        index = self.index
+        with self._metrics_lock:
+            requests = sorted(self.requests.items())
+        lines = [
+            "# TYPE catalog_requests_total counter",
+            *(f'catalog_requests_total{{route="{route}"}} {count}' for route, count in requests),
+            "# TYPE catalog_lookups_total counter",
+            f"catalog_lookups_total {self.lookups}",
+            "# TYPE catalog_lookup_seconds_total counter",
+            f"catalog_lookup_seconds_total {self.lookup_seconds:.6f}",
+            "# TYPE catalog_reloads_total counter",
+            f"catalog_reloads_total {self.reloads}",
+            "# TYPE catalog_reload_errors_total counter",
+            f"catalog_reload_errors_total {self.reload_errors}",
+        ]
+        if index is not None:
+            lines += [
+                f'catalog_snapshot_info{{name="{index.name}"}} 1',
+                f"catalog_products {len(index.products)}",
+                f"catalog_variants {index.variant_count}",
+                f"catalog_barcodes {len(index.barcodes)}",
+                f"catalog_index_build_seconds {index.build_seconds:.6f}",
+                f"catalog_index_loaded_timestamp {index.loaded_at:.0f}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+class CatalogHandler(BaseHTTPRequestHandler):
+    service: CatalogService  # make_server içinde bağlanır
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, body, content_type: str = "application/json; charset=utf-8") -> None:
+        data = body.encode("utf-8") if isinstance(body, str) else json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        service = self.service
+        parts = urlsplit(self.path)
+        route, _, arg = parts.path.strip("/").partition("/")
+        arg = unquote(arg)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        service.count_request(route or "root")
+        if route == "metrics":
+            return self._send(200, service.metrics(), "text/plain; version=0.0.4")
+        index = service.index  # sorgu boyunca aynı indeks
+        if route == "health":
+            return self._send(200 if index else 503, {"ok": index is not None, "snapshot": index and index.name})
+        if index is None:
+            return self._send(503, {"error": "katalog yüklenmedi"})
+        if route == "product" and arg:
+            found = service.timed(index.product, arg, query.get("variant"))
+        elif route == "variant" and arg:
+            found = service.timed(index.variant, arg) or None
+        elif route == "barcode" and arg:
+            found = service.timed(index.barcode, arg)
+        elif route == "lookup" and "q" in query:
+            return self._send(200, service.timed(index.lookup, query["q"]))
+        else:
+            return self._send(404, {"error": "bilinmeyen yol"})
+        if found is None:
+            return self._send(404, {"error": "bulunamadı", "snapshot": index.name})
+        return self._send(200, {"snapshot": index.name, "result": found})
+
+    def do_POST(self) -> None:
+        service = self.service
+        route = urlsplit(self.path).path.strip("/")
+        service.count_request(f"post:{route}")
+        if route == "reload":
+            return self._send(200, {"reloaded": service.reload(), "version": service.version})
+        if route != "lookup":
+            return self._send(404, {"error": "bilinmeyen yol"})
+        index = service.index
+        if index is None:
+            return self._send(503, {"error": "katalog yüklenmedi"})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            queries = body["queries"] if isinstance(body, dict) else body
+            queries = [str(q) for q in queries]
+        except (ValueError, KeyError, TypeError):
+            return self._send(400, {"error": "gövde {\"queries\": [...]} olmalı"})
+        results = [service.timed(index.lookup, q) for q in queries]
+        return self._send(200, {"snapshot": index.name, "results": results})
+
+
+def make_server(service: CatalogService, host: str = "127.0.0.1", port: int = PORT) -> ThreadingHTTPServer:
+    handler = type("BoundCatalogHandler", (CatalogHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(store_dir: Optional[str], feed: Optional[str], host: str = "127.0.0.1", port: int = PORT,
+          poll: float = POLL_SECONDS) -> None:
+    service = CatalogService(store_dir, feed, poll)
+    service.reload()
+    if service.index is None:
+        print("⚠️  Henüz yüklenecek snapshot/feed yok; yayınlanınca yüklenecek")
+    else:
+        index = service.index
+        print(f"📚 {index.name}: {len(index.products)} ürün, {index.variant_count} varyant, "
+              f"{len(index.barcodes)} barkod ({index.build_seconds * 1000:.0f} ms)")
+    service.watch()
+    server = make_server(service, host, port)
+    print(f"🌐 http://{host}:{server.server_port}/ dinleniyor")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) >= 2 else PORT
+    feed = sys.argv[2] if len(sys.argv) >= 3 else None
+    serve(None if feed else "snapshots", feed, port=port)
+
+
+if __name__ == "__main__":
+    main()
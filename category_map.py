@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+
+"""
+Tedarikçi kategorilerini pazaryeri taksonomisine bulanık (fuzzy) eşleme.
+
+Wagoon CategoryPath değerleri ("Erkek Ayakkabı", "TERLİK") pazaryeri
+kategori ID'lerine elle eşleniyor; fix_categories sadece "/" ile bölüyor.
+Taksonomi dosyaları on binlerce düğüm içerebildiği için:
+
+  - taksonomi yerel dosyadan (CSV: id,name,parent_id ya da id,path; JSON:
+    düz liste ya da children ile iç içe) bir kez yüklenir
+  - düğüm adları Türkçe kurallarla katlanır (search_index.fold) ve karakter
+    trigram'larından ters indeks (trigram -> düğüm listesi) kurulur
+  - her farklı tedarikçi kategorisi bir kez puanlanır: sadece ortak trigram'ı
+    olan düğümler sayılır, Dice benzerliği ad için ve ata yolu için ayrı
+    hesaplanıp ağırlıklandırılır
+  - eşik ve ikinciye fark şartını geçen eşleme kabul edilir (accepted), diğerleri
+    öneri (suggested) olarak kalır; ikisi de SQLite'ta kalıcı saklanır ve
+    elle kabul/düzeltme yapılabilir
+  - ürünlere uygulama kabul edilmiş eşlemelerden kurulan sözlükle yapılır
+
+Kullanım:
+  python category_map.py map taksonomi.csv [feed.xml]
+  python category_map.py accept "TERLİK" 1234
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import sqlite3
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from feed_stream import iter_products
+from search_index import fold, terms
+
+SOURCE_XML = "wagoon_source_pretty.xml"
+MAP_DB = "category_map.sqlite"
+
+# Ürün içinde tedarikçi kategorisinin arandığı alanlar (kaynak, final)
+CATEGORY_FIELDS = ("Categories/CategoryPath", "Categories/CategoryName", "CategoryPath", "Category")
+TARGET_FIELD = "MarketplaceCategoryId"
+
+ACCEPT_SCORE = 0.55
+ACCEPT_MARGIN = 0.05
+NAME_WEIGHT = 0.75
+# Çok yaygın trigram'lar ("ler", " ka") aday sayısını şişirir; puana katılır ama aday üretmez
+MAX_POSTING_SHARE = 0.2
+
+
+class Node(NamedTuple):
+    id: str
+    name: str
+    path: str
+    leaf: bool
+
+
+class Candidate(NamedTuple):
+    node: Node
+    score: float
+
+
+def trigrams(text: str) -> Counter:
+    """Katlanmış kelimelerin " kelime " biçimindeki trigram'ları."""
+    grams: Counter = Counter()
+    for word in terms(text):
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _dice(a: Counter, b: Counter) -> float:
+    total = sum(a.values()) + sum(b.values())
+    return 2 * sum((a & b).values()) / total if total else 0.0
+
+
+def load_taxonomy(path: str) -> List[Node]:
+    """CSV (id,name,parent_id | id,path) ya da JSON taksonomi dosyası."""
+    rows: List[Tuple[str, str, Optional[str], Optional[str]]] = []  # id, name, parent, path
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+
+        def walk(items, parent):
+            for item in items:
+                node_id = str(item["id"])
+                rows.append((node_id, item["name"], parent if "parent_id" not in item else item["parent_id"], None))
+                walk(item.get("children", ()), node_id)
+
+        walk(data.get("categories", []) if isinstance(data, dict) else data, None)
+    else:
+        with open(path, encoding="utf-8", newline="") as fh:
+            for row in csv.DictReader(fh):
+                if row.get("path"):
+                    name = row["path"].replace(">", "/").rsplit("/", 1)[-1].strip()
+                    rows.append((row["id"].strip(), row.get("name") or name, None, row["path"]))
+                else:
+                    parent = (row.get("parent_id") or "").strip() or None
+                    rows.append((row["id"].strip(), row["name"].strip(), parent, None))
+
+    names = {node_id: name for node_id, name, _, _ in rows}
+    parents = {node_id: parent for node_id, _, parent, _ in rows}
+    has_children = {parent for parent in parents.values() if parent}
+    paths = []
+    for node_id, name, parent, path in rows:
+        if path is None:
+            chain = [name]
+            seen = {node_id}
+            while parent and parent in names and parent not in seen:
+                seen.add(parent)
+                chain.append(names[parent])
+                parent = parents[parent]
+            path = " > ".join(reversed(chain))
+        else:
+            path = " > ".join(part.strip() for part in path.replace("/", ">").split(">") if part.strip())
+        paths.append(path)
+    parent_paths = {path.rsplit(" > ", 1)[0] for path in paths if " > " in path}
+    nodes = [Node(node_id, name, path, node_id not in has_children and path not in parent_paths)
+             for (node_id, name, _, _), path in zip(rows, paths)]
+    return nodes
+
+
+class TaxonomyIndex:
+    """Düğüm adlarının trigram ters indeksi."""
+
+    def __init__(self, nodes: Iterable[Node], leaf_only: bool = True):
+        self.nodes: List[Node] = [n for n in nodes if n.leaf or not leaf_only]
+        self.name_grams: List[Counter] = [trigrams(n.name) for n in self.nodes]
+        self.path_grams: List[Counter] = [trigrams(n.path) for n in self.nodes]
+        self.postings: Dict[str, List[int]] = {}
+        for i, grams in enumerate(self.name_grams):
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(i)
+        self.max_postings = max(50, int(len(self.nodes) * MAX_POSTING_SHARE))
+
+    def candidates(self, category: str, limit: int = 5) -> List[Candidate]:
+        """Tedarikçi kategorisi için en iyi düğümler (puan 0..1)."""
+        parts = [p for p in category.replace(">", "/").split("/") if p.strip()]
+        if not parts:
+            return []
+        leaf = trigrams(parts[-1])
+        whole = trigrams(" ".join(parts))
+        hits: Counter = Counter()
+        for gram in leaf:
+            posting = self.postings.get(gram)
+            if posting is not None and len(posting) <= self.max_postings:
+                hits.update(posting)
+        # ortak trigram'ı en çok olan düğümler tam puanlanır
+        scored = []
+        for i, _ in hits.most_common(limit * 20):
+            score = NAME_WEIGHT * _dice(leaf, self.name_grams[i]) + (1 - NAME_WEIGHT) * _dice(whole, self.path_grams[i])
+            scored.append(Candidate(self.nodes[i], round(score, 4)))
+        scored.sort(key=lambda c: (-c.score, len(c.node.path), c.node.id))
+        return scored[:limit]
+
+
+class CategoryMap:
+    """Kalıcı tedarikçi kategorisi -> taksonomi düğümü eşlemeleri."""
+
+    def __init__(self, path: str = MAP_DB):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS mappings ("
+            " category TEXT PRIMARY KEY, node_id TEXT, node_path TEXT, score REAL,"
+            " status TEXT NOT NULL, updated TEXT) WITHOUT ROWID"
+        )
+        self.rows: Dict[str, Tuple[Optional[str], Optional[str], float, str]] = {
+            category: (node_id, node_path, score, status)
+            for category, node_id, node_path, score, status in self.conn.execute(
+                "SELECT category, node_id, node_path, score, status FROM mappings")
+        }
+
+    @staticmethod
+    def key(category: str) -> str:
+        return " / ".join(fold(p).strip() for p in category.replace(">", "/").split("/") if p.strip())
+
+    def accepted(self) -> Dict[str, str]:
+        """Ürünlere uygulanacak katlanmış kategori -> düğüm id sözlüğü."""
+        return {category: node_id for category, (node_id, _, _, status) in self.rows.items()
+                if status in ("accepted", "manual") and node_id}
+
+    def record(self, category: str, candidates: List[Candidate],
+               accept_score: float = ACCEPT_SCORE, margin: float = ACCEPT_MARGIN) -> Tuple[str, Optional[Candidate]]:
+        """Puanlanmış adaylardan kararı verir ve saklar; elle girilmiş eşlemeye dokunmaz."""
+        key = self.key(category)
+        existing = self.rows.get(key)
+        if existing is not None and existing[3] == "manual":
+            return "manual", None
+        best = candidates[0] if candidates else None
+        runner_up = candidates[1].score if len(candidates) > 1 else 0.0
+        if best is None:
+            status = "unmatched"
+        elif best.score >= accept_score and best.score - runner_up >= margin:
+            status = "accepted"
+        else:
+            status = "suggested"
+        row = (best.node.id if best else None, best.node.path if best else None, best.score if best else 0.0, status)
+        self.rows[key] = row
+        self.conn.execute("INSERT OR REPLACE INTO mappings VALUES (?, ?, ?, ?, ?, ?)",
+                          (key, *row, datetime.now().isoformat(timespec="seconds")))
+        return status, best
+
+    def set_manual(self, category: str, node_id: str, node_path: str = "") -> None:
+        key = self.key(category)
+        self.rows[key] = (node_id, node_path, 1.0, "manual")
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO mappings VALUES (?, ?, ?, 1.0, 'manual', ?)",
+                              (key, node_id, node_path, datetime.now().isoformat(timespec="seconds")))
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def product_category(product) -> str:
+    for field in CATEGORY_FIELDS:
+        text = (product.findtext(field) or "").strip()
+        if text:
+            return text
+    return ""
+
+
+def distinct_categories(source) -> Counter:
+    """Feed'deki farklı kategoriler ve ürün sayıları."""
+    return Counter(c for c in (product_category(p) for p in iter_products(source)) if c)
+
+
+def map_categories(categories: Iterable[str], index: TaxonomyIndex, mapping: CategoryMap,
+                   remap: bool = False) -> int:
+    """Her farklı kategoriyi bir kez puanlar; kayıtlı olanlar (remap=False) atlanır.
+
+    Puanlanan kategori sayısını döner; sonuçlar mapping.rows içindedir.
+    """
+    scored = 0
+    for category in categories:
+        stored = mapping.rows.get(mapping.key(category))
+        if stored is not None and not remap and stored[3] != "unmatched":
+            continue
+        mapping.record(category, index.candidates(category))
+        scored += 1
+    mapping.commit()
+    return scored
+
+
+def print_mappings(categories: Counter, mapping: CategoryMap) -> None:
+    for category, count in sorted(categories.items()):
+        node_id, node_path, score, status = mapping.rows[mapping.key(category)]
+        target = f"{node_id} {node_path} ({score:.2f})" if node_id else "-"
+        print(f"{STATUS_ICONS[status]} {category} [{count} ürün] → {target}")
+
+
+class CategoryMapStage:
+    """Pipeline aşaması: kabul edilmiş eşlemeyi ürüne yazar (sözlük araması)."""
+
+    def __init__(self, mapping: CategoryMap, field: str = TARGET_FIELD):
+        self.table = mapping.accepted()
+        self.field = field
+        self._keys: Dict[str, str] = {}
+        self.mapped = 0
+        self.missing: Counter = Counter()
+
+    def apply(self, product) -> bool:
+        category = product_category(product)
+        if not category:
+            return False
+        key = self._keys.get(category)
+        if key is None:
+            key = self._keys[category] = CategoryMap.key(category)
+        node_id = self.table.get(key)
+        if node_id is None:
+            self.missing[category] += 1
+            return False
+        elem = product.find(self.field)
+        if elem is None:
+            elem = product.makeelement(self.field, {})
+            product.append(elem)
+        if elem.text == node_id:
+            return False
+        elem.text = node_id
+        self.mapped += 1
+        return True
+
+
+STATUS_ICONS = {"accepted": "✅", "manual": "✍️ ", "suggested": "🤔", "unmatched": "❌"}
+
+
+def main():
+    if len(sys.argv) >= 4 and sys.argv[1] == "accept":
+        mapping = CategoryMap()
+        mapping.set_manual(sys.argv[2], sys.argv[3], sys.argv[4] if len(sys.argv) >= 5 else "")
+        print(f"✍️  {sys.argv[2]} → {sys.argv[3]}")
+        mapping.close()
+        return
+    if len(sys.argv) < 3 or sys.argv[1] != "map":
+        print('Kullanım: python category_map.py map taksonomi.csv [feed.xml] | accept "KATEGORİ" düğüm_id [yol]')
+        sys.exit(2)
+    started = time.perf_counter()
+    index = TaxonomyIndex(load_taxonomy(sys.argv[2]))
+    loaded = time.perf_counter() - started
+    categories = distinct_categories(sys.argv[3] if len(sys.argv) >= 4 else SOURCE_XML)
+    mapping = CategoryMap()
+    scored = map_categories(categories, index, mapping)
+    print(f"🗂️  {len(index.nodes)} düğüm indekslendi ({loaded:.2f} sn), {len(categories)} farklı kategori, "
+          f"{scored} puanlandı ({time.perf_counter() - started:.2f} sn)")
+    print_mappings(categories, mapping)
+    mapping.close()
+
+
+if __name__ == "__main__":
+    main()
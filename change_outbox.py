@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+
+"""
+Değişiklik olayları için kalıcı, sadece eklenen (append-only) JSONL outbox.
+
+ERP, raporlama ve kanal yükleyicileri stok/fiyat/içerik değişikliklerine
+tepki vermek için bütün XML'leri kendileri karşılaştırmak zorunda kalmasın
+diye feed_diff sonuçları tipli olaylar olarak outbox'a eklenir:
+
+  product_added, product_removed, stock_changed, price_changed,
+  category_changed, content_changed
+
+Yerleşim:
+
+  outbox/segments/00000000000000000001.jsonl   adı segmentin ilk offset'i;
+                                               her satır bir olay
+  outbox/cursors/<tüketici>                    tüketicinin okuyacağı sıradaki offset
+
+Her olayın artan bir offset'i vardır. Aktif segment MAX_SEGMENT_BYTES'ı
+geçince yenisi açılır; her ekleme grubu fsync ile diske yazılır, yarım
+kalmış son satır açılışta kesilir. Outbox'a tek bir işlem yazar (pipeline);
+okuyan tüketici sayısı sınırsızdır. Tüketici kendi cursor'ından itibaren
+segmentleri sırayla (ardışık G/Ç) okur ve işlediği yere kadar commit eder.
+
+Sıkıştırma (compact) kapalı segmentlerde her anahtar için sadece son olayı
+bırakır; ürünü kaldırılmış anahtarlar için sadece product_removed olayı
+(tombstone) kalır. Offset'ler korunur, yani cursor'lar geçerliliğini korur.
+
+Kullanım:
+  python change_outbox.py publish eski.xml yeni.xml
+  python change_outbox.py read tüketici [adet]
+  python change_outbox.py commit tüketici offset
+  python change_outbox.py compact | status
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+from bisect import bisect_right
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from feed_diff import Change, diff_feeds
+
+OUTBOX_DIR = "outbox"
+MAX_SEGMENT_BYTES = 16 * 1024 * 1024
+
+EVENT_TYPES = {
+    "StockQuantity": "stock_changed",
+    "Quantity": "stock_changed",
+    "BuyingPrice": "price_changed",
+    "ProductPrice": "price_changed",
+    "Price": "price_changed",
+    "CategoryPath": "category_changed",
+    "Category": "category_changed",
+}
+
+
+def change_event(change: Change) -> Dict:
+    """feed_diff.Change -> olay sözlüğü (offset/ts outbox'ta eklenir)."""
+    if change.kind in ("added", "removed"):
+        return {"type": f"product_{change.kind}", "key": change.code, "code": change.code}
+    if change.kind == "variant_changed":
+        event_type = "stock_changed"
+    else:
+        event_type = EVENT_TYPES.get(change.field, "content_changed")
+    return {
+        "type": event_type,
+        "key": f"{change.code}:{change.field}",
+        "code": change.code,
+        "field": change.field,
+        "old": change.old,
+        "new": change.new,
+    }
+
+
+class Outbox:
+    def __init__(self, root: str = OUTBOX_DIR, max_segment_bytes: int = MAX_SEGMENT_BYTES):
+        self.root = root
+        self.max_segment_bytes = max_segment_bytes
+        self.segments_dir = os.path.join(root, "segments")
+        self.cursors_dir = os.path.join(root, "cursors")
+        os.makedirs(self.segments_dir, exist_ok=True)
+        os.makedirs(self.cursors_dir, exist_ok=True)
+        self.next_offset = self._recover()
+
+    # --- segmentler -------------------------------------------------------
+
+    def _segment_path(self, base: int) -> str:
+        return os.path.join(self.segments_dir, f"{base:020d}.jsonl")
+
+    def segments(self) -> List[int]:
+        """Segmentlerin ilk offset'leri, sıralı."""
+        return sorted(int(f[:-6]) for f in os.listdir(self.segments_dir) if f.endswith(".jsonl"))
+
+    def _recover(self) -> int:
+        """Aktif segmentteki yarım satırı keser; sıradaki offset'i döner."""
+        bases = self.segments()
+        if not bases:
+            return 1
+        path = self._segment_path(bases[-1])
+        with open(path, "rb+") as fh:
+            data = fh.read()
+            end = data.rfind(b"\n") + 1
+            if end != len(data):
+                fh.truncate(end)
+        last = data[:end].rstrip(b"\n").rsplit(b"\n", 1)[-1]
+        return json.loads(last)["offset"] + 1 if last else bases[-1]
+
+    def append(self, events: Iterable[Dict]) -> int:
+        """Olayları offset vererek ekler ve fsync eder; eklenen olay sayısını döner."""
+        bases = self.segments()
+        base = bases[-1] if bases else self.next_offset
+        path = self._segment_path(base)
+        ts = datetime.now().isoformat(timespec="seconds")
+        fh = open(path, "ab")
+        count = 0
+        try:
+            for event in events:
+                if fh.tell() >= self.max_segment_bytes:
+                    fh.flush()
+                    os.fsync(fh.fileno())
+                    fh.close()
+                    fh = open(self._segment_path(self.next_offset), "ab")
+                line = json.dumps({"offset": self.next_offset, "ts": ts, **event}, ensure_ascii=False)
+                fh.write(line.encode("utf-8") + b"\n")
+                self.next_offset += 1
+                count += 1
+            fh.flush()
+            os.fsync(fh.fileno())
+        finally:
+            fh.close()
+        return count
+
+    def read(self, start: int = 1, limit: Optional[int] = None) -> Iterator[Dict]:
+        """start offset'inden itibaren olaylar, segment segment ardışık okunur."""
+        bases = self.segments()
+        i = max(bisect_right(bases, start) - 1, 0)
+        position = start
+        emitted = 0
+        for base in bases[i:]:
+            with open(self._segment_path(base), "rb") as fh:
+                for line in fh:
+                    if not line.endswith(b"\n"):
+                        return  # başka bir işlem hâlâ yazıyor
+                    event = json.loads(line)
+                    # compact yarıda kaldıysa aynı offset iki segmentte olabilir
+                    if event["offset"] < position:
+                        continue
+                    if limit is not None and emitted >= limit:
+                        return
+                    yield event
+                    position = event["offset"] + 1
+                    emitted += 1
+
+    # --- tüketiciler ------------------------------------------------------
+
+    def _cursor_path(self, consumer: str) -> str:
+        if not consumer or os.sep in consumer or consumer.startswith("."):
+            raise ValueError(f"Geçersiz tüketici adı: {consumer!r}")
+        return os.path.join(self.cursors_dir, consumer)
+
+    def cursor(self, consumer: str) -> int:
+        path = self._cursor_path(consumer)
+        if not os.path.exists(path):
+            return 1
+        with open(path, encoding="utf-8") as fh:
+            return int(fh.read().strip() or 1)
+
+    def cursors(self) -> Dict[str, int]:
+        return {name: self.cursor(name) for name in sorted(os.listdir(self.cursors_dir)) if not name.endswith(".tmp")}
+
+    def consume(self, consumer: str, limit: Optional[int] = None) -> Iterator[Dict]:
+        """Tüketicinin cursor'ından itibaren okur; cursor'ı ilerletmek commit ile yapılır."""
+        return self.read(self.cursor(consumer), limit)
+
+    def commit(self, consumer: str, offset: int) -> None:
+        """offset'e kadar (dahil) olaylar işlendi."""
+        path = self._cursor_path(consumer)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as fh:
+            fh.write(f"{offset + 1}\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(f"{path}.tmp", path)
+
+    # --- sıkıştırma -------------------------------------------------------
+
+    def compact(self) -> Dict[str, int]:
+        """Kapalı segmentleri anahtar başına son olaya indirger; aktif segmente dokunmaz."""
+        bases = self.segments()
+        sealed = bases[:-1]
+        if not sealed:
+            return {"segments": 0, "before": 0, "after": 0}
+        latest: Dict[str, Dict] = {}
+        removed_codes = set()
+        before = 0
+        for base in sealed:
+            with open(self._segment_path(base), "rb") as fh:
+                for line in fh:
+                    event = json.loads(line)
+                    before += 1
+                    latest[event["key"]] = event
+                    if event["type"] == "product_removed":
+                        removed_codes.add(event["code"])
+                    elif event["type"] == "product_added":
+                        removed_codes.discard(event["code"])
+        kept = sorted(
+            (e for e in latest.values() if e["code"] not in removed_codes or e["type"] == "product_removed"),
+            key=lambda e: e["offset"],
+        )
+        path = self._segment_path(sealed[0])
+        with open(f"{path}.tmp", "wb") as fh:
+            for event in kept:
+                fh.write(json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(f"{path}.tmp", path)
+        for base in sealed[1:]:
+            os.remove(self._segment_path(base))
+        return {"segments": len(sealed), "before": before, "after": len(kept)}
+
+
+def publish_diff(outbox: Outbox, old_path: str, new_path: str, where=None) -> Dict[str, int]:
+    """İki feed'in farkını olay olarak outbox'a ekler; olay tipi sayılarını döner."""
+    counts: Dict[str, int] = {}
+
+    def events():
+        for change in diff_feeds(old_path, new_path, where=where):
+            event = change_event(change)
+            counts[event["type"]] = counts.get(event["type"], 0) + 1
+            yield event
+
+    outbox.append(events())
+    return counts
+
+
+def main():
+    commands = ("publish", "read", "commit", "compact", "status")
+    if len(sys.argv) < 2 or sys.argv[1] not in commands:
+        print("Kullanım: python change_outbox.py publish eski.xml yeni.xml | read tüketici [adet] | "
+              "commit tüketici offset | compact | status")
+        sys.exit(2)
+    command = sys.argv[1]
+    outbox = Outbox()
+
+    if command == "publish":
+        counts = publish_diff(outbox, sys.argv[2], sys.argv[3])
+        print("📮 " + (", ".join(f"{k}: {v}" for k, v in sorted(counts.items())) or "Fark yok"))
+    elif command == "read":
+        limit = int(sys.argv[3]) if len(sys.argv) >= 4 else None
+        for event in outbox.consume(sys.argv[2], limit):
+            print(json.dumps(event, ensure_ascii=False))
+    elif command == "commit":
+        outbox.commit(sys.argv[2], int(sys.argv[3]))
+    elif command == "compact":
+        result = outbox.compact()
+        print(f"🗜️ {result['segments']} segment: {result['before']} → {result['after']} olay")
+    else:
+        print(f"📮 {len(outbox.segments())} segment, sıradaki offset {outbox.next_offset}")
+        for name, position in outbox.cursors().items():
+            print(f"  • {name}: {position} (en fazla {outbox.next_offset - position} olay geride)")
+
+
+if __name__ == "__main__":
+    main()
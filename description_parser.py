@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+
+"""
+FullDescription/Description HTML'ini ayrıştıran, önbellekli açıklama işlemcisi.
+
+Açıklamalar şu biçimde escape edilmiş HTML tutuyor:
+
+  <p>Marka: Wagoon<br />Kategori: Erkek Ayakkabı<br />Ürün Malzemesi : %100 Vegan ...</p>
+
+fix_categories.py her üründe html.unescape + find("Kategori:") yapıyordu;
+diğer alanlar hiç okunmuyordu. Oysa kaynakta 293 ürün için sadece birkaç farklı
+açıklama var. DescriptionProcessor her farklı açıklamayı içerik hash'ine göre
+bir kez ayrıştırır ve:
+
+  - "Anahtar : Değer" satırlarını kanonik anahtarlarla (Marka, Kategori,
+    Malzeme, İç Astar, Topuk Boyu, Kalıp, ...) bir özellik sözlüğüne çıkarır,
+  - izin verilen etiketlerle (p, br, ul, li, b, ...) temizlenmiş HTML üretir.
+
+Sonraki aşamalar özelliklere record.attributes["Kategori"] gibi O(1) erişir.
+
+Kullanım: python description_parser.py [feed.xml]
+"""
+
+from __future__ import annotations
+
+import hashlib
+import html
+import re
+import sys
+from collections import Counter
+from html.parser import HTMLParser
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from feed_records import ProductRecord, iter_records
+
+SOURCE_XML = "wagoon_source_pretty.xml"
+
+# Açıklamadaki anahtar -> kanonik özellik adı
+ATTRIBUTE_ALIASES = {
+    "marka": "Marka",
+    "kategori": "Kategori",
+    "ürün malzemesi": "Malzeme",
+    "malzeme": "Malzeme",
+    "iç astar": "İç Astar",
+    "astar": "İç Astar",
+    "topuk boyu": "Topuk Boyu",
+    "kalıp": "Kalıp",
+    "taban": "Taban",
+    "taban malzemesi": "Taban",
+    "renk": "Renk",
+}
+
+DESCRIPTION_FIELDS = ("FullDescription", "Description")
+
+BLOCK_TAGS = {"p", "br", "div", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "table"}
+ALLOWED_TAGS = {"p", "br", "ul", "ol", "li", "b", "strong", "i", "em", "u", "h2", "h3", "h4", "table", "tr", "td", "th"}
+VOID_TAGS = {"br"}
+DROP_CONTENT_TAGS = {"script", "style", "iframe", "object"}
+
+MAX_KEY_LENGTH = 40
+_SPACES = re.compile(r"\s+")
+# Escape edilmiş etiket: &lt;p&gt;, &lt;br /&gt;, &lt;/p&gt;
+_ESCAPED_TAG = re.compile(r"&lt;/?[a-zA-Z]")
+# Metin verisi içinde kalmış satır sonu etiketleri (çift escape edilmiş açıklamalar)
+_DATA_BREAK = re.compile(r"<br\s*/?>|</?p(?:\s[^>]*)?>", re.IGNORECASE)
+
+
+def _lower_tr(text: str) -> str:
+    """Türkçe I/İ için doğru küçük harfe çevirme."""
+    return text.replace("I", "ı").replace("İ", "i").lower()
+
+
+def _clean(text: str) -> str:
+    return _SPACES.sub(" ", text.replace("\xa0", " ")).strip()
+
+
+class _Tokenizer(HTMLParser):
+    """Tek geçişte metin satırlarını ve temizlenmiş HTML'i üretir."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.lines: List[str] = []
+        self.out: List[str] = []
+        self._line: List[str] = []
+        self._drop_depth = 0
+
+    def _flush(self) -> None:
+        line = _clean("".join(self._line))
+        if line:
+            self.lines.append(line)
+        self._line = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT_TAGS:
+            self._drop_depth += 1
+            return
+        if tag in BLOCK_TAGS:
+            self._flush()
+        if tag in ALLOWED_TAGS and not self._drop_depth:
+            self.out.append(f"<{tag} />" if tag in VOID_TAGS else f"<{tag}>")
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT_TAGS:
+            self._drop_depth = max(0, self._drop_depth - 1)
+            return
+        if tag in BLOCK_TAGS:
+            self._flush()
+        if tag in ALLOWED_TAGS and tag not in VOID_TAGS and not self._drop_depth:
+            self.out.append(f"</{tag}>")
+
+    def handle_data(self, data):
+        if self._drop_depth:
+            return
+        for n, piece in enumerate(_DATA_BREAK.split(data)):
+            if n:
+                self._flush()
+                self.out.append("<br />")
+            self._line.append(piece)
+            self.out.append(html.escape(piece, quote=False))
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+class ParsedDescription:
+    """Bir açıklamanın ayrıştırılmış, paylaşılan (salt okunur) hali."""
+
+    __slots__ = ("attributes", "sanitized_html", "lines")
+
+    def __init__(self, attributes: Dict[str, str], sanitized_html: str, lines: List[str]):
+        self.attributes: Mapping[str, str] = MappingProxyType(attributes)
+        self.sanitized_html = sanitized_html
+        self.lines: Tuple[str, ...] = tuple(lines)
+
+
+def _split_attribute(line: str) -> Optional[Tuple[str, str]]:
+    if ":" not in line:
+        return None
+    key, value = line.split(":", 1)
+    key, value = _clean(key), _clean(value)
+    if not key or not value or len(key) > MAX_KEY_LENGTH or "//" in value[:2]:
+        return None
+    return ATTRIBUTE_ALIASES.get(_lower_tr(key), key), value
+
+
+def parse_description(text: str) -> ParsedDescription:
+    """Önbelleksiz ayrıştırma; normalde DescriptionProcessor üzerinden çağrılır."""
+    # Escape edilmiş HTML (&lt;p&gt;...) önce bir kez çözülür; enhance_description çıktısı
+    # gibi escape edilmiş gövde ile düz <p> etiketi bir arada olabilir
+    if _ESCAPED_TAG.search(text):
+        text = html.unescape(text)
+    stripped = text.strip()
+    if stripped.startswith("<![CDATA[") and stripped.endswith("]]>"):
+        text = stripped[9:-3]
+    tokenizer = _Tokenizer()
+    tokenizer.feed(text)
+    tokenizer.close()
+    attributes: Dict[str, str] = {}
+    for line in tokenizer.lines:
+        pair = _split_attribute(line)
+        if pair:
+            attributes.setdefault(*pair)
+    return ParsedDescription(attributes, "".join(tokenizer.out).strip(), tokenizer.lines)
+
+
+class DescriptionProcessor:
+    """İçerik hash'ine göre memoize eden açıklama işlemcisi."""
+
+    def __init__(self):
+        self._cache: Dict[bytes, ParsedDescription] = {}
+        self.stats: Counter = Counter()
+
+    def parse(self, text: Optional[str]) -> ParsedDescription:
+        text = text or ""
+        key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+        parsed = self._cache.get(key)
+        if parsed is None:
+            parsed = parse_description(text)
+            self._cache[key] = parsed
+            self.stats["miss"] += 1
+        else:
+            self.stats["hit"] += 1
+        return parsed
+
+    def annotate(self, record: ProductRecord) -> ParsedDescription:
+        """Kaydın açıklamasını ayrıştırır ve özellikleri record.attributes'a yazar."""
+        text = next((record.fields[f] for f in DESCRIPTION_FIELDS if record.fields.get(f)), "")
+        parsed = self.parse(text)
+        record.attributes.update(parsed.attributes)
+        return parsed
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) >= 2 else SOURCE_XML
+    processor = DescriptionProcessor()
+    attribute_counts: Counter = Counter()
+    product_count = 0
+    for record in iter_records(path):
+        processor.annotate(record)
+        attribute_counts.update(record.attributes.keys())
+        product_count += 1
+
+    print(f"📦 Ürün: {product_count} | Farklı açıklama: {len(processor)} | Önbellek isabeti: {processor.stats['hit']}")
+    for key, count in attribute_counts.most_common():
+        print(f"  • {key}: {count} üründe")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+
+"""
+Bayt bayt kararlı (kanonik) feed çıktısı.
+
+ET.indent/tree.write elementleri eklendikleri sırayla yazar: add_color
+Color'ı Brand'den sonra, add_desi_info Desi'yi Volume'dan sonra ekler,
+add_gtins Gtin'i sona koyar. Mantıksal olarak aynı iki feed bu yüzden
+bayt bayt farklı olabiliyor; rsync tarzı delta aktarım ve checksum'lar işe
+yaramıyor.
+
+Kanonik modda her ürün için:
+  - alanlar profildeki sabit sıraya dizilir (ürün, varyant ve Categories/
+    Manufacturers gibi gruplar); profilde olmayan alanlar bilinenlerden
+    sonra kendi aralarındaki sırayla kalır. Variant ve PictureUrl sırası
+    anlamlı olduğu için korunur.
+  - metinlerdeki boşluklar sadeleştirilir (HTML açıklamada sadece baş/son)
+  - sayılar tek biçime getirilir: stok/id tamsayı, fiyatlar iki hane
+    (1,029.00 -> 1029.00), vergi/desi gereksiz sıfırsız; ProductStatus
+    True/False
+  - öznitelikler ada göre sıralanır, boş metin boş element olur
+ve ürünler ProductCode'a göre (kararlı) sıralanır. Böylece değişmeyen ürün
+her çalıştırmada aynı baytlara serileşir; feed_parts ve snapshot_store
+onları değişmemiş sayar.
+
+Kullanım: python feed_canonical.py [girdi.xml] [çıktı.xml] [source|final|profil.json]
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sys
+from decimal import ROUND_HALF_UP, Decimal, DecimalException, InvalidOperation, getcontext
+from typing import Dict, List, Optional, Sequence
+
+from feed_stream import FeedReader, ProductWriter
+
+SOURCE_XML = "wagoon_source_pretty.xml"
+
+SOURCE_PROFILE = {
+    "product": [
+        "ProductId", "ProductName", "FullDescription", "ProductCode", "Gtin", "Color", "Tax",
+        "StockQuantity", "BuyingPrice", "ProductPrice", "ProductStatus",
+        "Variants", "Pictures", "Categories", "Manufacturers", "ProductSameColors",
+    ],
+    "variant": ["VariantId", "VariantCode", "VariantGtin", "VariantStock", "VariantName", "VariantValue"],
+    "groups": {
+        "Categories": ["CategoryId", "CategoryName", "CategoryPath"],
+        "Manufacturers": ["ManufacturerId", "ManufacturerName"],
+    },
+    "sort": "ProductCode",
+}
+
+FINAL_PROFILE = {
+    "product": [
+        "ProductId", "ProductName", "FullDescription", "Description", "ProductCode", "Barcode", "Gtin",
+        "Brand", "Color", "Tax", "TaxRate", "Currency", "StockQuantity", "Quantity",
+        "BuyingPrice", "ProductPrice", "Price", "ProductStatus", "Volume", "Desi",
+        "Category", "MainCategory", "SubCategory", *(f"Image{i}" for i in range(1, 11)),
+        "Variants", "Pictures", "Categories", "Manufacturers", "ProductSameColors",
+    ],
+    "variant": [
+        "VariantId", "VariantCode", "Barcode", "VariantGtin", "Gtin", "VariantStock", "VariantQuantity",
+        "VariantPrice", "VariantName", "VariantValue", "VariantName1", "VariantValue1", "VariantName2", "VariantValue2",
+    ],
+    "groups": SOURCE_PROFILE["groups"],
+    "sort": "ProductCode",
+}
+
+PROFILES = {"source": SOURCE_PROFILE, "final": FINAL_PROFILE}
+
+INT_FIELDS = frozenset((
+    "ProductId", "VariantId", "CategoryId", "ManufacturerId",
+    "StockQuantity", "Quantity", "VariantStock", "VariantQuantity",
+))
+PRICE_FIELDS = frozenset(("BuyingPrice", "ProductPrice", "Price", "VariantPrice"))
+DECIMAL_FIELDS = frozenset(("Tax", "TaxRate", "Desi", "Volume"))
+BOOL_FIELDS = frozenset(("ProductStatus",))
+HTML_FIELDS = frozenset(("FullDescription", "Description"))
+
+_INT = re.compile(r"[+-]?\d+")
+_THOUSANDS = re.compile(r"\d{1,3}(?:,\d{3})+")
+_CENTS = Decimal("0.01")
+
+
+def parse_decimal(text: str) -> Optional[Decimal]:
+    """899.00, 899,90, 1,029.00 ve 1.029,00 biçimlerini okur."""
+    text = text.replace(" ", "")
+    if "," in text and "." in text:
+        if text.rfind(",") > text.rfind("."):
+            text = text.replace(".", "").replace(",", ".")
+        else:
+            text = text.replace(",", "")
+    elif "," in text:
+        text = text.replace(",", "") if _THOUSANDS.fullmatch(text) else text.replace(",", ".")
+    elif text.count(".") > 1:
+        text = text.replace(".", "")  # 1.029.000
+    try:
+        value = Decimal(text)
+    except InvalidOperation:
+        return None
+    return value if value.is_finite() else None
+
+
+def normalize_value(field: str, text: Optional[str]) -> Optional[str]:
+    """Alan metnini kanonik biçime getirir; okunamayan sayı olduğu gibi kalır."""
+    if text is None:
+        return None
+    if field in HTML_FIELDS:
+        text = text.strip()
+    else:
+        text = " ".join(text.split())
+    if not text:
+        return None
+    if field in INT_FIELDS:
+        return str(int(text)) if _INT.fullmatch(text) else text
+    if field in PRICE_FIELDS or field in DECIMAL_FIELDS:
+        value = parse_decimal(text)
+        if value is None:
+            return text
+        if value.is_zero():
+            value = abs(value)  # -0 ve 0 aynı baytlara yazılsın
+        # bağlam hassasiyetini aşan değer (1e30) olduğu gibi kalır
+        if value.adjusted() >= getcontext().prec:
+            return text
+        try:
+            if field in PRICE_FIELDS:
+                return str(value.quantize(_CENTS, rounding=ROUND_HALF_UP))
+            return format(value.normalize(), "f")
+        except DecimalException:
+            return text
+    if field in BOOL_FIELDS:
+        lowered = text.lower()
+        if lowered in ("true", "1"):
+            return "True"
+        if lowered in ("false", "0"):
+            return "False"
+    return text
+
+
+class Canonicalizer:
+    """Ürün elementini yerinde kanonik hale getiren aşama."""
+
+    def __init__(self, profile: Dict):
+        self.profile = profile
+        self.product_order = self._ranks(profile.get("product", []))
+        self.variant_order = self._ranks(profile.get("variant", []))
+        self.group_orders = {group: self._ranks(fields) for group, fields in profile.get("groups", {}).items()}
+        self.sort_field = profile.get("sort")
+
+    @staticmethod
+    def _ranks(fields: Sequence[str]) -> Dict[str, int]:
+        return {name: n for n, name in enumerate(fields)}
+
+    @staticmethod
+    def _reorder(parent, ranks: Dict[str, int]) -> bool:
+        children = list(parent)
+        if len(children) < 2:
+            return False
+        unknown = len(ranks)
+        # sorted kararlı: bilinmeyen alanlar kendi aralarındaki sırayı korur
+        ordered = sorted(children, key=lambda c: ranks.get(c.tag, unknown))
+        if ordered == children:
+            return False
+        parent[:] = ordered
+        return True
+
+    def _normalize(self, elem) -> bool:
+        changed = False
+        if elem.attrib and list(elem.attrib) != sorted(elem.attrib):
+            items = sorted(elem.attrib.items())
+            elem.attrib.clear()
+            elem.attrib.update(items)
+            changed = True
+        if len(elem):
+            # girinti boşluğu değişiklik sayılmaz; serileştirici yeniden girintiler
+            changed |= bool((elem.text or "").strip())
+            elem.text = None
+            for child in elem:
+                changed |= self._normalize(child)
+        else:
+            text = normalize_value(elem.tag, elem.text)
+            changed |= text != elem.text and (text is not None or bool((elem.text or "").strip()))
+            elem.text = text
+        return changed
+
+    def apply(self, product) -> bool:
+        """Ürünü yerinde kanonik hale getirir; değer, öznitelik ya da sıra değiştiyse True."""
+        changed = self._normalize(product)
+        changed |= self._reorder(product, self.product_order)
+        for group, ranks in self.group_orders.items():
+            for elem in product.iterfind(group):
+                changed |= self._reorder(elem, ranks)
+        for variant in product.iterfind("Variants/Variant"):
+            changed |= self._reorder(variant, self.variant_order)
+        return changed
+
+    def sort_key(self, product) -> str:
+        return (product.findtext(self.sort_field) or "") if self.sort_field else ""
+
+
+def load_profile(name_or_path: str) -> Canonicalizer:
+    if name_or_path in PROFILES:
+        return Canonicalizer(PROFILES[name_or_path])
+    with open(name_or_path, encoding="utf-8") as fh:
+        return Canonicalizer(json.load(fh))
+
+
+def write_sorted(writer: ProductWriter, products: List, canonicalizer: Canonicalizer) -> None:
+    """Ürünleri sıralama anahtarına göre (eşitlerde okuma sırasıyla) yazar."""
+    for product in sorted(products, key=canonicalizer.sort_key):
+        writer.write(product)
+
+
+def canonicalize_feed(input_path: str, output_path: str, profile: str = "source") -> int:
+    """Feed'i kanonik biçimde yazar.
+
+    Sıralama için bütün ürünler bellekte tutulur (akış halinde değil); bellek
+    kullanımı ürün sayısıyla doğru orantılıdır.
+    """
+    canonicalizer = load_profile(profile)
+    reader = FeedReader(input_path)
+    products = []
+    for product in reader:
+        canonicalizer.apply(product)
+        products.append(product)
+    with ProductWriter.like(output_path, reader) as writer:
+        write_sorted(writer, products, canonicalizer)
+    return writer.count
+
+
+def main():
+    input_path = sys.argv[1] if len(sys.argv) >= 2 else SOURCE_XML
+    output_path = sys.argv[2] if len(sys.argv) >= 3 else input_path
+    profile = sys.argv[3] if len(sys.argv) >= 4 else "source"
+    count = canonicalize_feed(input_path, output_path, profile)
+    print(f"📐 {count} ürün kanonik biçimde yazıldı ({profile}) → {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+"""
+İki feed arasındaki ürün/varyant farklarını çıkarır.
+
+Ürünler ProductCode ile eşleştirilir; eklenen, kaldırılan ve izlenen
+alanlarından (stok, fiyat, kategori, ad, durum) biri değişen ürünler ile
+varyant stok değişiklikleri raporlanır. Dosyalar feed_stream ile okunur.
+
+Kullanım: python feed_diff.py eski.xml yeni.xml
+"""
+
+from __future__ import annotations
+
+import sys
+from typing import Dict, Iterator, NamedTuple, Optional, Sequence
+
+from feed_records import ProductRecord, iter_records
+
+# İzlenen ürün alanları (kaynak ve Stokmont formatı)
+DIFF_FIELDS = (
+    "ProductName", "ProductStatus",
+    "StockQuantity", "Quantity",
+    "BuyingPrice", "ProductPrice", "Price",
+    "CategoryPath", "Category",
+)
+VARIANT_STOCK_FIELDS = ("VariantStock", "VariantQuantity")
+
+
+class Change(NamedTuple):
+    kind: str           # added | removed | changed | variant_changed
+    code: str
+    field: str = ""
+    old: Optional[str] = None
+    new: Optional[str] = None
+
+
+def variant_key(variant: Dict[str, str], position: int) -> str:
+    """Varyantı ürün içinde tanımlayan anahtar."""
+    code = variant.get("VariantCode", "")
+    value = variant.get("VariantValue") or variant.get("VariantValue1") or str(position)
+    return f"{code}/{value}"
+
+
+def index_records(source, **options) -> Dict[str, ProductRecord]:
+    return {record.code: record for record in iter_records(source, **options) if record.code}
+
+
+def diff_records(old: Dict[str, ProductRecord], new: Dict[str, ProductRecord],
+                 fields: Sequence[str] = DIFF_FIELDS) -> Iterator[Change]:
+    for code, record in new.items():
+        before = old.get(code)
+        if before is None:
+            yield Change("added", code)
+            continue
+        for field in fields:
+            a, b = before.fields.get(field), record.fields.get(field)
+            if a != b:
+                yield Change("changed", code, field, a, b)
+        old_variants = {variant_key(v, n): v for n, v in enumerate(before.variants, 1)}
+        for n, variant in enumerate(record.variants, 1):
+            key = variant_key(variant, n)
+            previous = old_variants.get(key)
+            for field in VARIANT_STOCK_FIELDS:
+                a = previous.get(field) if previous is not None else None
+                b = variant.get(field)
+                if b is not None and a != b:
+                    yield Change("variant_changed", code, f"{key}:{field}", a, b)
+    for code in old.keys() - new.keys():
+        yield Change("removed", code)
+
+
+def diff_feeds(old_path: str, new_path: str, fields: Sequence[str] = DIFF_FIELDS,
+               where: Optional[Dict[str, str]] = None) -> Iterator[Change]:
+    """Kayıtlarda sadece karşılaştırılan alanlar tutulur (açıklama, resim vb. bellekte kalmaz)."""
+    projection = ["ProductCode", "Variants", "Categories", *fields]
+    return diff_records(index_records(old_path, fields=projection, where=where),
+                        index_records(new_path, fields=projection, where=where), fields)
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Kullanım: python feed_diff.py eski.xml yeni.xml")
+        sys.exit(2)
+    counts: Dict[str, int] = {}
+    for change in diff_feeds(sys.argv[1], sys.argv[2]):
+        counts[change.kind] = counts.get(change.kind, 0) + 1
+        if change.kind in ("added", "removed"):
+            print(f"{change.kind:16} {change.code}")
+        else:
+            print(f"{change.kind:16} {change.code} {change.field}: {change.old} → {change.new}")
+    print("📊 " + (", ".join(f"{k}: {v}" for k, v in sorted(counts.items())) or "Fark yok"))
+
+
+if __name__ == "__main__":
+    main()
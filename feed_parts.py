@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+
+"""
+Feed'i yükleme limitlerine uygun, numaralı parça dosyalarına böler.
+
+Stokmont ve pazaryeri içe aktarıcıları dosya boyutunu ve ürün sayısını
+sınırlıyor. Bu modül ürünleri akış halinde okuyup sırayla parça dosyalarına
+yazar; her parça kendi başına geçerli bir <Products> dokümanıdır (aynı kök
+öznitelikleriyle) ve bayt ve/veya ürün sayısı sınırını aşmaz:
+
+  stokmont.part001.xml.gz
+  stokmont.part002.xml.gz
+  stokmont.manifest.json    parça adları, ürün sayıları, boyutlar, sha256
+
+Bayt sınırı sıkıştırılmamış XML boyutuna uygulanır; gzip'li parça her zaman
+bundan küçüktür. gzip başlığına zaman/dosya adı yazılmaz, yani aynı içerik
+her çalıştırmada aynı checksum'ı verir. Önceki manifest ile karşılaştırılarak
+sadece değişen parçalar yeniden yüklenebilir (changed_parts). Parça sınırları
+ürün sayısıyla belirlendiğinde bir üründeki değişiklik sadece kendi parçasını
+etkiler.
+
+Kullanım: python feed_parts.py [feed.xml] [çıktı_öneki] [maks_bayt] [maks_ürün] [gz]
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from feed_stream import FeedReader, XML_DECLARATION, empty_root, open_tag, serialize_product
+
+FINAL_XML = "stokmont_final_sdstep_titles_buyingprice_barcode_pretty.xml"
+
+UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def parse_size(value: str) -> int:
+    """'5M', '500K', '1048576' gibi boyutları bayta çevirir."""
+    value = value.strip().upper().rstrip("B")
+    if value and value[-1] in UNITS:
+        return int(float(value[:-1]) * UNITS[value[-1]])
+    return int(value)
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PartWriter:
+    """Ürünleri sınırlara göre numaralı parça dosyalarına yazar.
+
+    Tek bir ürün bayt sınırından büyükse tek başına bir parçaya yazılır.
+    Her parça önce `.tmp` olarak yazılır ve kapatılınca yerine taşınır.
+    """
+
+    def __init__(self, prefix: str, max_bytes: Optional[int] = None, max_products: Optional[int] = None,
+                 compress: bool = False, tag: str = "Products", attrib: Optional[Dict[str, str]] = None):
+        if not max_bytes and not max_products:
+            raise ValueError("max_bytes ya da max_products gerekli")
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.max_products = max_products
+        self.compress = compress
+        self.tag = tag
+        self.attrib = attrib or {}
+        self.parts: List[Dict] = []
+        self.count = 0
+        self._head = (XML_DECLARATION + open_tag(self.tag, self.attrib) + "\n").encode("utf-8")
+        self._tail = f"</{self.tag}>".encode("utf-8")
+        self._fh = None
+        self._raw = None
+        self._size = 0
+        self._products = 0
+        self._first = self._last = ""
+
+    @classmethod
+    def like(cls, prefix: str, reader: FeedReader, **options) -> "PartWriter":
+        return cls(prefix, tag=reader.tag, attrib=reader.attrib, **options)
+
+    def part_path(self, number: int) -> str:
+        return f"{self.prefix}.part{number:03d}.xml" + (".gz" if self.compress else "")
+
+    @property
+    def manifest_path(self) -> str:
+        return f"{self.prefix}.manifest.json"
+
+    def _open_part(self) -> None:
+        path = self.part_path(len(self.parts) + 1)
+        self._raw = open(f"{path}.tmp", "wb")
+        # mtime=0 ve boş dosya adı: aynı içerik aynı gzip baytlarını üretir
+        self._fh = gzip.GzipFile(filename="", mode="wb", fileobj=self._raw, mtime=0) if self.compress else self._raw
+        self._fh.write(self._head)
+        self._size = len(self._head)
+        self._products = 0
+
+    def _close_part(self) -> None:
+        self._fh.write(self._tail)
+        self._size += len(self._tail)
+        if self._fh is not self._raw:
+            self._fh.close()
+        self._raw.close()
+        path = self.part_path(len(self.parts) + 1)
+        os.replace(f"{path}.tmp", path)
+        self.parts.append({
+            "file": os.path.basename(path),
+            "products": self._products,
+            "xml_bytes": self._size,
+            "bytes": os.path.getsize(path),
+            "sha256": file_sha256(path),
+            "first": self._first,
+            "last": self._last,
+        })
+        self._fh = self._raw = None
+
+    def write(self, product) -> None:
+        data = serialize_product(product).encode("utf-8")
+        code = (product.findtext("ProductCode") or "").strip()
+        if self._fh is not None:
+            full = self.max_products and self._products >= self.max_products
+            too_big = self.max_bytes and self._size + len(data) + len(self._tail) > self.max_bytes
+            if full or too_big:
+                self._close_part()
+        if self._fh is None:
+            self._open_part()
+            self._first = code
+        self._fh.write(data)
+        self._size += len(data)
+        self._products += 1
+        self._last = code
+        self.count += 1
+
+    def close(self, source: str = "") -> Dict:
+        """Son parçayı kapatır, manifest'i yazar ve eski çalıştırmadan kalan parçaları siler."""
+        if self._fh is not None:
+            self._close_part()
+        elif not self.parts:
+            # Boş feed de geçerli tek bir parça olarak yazılır
+            self._head = (XML_DECLARATION + empty_root(self.tag, self.attrib)).encode("utf-8")
+            self._tail = b""
+            self._open_part()
+            self._close_part()
+
+        previous = load_manifest(self.manifest_path)
+        manifest = {
+            "source": source,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "max_bytes": self.max_bytes,
+            "max_products": self.max_products,
+            "gzip": self.compress,
+            "products": self.count,
+            "parts": self.parts,
+        }
+        tmp = f"{self.manifest_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(manifest, fh, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.manifest_path)
+
+        current = {part["file"] for part in self.parts}
+        directory = os.path.dirname(self.prefix)
+        for part in (previous or {}).get("parts", []):
+            stale = os.path.join(directory, part["file"])
+            if part["file"] not in current and os.path.exists(stale):
+                os.remove(stale)
+        return manifest
+
+    def abort(self) -> None:
+        if self._fh is not None:
+            if self._fh is not self._raw:
+                self._fh.close()
+            self._raw.close()
+            os.remove(self._raw.name)
+            self._fh = self._raw = None
+
+
+def load_manifest(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def changed_parts(old: Optional[Dict], new: Dict) -> List[str]:
+    """Önceki manifest'e göre yeniden yüklenmesi gereken parça dosyaları."""
+    before = {part["file"]: part["sha256"] for part in (old or {}).get("parts", [])}
+    return [part["file"] for part in new["parts"] if before.get(part["file"]) != part["sha256"]]
+
+
+def split_feed(input_file: str, prefix: str, max_bytes: Optional[int] = None,
+               max_products: Optional[int] = None, compress: bool = False):
+    """Feed'i parçalara böler; (manifest, değişen parçalar) döner."""
+    previous = load_manifest(f"{prefix}.manifest.json")
+    reader = FeedReader(input_file)
+    writer = PartWriter.like(prefix, reader, max_bytes=max_bytes, max_products=max_products, compress=compress)
+    try:
+        for product in reader:
+            writer.write(product)
+    except BaseException:
+        writer.abort()
+        raise
+    manifest = writer.close(os.path.basename(input_file))
+    return manifest, changed_parts(previous, manifest)
+
+
+def main():
+    input_file = sys.argv[1] if len(sys.argv) >= 2 else FINAL_XML
+    prefix = sys.argv[2] if len(sys.argv) >= 3 else os.path.splitext(input_file)[0]
+    max_bytes = parse_size(sys.argv[3]) if len(sys.argv) >= 4 and sys.argv[3] != "-" else None
+    max_products = int(sys.argv[4]) if len(sys.argv) >= 5 and sys.argv[4] != "-" else None
+    compress = len(sys.argv) >= 6 and sys.argv[5] == "gz"
+    if not max_bytes and not max_products:
+        max_bytes = parse_size("10M")
+
+    manifest, changed = split_feed(input_file, prefix, max_bytes, max_products, compress)
+    print(f"✂️  {manifest['products']} ürün → {len(manifest['parts'])} parça ({prefix}.manifest.json)")
+    for part in manifest["parts"]:
+        mark = "🔄" if part["file"] in changed else "✅"
+        print(f"  {mark} {part['file']}: {part['products']} ürün, {part['bytes']} bayt")
+    print(f"📤 Yeniden yüklenecek: {len(changed)} parça")
+
+
+if __name__ == "__main__":
+    main()
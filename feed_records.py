@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+"""
+Feed ürünleri için hafif kayıt (record) modeli.
+
+Scriptler her alanı product.find(...).text ile tekrar tekrar arıyor. Burada
+her <Product> bir kez dolaşılıp düz bir sözlüğe çevrilir:
+
+  fields      yaprak alanlar (ProductCode, ProductName, ...). Categories ve
+              Manufacturers gibi grupların yaprakları da kendi adlarıyla
+              eklenir (CategoryPath, ManufacturerName, ...)
+  variants    her <Variant> için alan sözlüğü
+  pictures    <Pictures>/<PictureUrl> listesi
+  attributes  açıklamadan çıkarılan yapısal özellikler (description_parser)
+
+Ayrıştırma sırasında value_pools.FeedPools verilirse tekrar eden değerler
+(VariantName, numaralar, Tax, CategoryPath, ...) tek bir str nesnesini paylaşır.
+"""
+
+from __future__ import annotations
+
+import xml.etree.ElementTree as ET
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+
+from feed_stream import iter_products
+
+if TYPE_CHECKING:
+    from value_pools import FeedPools
+
+# Kayıtta düzleştirilen grupların yaprakları (to_element bunları yeniden gruplar)
+GROUP_FIELDS: Dict[str, tuple] = {
+    "Categories": ("CategoryId", "CategoryName", "CategoryPath"),
+    "Manufacturers": ("ManufacturerId", "ManufacturerName"),
+}
+_LEAF_GROUP = {leaf: group for group, leaves in GROUP_FIELDS.items() for leaf in leaves}
+
+
+class ProductRecord:
+    __slots__ = ("fields", "variants", "pictures", "attributes")
+
+    def __init__(self, fields: Optional[Dict[str, str]] = None,
+                 variants: Optional[List[Dict[str, str]]] = None,
+                 pictures: Optional[List[str]] = None):
+        self.fields: Dict[str, str] = fields if fields is not None else {}
+        self.variants: List[Dict[str, str]] = variants if variants is not None else []
+        self.pictures: List[str] = pictures if pictures is not None else []
+        self.attributes: Dict[str, str] = {}
+
+    @property
+    def code(self) -> str:
+        return self.fields.get("ProductCode", "")
+
+    def get(self, field: str, default: str = "") -> str:
+        return self.fields.get(field, default)
+
+    def __repr__(self) -> str:
+        return f"<ProductRecord {self.code!r} variants={len(self.variants)}>"
+
+    @classmethod
+    def from_element(cls, product: ET.Element, pools: Optional["FeedPools"] = None) -> "ProductRecord":
+        """pools verilirse düşük kardinaliteli değerler havuzdan paylaşılır."""
+        record = cls()
+        fields = record.fields
+        for child in product:
+            if child.tag == "Variants":
+                record.variants = [
+                    {f.tag: (f.text or "").strip() for f in variant}
+                    for variant in child.iterfind("Variant")
+                ]
+            elif child.tag == "Pictures":
+                record.pictures = [(p.text or "").strip() for p in child.iterfind("PictureUrl") if p.text]
+            elif len(child):
+                for leaf in child:
+                    fields.setdefault(leaf.tag, (leaf.text or "").strip())
+            else:
+                fields.setdefault(child.tag, (child.text or "").strip())
+        if pools is not None:
+            pools.intern_product(fields)
+            for variant in record.variants:
+                pools.intern_variant(variant)
+        return record
+
+    def to_element(self, tag: str = "Product") -> ET.Element:
+        """Kaydı kaynak (Wagoon) biçiminde bir <Product> elementine çevirir.
+
+        Alanlar kayıttaki sırayla yazılır; GROUP_FIELDS yaprakları ilk
+        yapraklarının yerinde gruplanır, Variants ve Pictures sona eklenir.
+        """
+        product = ET.Element(tag)
+        groups: Dict[str, ET.Element] = {}
+        for name, value in self.fields.items():
+            group = _LEAF_GROUP.get(name)
+            if group is None:
+                parent = product
+            else:
+                parent = groups.get(group)
+                if parent is None:
+                    parent = groups[group] = ET.SubElement(product, group)
+            ET.SubElement(parent, name).text = value
+        if self.variants:
+            variants = ET.SubElement(product, "Variants")
+            for variant in self.variants:
+                elem = ET.SubElement(variants, "Variant")
+                for name, value in variant.items():
+                    ET.SubElement(elem, name).text = value
+        if self.pictures:
+            pictures = ET.SubElement(product, "Pictures")
+            for url in self.pictures:
+                ET.SubElement(pictures, "PictureUrl").text = url
+        return product
+
+
+def iter_records(source, pools: Optional["FeedPools"] = None, **options) -> Iterator[ProductRecord]:
+    """options (fields/where/predicate) okuyucuya geçer; bkz. feed_stream.FeedReader."""
+    for product in iter_products(source, **options):
+        yield ProductRecord.from_element(product, pools)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+"""
+Bozuk ya da çift kaçışlı tedarikçi XML'i için onaran okuyucu.
+
+fix_categories.py, Category değerleri '&lt;![CDATA[TERLİK]]&gt;' olarak
+(çift kaçışlı CDATA) geldiği için yazılmıştı. Tedarikçi feed'inde ara sıra
+kontrol karakterleri ya da bozuk entity'ler de oluyor ve ET.parse bütün
+dokümanı reddediyor.
+
+RepairingReader dosyayı parça parça (READ_CHUNK) okur, bilinen hata
+sınıflarını bayt düzeyinde onarır ve temizlenmiş akışı read() ile verir;
+FeedReader/iterparse'a doğrudan dosya gibi verilebilir, dosyanın tamamı
+belleğe alınmaz:
+
+  cdata       &lt;![CDATA[...]]&gt;  ->  içerik (çift/üçlü kaçış dahil)
+  control     XML'de geçersiz kontrol karakterleri (0x00-0x1F, \\t \\n \\r hariç)
+              ve bunlara karşılık gelen &#..; referansları silinir
+  ampersand   kaçışsız '&' ve XML'de tanımsız entity'ler (&nbsp; vb.) -> &amp;
+
+Gerçek <![CDATA[...]]> bölümlerinin içine dokunulmaz. Parça sınırında
+bölünebilecek bir kalıp kalmasın diye her parça son '<' karakterinden
+kesilir, kalan bir sonraki parçayla birlikte işlenir.
+
+Kullanım: python feed_repair.py [girdi.xml] [çıktı.xml]
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+from collections import Counter
+from typing import Optional
+
+SOURCE_XML = "wagoon_source.xml"
+READ_CHUNK = 1 << 16
+# İçinde hiç '<' olmayan bir metin bu boyutu aşarsa son '&' öncesinden kesilir
+MAX_CARRY = 1 << 20
+
+_ESCAPED_CDATA = re.compile(rb"&(?:amp;)?lt;!\[CDATA\[(.*?)\]\]&(?:amp;)?gt;", re.S)
+_CONTROL = re.compile(rb"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+_CONTROL_REF = re.compile(
+    rb"&#(?:0*(?:[0-8]|1[1-2]|1[4-9]|2[0-9]|3[01])|[xX]0*(?:[0-8bBcCeEfF]|1[0-9a-fA-F]));"
+)
+_AMPERSAND = re.compile(rb"&(?!(?:amp|lt|gt|quot|apos|#[0-9]+|#[xX][0-9a-fA-F]+);)")
+_REAL_CDATA = re.compile(rb"(<!\[CDATA\[.*?\]\]>)", re.S)
+
+REPAIR_KINDS = ("cdata", "control", "ampersand")
+
+
+class RepairingReader:
+    """Onarılmış baytları veren, salt okunur dosya benzeri nesne."""
+
+    def __init__(self, source, chunk_size: int = READ_CHUNK):
+        self._fh = open(source, "rb") if isinstance(source, str) else source
+        self._owns = self._fh is not source
+        self.name = source if isinstance(source, str) else getattr(source, "name", "<stream>")
+        self.chunk_size = chunk_size
+        self.repairs: Counter = Counter()
+        self._carry = b""
+        self._out = bytearray()
+        self._eof = False
+
+    def _repair(self, data: bytes) -> bytes:
+        parts = _REAL_CDATA.split(data)
+        for i in range(0, len(parts), 2):  # tek indeksler gerçek CDATA bölümleri
+            text = parts[i]
+            if b"&" not in text and not _CONTROL.search(text):
+                continue
+            text, n = _ESCAPED_CDATA.subn(rb"\1", text)
+            self.repairs["cdata"] += n
+            text, n = _CONTROL.subn(b"", text)
+            self.repairs["control"] += n
+            text, n = _CONTROL_REF.subn(b"", text)
+            self.repairs["control"] += n
+            text, n = _AMPERSAND.subn(b"&amp;", text)
+            self.repairs["ampersand"] += n
+            parts[i] = text
+        return b"".join(parts)
+
+    def _cut(self, data: bytes) -> int:
+        """data'nın güvenle işlenebilecek ön ekinin uzunluğu."""
+        open_cdata = data.rfind(b"<![CDATA[")
+        if open_cdata != -1 and data.find(b"]]>", open_cdata) == -1:
+            return open_cdata
+        cut = data.rfind(b"<")
+        # Son '<' kapanmış bir CDATA bölümünün içindeyse bölümün başından kes
+        start = data.rfind(b"<![CDATA[", 0, cut + 1)
+        if start != -1 and data.find(b"]]>", start) > cut:
+            cut = start
+        if cut > 0 or len(data) <= MAX_CARRY:
+            return max(cut, 0)
+        amp = data.rfind(b"&")
+        return amp if amp > 0 else len(data)
+
+    def _fill(self) -> None:
+        chunk = self._fh.read(self.chunk_size)
+        if not chunk:
+            self._eof = True
+            self._out += self._repair(self._carry)
+            self._carry = b""
+            return
+        data = self._carry + chunk
+        cut = self._cut(data)
+        self._out += self._repair(data[:cut])
+        self._carry = data[cut:]
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._eof and (size < 0 or len(self._out) < size):
+            self._fill()
+        if size < 0 or size >= len(self._out):
+            data = bytes(self._out)
+            self._out.clear()
+        else:
+            data = bytes(self._out[:size])
+            del self._out[:size]
+        return data
+
+    def close(self) -> None:
+        if self._owns:
+            self._fh.close()
+
+    def __enter__(self) -> "RepairingReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def summary(self) -> str:
+        return ", ".join(f"{kind}: {self.repairs[kind]}" for kind in REPAIR_KINDS)
+
+
+def repair_file(input_file: str, output_file: Optional[str] = None) -> RepairingReader:
+    """Onarılmış feed'i ürün ürün normalize ederek yazar."""
+    from feed_stream import FeedReader, ProductWriter
+
+    output_file = output_file or input_file
+    with RepairingReader(input_file) as source:
+        reader = FeedReader(source)
+        with ProductWriter.like(output_file, reader) as writer:
+            for product in reader:
+                writer.write(product)
+    return source
+
+
+def main():
+    input_file = sys.argv[1] if len(sys.argv) >= 2 else SOURCE_XML
+    output_file = sys.argv[2] if len(sys.argv) >= 3 else input_file
+
+    source = repair_file(input_file, output_file)
+    print(f"🩹 Onarımlar - {source.summary()}")
+    print(f"💾 Dosya kaydedildi: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+
+"""
+Çok desenli, alan bazlı metin değiştirme motoru.
+
+replace_wagoon_with_wg.py tek bir kelime için bütün ağacı özyinelemeli dolaşıp
+str.replace çalıştırıyordu; her yeni değişiklik yeni bir ağaç turu ve dosya
+yazımı demekti. Burada değiştirme tablosu bir kez derlenir:
+
+  - düz metin desenleri tek bir Aho–Corasick otomatına toplanır; metin bir kez
+    taranır ve bütün desenler aynı anda (en soldaki en uzun eşleşme) değiştirilir,
+  - regex desenleri sırayla re.subn ile uygulanır,
+  - yalnızca ayarlanan alanlara (ProductName, FullDescription, ...) dokunulur,
+  - ürünler feed_stream ile akış halinde işlenir (özyineleme yok),
+  - her desen için kaç değişiklik yapıldığı raporlanır.
+
+Tablo JSON dosyası örneği:
+
+  {"fields": ["ProductName", "FullDescription"],
+   "rules": [{"find": "Wagoon", "replace": "WG"},
+             {"regex": "\\\\s{2,}", "replace": " "}]}
+
+Kullanım: python feed_rewrite.py tablo.json [girdi.xml] [çıktı.xml]
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sys
+import xml.etree.ElementTree as ET
+from collections import Counter, deque
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from feed_stream import FeedReader, ProductWriter
+
+FINAL_XML = "stokmont_final_sdstep_titles_buyingprice_barcode_pretty.xml"
+
+DEFAULT_FIELDS = ("ProductName", "FullDescription", "Description")
+
+
+class AhoCorasick:
+    """Düz metin desenleri için Aho–Corasick otomatı."""
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for idx, pattern in enumerate(self.patterns):
+            if not pattern:
+                raise ValueError("Boş desen kullanılamaz")
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(idx)
+        self._build_fail_links()
+
+    def _build_fail_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Bütün (başlangıç, bitiş, desen_no) eşleşmelerini döndürür (çakışanlar dahil)."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for pos, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for idx in out[state]:
+                end = pos + 1
+                yield end - len(self.patterns[idx]), end, idx
+
+    def select(self, text: str) -> List[Tuple[int, int, int]]:
+        """Çakışmayan, en soldaki en uzun eşleşmeler."""
+        matches = sorted(self.finditer(text), key=lambda m: (m[0], m[0] - m[1]))
+        chosen: List[Tuple[int, int, int]] = []
+        last_end = 0
+        for start, end, idx in matches:
+            if start >= last_end:
+                chosen.append((start, end, idx))
+                last_end = end
+        return chosen
+
+
+class Rewriter:
+    """Derlenmiş değiştirme tablosu."""
+
+    def __init__(self, rules: Sequence[Dict], fields: Optional[Sequence[str]] = DEFAULT_FIELDS):
+        literals: List[Dict] = []
+        self.regexes: List[Tuple[str, "re.Pattern[str]", str]] = []
+        for rule in rules:
+            if "find" in rule:
+                literals.append(rule)
+            elif "regex" in rule:
+                flags = re.IGNORECASE if rule.get("ignore_case") else 0
+                self.regexes.append((rule.get("name") or rule["regex"], re.compile(rule["regex"], flags), rule.get("replace", "")))
+            else:
+                raise ValueError(f"Kuralda 'find' ya da 'regex' olmalı: {rule}")
+        self.literal_labels = [r.get("name") or r["find"] for r in literals]
+        self.literal_replacements = [r.get("replace", "") for r in literals]
+        self.automaton = AhoCorasick([r["find"] for r in literals]) if literals else None
+        # None: ürün içindeki bütün metinler (eski replace_text davranışı)
+        self.fields = tuple(fields) if fields else None
+        self.counts: Counter = Counter()
+
+    def rewrite(self, text: str) -> str:
+        if self.automaton is not None:
+            matches = self.automaton.select(text)
+            if matches:
+                parts: List[str] = []
+                last = 0
+                for start, end, idx in matches:
+                    parts.append(text[last:start])
+                    parts.append(self.literal_replacements[idx])
+                    self.counts[self.literal_labels[idx]] += 1
+                    last = end
+                parts.append(text[last:])
+                text = "".join(parts)
+        for label, pattern, replacement in self.regexes:
+            text, n = pattern.subn(replacement, text)
+            if n:
+                self.counts[label] += n
+        return text
+
+    def _targets(self, product: ET.Element) -> Iterator[ET.Element]:
+        if self.fields is None:
+            yield from product.iter()
+            return
+        for field in self.fields:
+            yield from product.iterfind(field)
+
+    def apply(self, product: ET.Element) -> int:
+        """Ürünün ayarlı alanlarını yeniden yazar; değişen alan sayısını döner."""
+        changed = 0
+        whole = self.fields is None
+        for elem in self._targets(product):
+            if elem.text:
+                new = self.rewrite(elem.text)
+                if new != elem.text:
+                    elem.text = new
+                    changed += 1
+            if whole and elem.tail and elem is not product:
+                elem.tail = self.rewrite(elem.tail)
+        return changed
+
+
+def load_table(path: str) -> Tuple[List[Dict], Optional[List[str]]]:
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    if isinstance(data, list):
+        return data, list(DEFAULT_FIELDS)
+    return data.get("rules", []), data.get("fields", list(DEFAULT_FIELDS))
+
+
+def rewrite_feed(input_file: str, output_file: str, rules: Sequence[Dict],
+                 fields: Optional[Sequence[str]] = DEFAULT_FIELDS) -> Rewriter:
+    """Tabloyu bütün feed'e tek okuma + tek yazma ile uygular."""
+    rewriter = Rewriter(rules, fields)
+    reader = FeedReader(input_file)
+    with ProductWriter.like(output_file, reader) as writer:
+        for product in reader:
+            rewriter.apply(product)
+            writer.write(product)
+    return rewriter
+
+
+def print_counts(rewriter: Rewriter) -> None:
+    labels = rewriter.literal_labels + [label for label, _, _ in rewriter.regexes]
+    for label in labels:
+        print(f"  • {label!r}: {rewriter.counts.get(label, 0)} değişiklik")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Kullanım: python feed_rewrite.py tablo.json [girdi.xml] [çıktı.xml]")
+        sys.exit(2)
+    rules, fields = load_table(sys.argv[1])
+    input_file = sys.argv[2] if len(sys.argv) >= 3 else FINAL_XML
+    output_file = sys.argv[3] if len(sys.argv) >= 4 else input_file
+
+    rewriter = rewrite_feed(input_file, output_file, rules, fields)
+    print_counts(rewriter)
+    print(f"💾 Dosya kaydedildi: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
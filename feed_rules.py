@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+
+"""
+Bildirimsel (declarative) alan kuralları motoru.
+
+add_desi_info.py, fix_volume_for_stokmont.py gibi scriptler sabit bir değer
+yazmak ya da bir etiketi silmek için dosyanın tamamını okuyup yeniden yazıyor.
+Bu modülde aynı düzenlemeler kural olarak tanımlanır:
+
+  {"op": "set", "field": "Volume", "value": "2"}
+  {"op": "delete", "field": "Desi"}
+  {"op": "insert_after", "field": "Desi", "value": "2", "after": ["Volume"], "before": ["Brand"]}
+  {"op": "map", "field": "Currency", "table": {"TL": "TRY"}}
+  {"op": "derive_from_category", "field": "Desi", "table": {"TERLİK": "1"}, "default": "2"}
+
+field "Categories/CategoryPath" gibi iç içe bir yol olabilir (insert_after
+hariç); eksik ara elementler create ile oluşturulur.
+
+Her kurala "when" ile koşul listesi eklenebilir:
+
+  "when": [{"field": "ProductStatus", "equals": "True"},
+           {"field": "ProductCode", "startswith": "SD-"}]
+
+Kurallar bir kez derlenir (compile_rules). Derlenen plan her üründe çocuk
+elementleri tek kez dolaşır, bütün kuralları uygular ve yapısal değişiklik
+(silme/ekleme) varsa çocuk listesini tek seferde yeniden kurar. Böylece üç ayrı
+dosya yazımı gerektiren düzenlemeler tek geçişte yapılır.
+
+Kullanım: python feed_rules.py kurallar.json [girdi.xml] [çıktı.xml]
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import xml.etree.ElementTree as ET
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Sequence
+
+from feed_stream import FeedReader, ProductWriter
+
+FINAL_XML = "stokmont_final_sdstep_titles_buyingprice_barcode_pretty.xml"
+
+OPS = ("set", "delete", "insert_after", "map", "derive_from_category")
+
+Index = Dict[str, ET.Element]
+Condition = Callable[[Index], bool]
+
+
+def _lookup(index: Index, field: str) -> Optional[ET.Element]:
+    """'Categories/CategoryPath' gibi yolları da çözer; ilk adım indeksten gelir."""
+    if "/" not in field:
+        return index.get(field)
+    head, rest = field.split("/", 1)
+    elem = index.get(head)
+    return elem.find(rest) if elem is not None else None
+
+
+def _text(index: Index, field: str) -> Optional[str]:
+    elem = _lookup(index, field)
+    if elem is None:
+        return None
+    return (elem.text or "").strip()
+
+
+def _compile_condition(spec: Dict) -> Condition:
+    field = spec["field"]
+    if "equals" in spec:
+        expected = str(spec["equals"])
+        return lambda idx: _text(idx, field) == expected
+    if "not_equals" in spec:
+        unexpected = str(spec["not_equals"])
+        return lambda idx: _text(idx, field) != unexpected
+    if "in" in spec:
+        allowed = frozenset(str(v) for v in spec["in"])
+        return lambda idx: _text(idx, field) in allowed
+    if "startswith" in spec:
+        prefix = str(spec["startswith"])
+        return lambda idx: (_text(idx, field) or "").startswith(prefix)
+    if "exists" in spec:
+        wanted = bool(spec["exists"])
+        return lambda idx: (_lookup(idx, field) is not None) == wanted
+    raise ValueError(f"Bilinmeyen koşul: {spec}")
+
+
+class Rule:
+    """Derlenmiş tek kural."""
+
+    def __init__(self, spec: Dict, position: int):
+        op = spec.get("op")
+        if op not in OPS:
+            raise ValueError(f"Bilinmeyen işlem: {op!r} (kural #{position})")
+        if "field" not in spec:
+            raise ValueError(f"Kural #{position} için 'field' zorunlu")
+        self.op: str = op
+        self.field: str = spec["field"]
+        self.label: str = spec.get("name") or f"{op}:{self.field}"
+        self.value: Optional[str] = None if spec.get("value") is None else str(spec["value"])
+        self.table: Dict[str, str] = {str(k): str(v) for k, v in spec.get("table", {}).items()}
+        self.default: Optional[str] = None if spec.get("default") is None else str(spec["default"])
+        self.source: str = spec.get("source", "Category")
+        self.after: Sequence[str] = tuple(spec.get("after", ()))
+        self.before: Sequence[str] = tuple(spec.get("before", ()))
+        self.create: bool = spec.get("create", op in ("set", "insert_after", "derive_from_category"))
+        self.conditions: List[Condition] = [_compile_condition(c) for c in spec.get("when", ())]
+        if op in ("set", "insert_after") and self.value is None:
+            raise ValueError(f"Kural #{position} ({self.label}) için 'value' zorunlu")
+        if op == "map" and not self.table:
+            raise ValueError(f"Kural #{position} ({self.label}) için 'table' zorunlu")
+        self.nested: bool = "/" in self.field
+        if self.nested and op == "insert_after":
+            raise ValueError(f"Kural #{position} ({self.label}): insert_after sadece üst seviye alanlarla "
+                             f"kullanılabilir, iç içe yol ({self.field!r}) için set kullanın")
+
+    def applies(self, index: Index) -> bool:
+        return all(cond(index) for cond in self.conditions)
+
+    def new_value(self, index: Index, current: Optional[str]) -> Optional[str]:
+        """Alanın yeni değeri; None ise dokunulmaz."""
+        if self.op in ("set", "insert_after"):
+            return self.value
+        if self.op == "map":
+            if current is None:
+                return None
+            return self.table.get(current.strip(), self.default)
+        # derive_from_category: tam eşleşme, yoksa ana kategori (ilk "/" öncesi)
+        category = _text(index, self.source) or ""
+        if category in self.table:
+            return self.table[category]
+        main = category.split("/", 1)[0].strip()
+        return self.table.get(main, self.default)
+
+
+class RulePlan:
+    """Ürün başına uygulanacak derlenmiş işlem planı."""
+
+    def __init__(self, rules: Sequence[Rule]):
+        self.rules = list(rules)
+        self.stats: Counter = Counter()
+
+    def apply(self, product: ET.Element) -> bool:
+        """Bütün kuralları ürüne uygular; ürün değiştiyse True döner."""
+        # Tek geçiş: her etiketin ilk görüldüğü element
+        index: Index = {}
+        for child in product:
+            index.setdefault(child.tag, child)
+
+        deleted: set = set()
+        inserted_after: Dict[int, List[ET.Element]] = {}
+        inserted_before: Dict[int, List[ET.Element]] = {}
+        appended: List[ET.Element] = []
+        placed: Dict[int, List[ET.Element]] = {}
+        changed = False
+
+        for rule in self.rules:
+            if rule.conditions and not rule.applies(index):
+                continue
+            if rule.nested:
+                if self._apply_nested(product, index, rule, appended, placed):
+                    self.stats[rule.label] += 1
+                    changed = True
+                continue
+            elem = index.get(rule.field)
+
+            if rule.op == "delete":
+                if elem is not None and id(elem) not in deleted:
+                    if id(elem) in placed:
+                        placed.pop(id(elem)).remove(elem)
+                    else:
+                        deleted.add(id(elem))
+                    del index[rule.field]
+                    self.stats[rule.label] += 1
+                    changed = True
+                continue
+
+            if elem is not None:
+                if rule.op == "insert_after":
+                    continue
+                value = rule.new_value(index, elem.text)
+                if value is not None and value != elem.text:
+                    elem.text = value
+                    self.stats[rule.label] += 1
+                    changed = True
+                continue
+
+            if not rule.create:
+                continue
+            value = rule.new_value(index, None)
+            if value is None:
+                continue
+            # makeelement: ürün lxml de olsa ElementTree de olsa aynı türde element
+            elem = product.makeelement(rule.field, {})
+            elem.text = value
+            anchor = next((index[t] for t in rule.after if t in index), None)
+            offset = 1
+            if anchor is None:
+                anchor = next((index[t] for t in rule.before if t in index), None)
+                offset = 0
+            if anchor is None:
+                target = appended
+                target.append(elem)
+            elif id(anchor) in placed:
+                # Çapa bu geçişte eklenen bir element: onun listesine, yanına
+                target = placed[id(anchor)]
+                target.insert(target.index(anchor) + offset, elem)
+            else:
+                target = (inserted_after if offset else inserted_before).setdefault(id(anchor), [])
+                target.append(elem)
+            placed[id(elem)] = target
+            index[rule.field] = elem
+            self.stats[rule.label] += 1
+            changed = True
+
+        if deleted or inserted_after or inserted_before or appended:
+            children: List[ET.Element] = []
+            for child in product:
+                key = id(child)
+                children.extend(inserted_before.get(key, ()))
+                if key not in deleted:
+                    children.append(child)
+                children.extend(inserted_after.get(key, ()))
+            children.extend(appended)
+            product[:] = children
+        return changed
+
+
+    @staticmethod
+    def _apply_nested(product: ET.Element, index: Index, rule: Rule,
+                      appended: List[ET.Element], placed: Dict[int, List[ET.Element]]) -> bool:
+        """'Categories/CategoryPath' gibi yollar: ilk adım indeksten, kalanı iç içe çözülür.
+
+        Eksik ara elementler create ile oluşturulur (üst seviye olanı ürünün sonuna).
+        """
+        parts = rule.field.split("/")
+        elem = _lookup(index, rule.field)
+        if rule.op == "delete":
+            if elem is None:
+                return False
+            _lookup(index, "/".join(parts[:-1])).remove(elem)
+            return True
+        if elem is not None:
+            value = rule.new_value(index, elem.text)
+            if value is None or value == elem.text:
+                return False
+            elem.text = value
+            return True
+        if not rule.create:
+            return False
+        value = rule.new_value(index, None)
+        if value is None:
+            return False
+        parent = index.get(parts[0])
+        if parent is None:
+            parent = product.makeelement(parts[0], {})
+            appended.append(parent)
+            placed[id(parent)] = appended
+            index[parts[0]] = parent
+        for part in parts[1:]:
+            child = parent.find(part)
+            if child is None:
+                child = parent.makeelement(part, {})
+                parent.append(child)
+            parent = child
+        parent.text = value
+        return True
+
+
+def compile_rules(specs: Sequence[Dict]) -> RulePlan:
+    return RulePlan([Rule(spec, i) for i, spec in enumerate(specs, 1)])
+
+
+def load_rules(path: str) -> List[Dict]:
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    if isinstance(data, dict):
+        data = data.get("rules", [])
+    return data
+
+
+def apply_rules(input_file: str, output_file: str, specs: Sequence[Dict]) -> RulePlan:
+    """Kuralları tek okuma + tek yazma ile bütün feed'e uygular."""
+    plan = compile_rules(specs)
+    reader = FeedReader(input_file)
+    with ProductWriter.like(output_file, reader) as writer:
+        for product in reader:
+            plan.apply(product)
+            writer.write(product)
+    plan.stats["__products__"] = writer.count
+    return plan
+
+
+def print_stats(plan: RulePlan) -> None:
+    print(f"📦 İşlenen ürün: {plan.stats.get('__products__', 0)}")
+    for rule in plan.rules:
+        print(f"  • {rule.label}: {plan.stats.get(rule.label, 0)} değişiklik")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Kullanım: python feed_rules.py kurallar.json [girdi.xml] [çıktı.xml]")
+        sys.exit(2)
+    specs = load_rules(sys.argv[1])
+    input_file = sys.argv[2] if len(sys.argv) >= 3 else FINAL_XML
+    output_file = sys.argv[3] if len(sys.argv) >= 4 else input_file
+
+    plan = apply_rules(input_file, output_file, specs)
+    print_stats(plan)
+    print(f"💾 Dosya kaydedildi: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
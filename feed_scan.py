@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+
+"""
+mmap ile ürün sınırlarını bulan tarayıcı: anlık istatistik ve paralel ayrıştırma.
+
+"Kaç ürün/varyant var" ya da "X ürünü dosyanın neresinde" gibi sorular için
+bütün XML'i ayrıştırmak gerekmiyor. Dosya belleğe eşlenir (mmap) ve
+<Product>...</Product> bayt aralıkları regex/bytes.find ile bulunur; hiç
+element oluşturulmaz.
+
+Aralıklar işçi işlemlere paylaştırılabilir: her işçi dosyayı kendisi eşler
+ve sadece kendi aralığını ayrıştırır, yani ayrıştırmanın kendisi de paralel
+çalışır (parallel_map).
+
+Varsayım: ürünler iç içe değildir ve CDATA/yorum içinde "<Product>" metni
+geçmez (Wagoon ve Stokmont feed'lerinde böyle).
+
+Kullanım: python feed_scan.py [feed.xml] [ProductCode]
+"""
+
+from __future__ import annotations
+
+import io
+import mmap
+import os
+import re
+import sys
+import time
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from feed_stream import FeedReader
+
+SOURCE_XML = "wagoon_source.xml"
+
+Range = Tuple[int, int]
+
+# <Product> ya da <Product ...>; <ProductCode>, <Products> eşleşmez
+_START_CACHE: Dict[bytes, "re.Pattern[bytes]"] = {}
+
+COUNTED_TAGS = ("Variant", "PictureUrl", "Barcode", "VariantGtin", "Gtin")
+
+
+def _tag_pattern(tag: str) -> "re.Pattern[bytes]":
+    key = tag.encode("utf-8")
+    pattern = _START_CACHE.get(key)
+    if pattern is None:
+        pattern = _START_CACHE[key] = re.compile(rb"<" + re.escape(key) + rb"(?=[\s>/])")
+    return pattern
+
+
+def _open(path: str) -> Tuple[io.BufferedReader, mmap.mmap]:
+    fh = open(path, "rb")
+    try:
+        return fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    except BaseException:
+        fh.close()
+        raise
+
+
+def product_ranges(buf, product_tag: str = "Product") -> List[Range]:
+    """Her ürünün [başlangıç, bitiş) bayt aralığı."""
+    start_pattern = _tag_pattern(product_tag)
+    close = f"</{product_tag}>".encode("utf-8")
+    ranges: List[Range] = []
+    pos = 0
+    while True:
+        match = start_pattern.search(buf, pos)
+        if match is None:
+            return ranges
+        start = match.start()
+        head_end = buf.find(b">", start)
+        if buf[head_end - 1:head_end] == b"/":  # <Product/>
+            end = head_end + 1
+        else:
+            end = buf.find(close, head_end)
+            if end == -1:
+                raise ValueError(f"Kapanmayan <{product_tag}> (bayt {start})")
+            end += len(close)
+        ranges.append((start, end))
+        pos = end
+
+
+def scan(path: str, product_tag: str = "Product") -> List[Range]:
+    fh, buf = _open(path)
+    try:
+        return product_ranges(buf, product_tag)
+    finally:
+        buf.close()
+        fh.close()
+
+
+def stats(path: str, product_tag: str = "Product", tags=COUNTED_TAGS) -> Dict[str, int]:
+    """Ürün ve etiket sayıları; ağaç kurulmaz."""
+    fh, buf = _open(path)
+    try:
+        result = {"bytes": len(buf), product_tag: len(product_ranges(buf, product_tag))}
+        for tag in tags:
+            result[tag] = sum(1 for _ in _tag_pattern(tag).finditer(buf))
+        return result
+    finally:
+        buf.close()
+        fh.close()
+
+
+def locate(path: str, code: str, product_tag: str = "Product") -> Optional[Range]:
+    """ProductCode'u verilen ürünün bayt aralığı (yoksa None)."""
+    fh, buf = _open(path)
+    try:
+        needle = code.encode("utf-8")
+        for probe in (b"<ProductCode>" + needle + b"<", b"<ProductCode><![CDATA[" + needle + b"]]>"):
+            pos = buf.find(probe)
+            if pos != -1:
+                break
+        else:
+            return None
+        ranges = product_ranges(buf, product_tag)
+        i = bisect_right([start for start, _ in ranges], pos) - 1
+        if i >= 0 and ranges[i][0] <= pos < ranges[i][1]:
+            return ranges[i]
+        return None
+    finally:
+        buf.close()
+        fh.close()
+
+
+def shard(ranges: List[Range], parts: int) -> List[Range]:
+    """Ürün aralıklarını ürün sayısına göre parts adet bitişik bloğa böler."""
+    if not ranges:
+        return []
+    parts = max(1, min(parts, len(ranges)))
+    size, extra = divmod(len(ranges), parts)
+    blocks: List[Range] = []
+    i = 0
+    for n in range(parts):
+        j = i + size + (1 if n < extra else 0)
+        blocks.append((ranges[i][0], ranges[j - 1][1]))
+        i = j
+    return blocks
+
+
+def _map_block(args) -> list:
+    path, block, func, product_tag = args
+    fh, buf = _open(path)
+    try:
+        start, end = block
+        # Blok, kendi başına bir <Products> dokümanı olarak ayrıştırılır
+        data = b"<Products>" + buf[start:end] + b"</Products>"
+    finally:
+        buf.close()
+        fh.close()
+    return [func(product) for product in FeedReader(io.BytesIO(data), product_tag)]
+
+
+def parallel_map(path: str, func: Callable, workers: Optional[int] = None, product_tag: str = "Product") -> list:
+    """func'ı her ürüne uygular; ürünler işçi işlemlerde kendi bayt aralıklarından ayrıştırılır.
+
+    func modül seviyesinde (pickle edilebilir) olmalı; sonuçlar dosya sırasıyla döner.
+    """
+    workers = workers or os.cpu_count() or 1
+    blocks = shard(scan(path, product_tag), workers)
+    jobs = [(path, block, func, product_tag) for block in blocks]
+    if workers <= 1 or len(jobs) <= 1:
+        results = [_map_block(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_map_block, jobs))
+    return [item for block in results for item in block]
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) >= 2 else SOURCE_XML
+    started = time.perf_counter()
+    counts = stats(path)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"📊 {path}: {counts.pop('bytes')} bayt, {elapsed:.1f} ms")
+    for tag, count in counts.items():
+        print(f"  • {tag}: {count}")
+    if len(sys.argv) >= 3:
+        found = locate(path, sys.argv[2])
+        print(f"📍 {sys.argv[2]}: {'bayt %d-%d' % found if found else 'bulunamadı'}")
+
+
+if __name__ == "__main__":
+    main()
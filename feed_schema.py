@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+
+"""
+Akış sırasında ürün bazında yapısal doğrulama ve karantina.
+
+Scriptlerin çoğu product.find('ProductCode').text gibi erişimlerle tek bir
+bozuk ürün yüzünden bütün çalıştırmayı düşürüyor. Bu modül her ürünü
+derlenmiş bir şemaya göre kontrol eder; geçemeyen ürün sebepleriyle birlikte
+karantina dosyasına (JSONL, ürünün XML'i dahil) yazılır, sağlam ürünler
+akmaya devam eder.
+
+Şema JSON/sözlük olarak tanımlanır:
+
+  {
+    "required": {"ProductCode": "text", "StockQuantity": "int"},
+    "optional": {"BuyingPrice": "decimal"},
+    "groups": {
+      "Variants/Variant": {"min": 1, "required": {"VariantStock": "int"}}
+    }
+  }
+
+Tipler: text (boş olmayan), int, decimal, bool, gtin, url. Şema bir kez
+kontrol fonksiyonları listesine derlenir; ürün başına sadece bu liste
+çalışır.
+
+Kullanım: python feed_schema.py [girdi.xml] [çıktı.xml (varsayılan girdi_valid.xml)] [source|final|şema.json] [karantina.jsonl]
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Tuple
+
+from barcode_index import is_valid_gtin
+from feed_canonical import parse_decimal
+from feed_stream import FeedReader, ProductWriter
+import xml_backend
+
+SOURCE_XML = "wagoon_source.xml"
+QUARANTINE_FILE = "quarantine.jsonl"
+
+SOURCE_SCHEMA = {
+    "required": {"ProductCode": "text", "ProductName": "text", "StockQuantity": "int", "ProductPrice": "decimal"},
+    "optional": {"BuyingPrice": "decimal", "ProductStatus": "bool", "Tax": "decimal"},
+    "groups": {
+        "Variants/Variant": {"min": 1, "required": {"VariantStock": "int"}, "optional": {"VariantValue": "text"}},
+    },
+}
+
+FINAL_SCHEMA = {
+    "required": {
+        "ProductCode": "text", "ProductName": "text", "Quantity": "int", "Price": "decimal",
+        "Barcode": "gtin", "Image1": "url",
+    },
+    "optional": {"TaxRate": "decimal", **{f"Image{i}": "url" for i in range(2, 11)}},
+    "groups": {
+        "Variants/Variant": {
+            "min": 1,
+            "required": {"VariantCode": "text", "VariantQuantity": "int", "Barcode": "gtin"},
+            "optional": {"VariantPrice": "decimal"},
+        },
+    },
+}
+
+SCHEMAS = {"source": SOURCE_SCHEMA, "final": FINAL_SCHEMA}
+
+_INT = re.compile(r"-?\d+")
+# 899.00, 899,90 ve binlik ayraçlı 1,029.00 / 1.029,00
+_DECIMAL = re.compile(r"-?(?:\d{1,3}(?:[.,]\d{3})+|\d+)(?:[.,]\d+)?")
+
+
+def decimal_value(text: str) -> Optional[Decimal]:
+    """'decimal' tipindeki metnin değeri; şemadan geçmeyen metin için None.
+
+    Ayraçlar feed_canonical.parse_decimal ile yorumlanır; şema kontrolü de bu
+    fonksiyonu kullandığı için geçen her değer sayıya çevrilebilir.
+    """
+    text = text.strip()
+    return parse_decimal(text) if _DECIMAL.fullmatch(text) else None
+
+
+def _check_type(kind: str) -> Callable[[str], Optional[str]]:
+    """Metin için hata mesajı (ya da None) döndüren kontrol."""
+    if kind == "text":
+        return lambda v: None if v else "boş"
+    if kind == "int":
+        return lambda v: None if _INT.fullmatch(v) else f"tamsayı değil: {v!r}"
+    if kind == "decimal":
+        return lambda v: None if decimal_value(v) is not None else f"sayı değil: {v!r}"
+    if kind == "bool":
+        return lambda v: None if v.lower() in ("true", "false", "1", "0") else f"true/false değil: {v!r}"
+    if kind == "gtin":
+        return lambda v: None if is_valid_gtin(v) else f"geçersiz GTIN: {v!r}"
+    if kind == "url":
+        return lambda v: None if v.startswith(("http://", "https://")) else f"URL değil: {v!r}"
+    raise ValueError(f"Bilinmeyen tip: {kind}")
+
+
+# (alan, sebep) çiftleri; alan grup içindeyse "Variant#3/VariantStock" biçiminde
+Problem = Tuple[str, str]
+Check = Callable[[object], List[Problem]]
+
+
+def _field_checks(fields: Dict[str, str], required: bool) -> List[Check]:
+    checks: List[Check] = []
+    for name, kind in fields.items():
+        path = xml_backend.Path.compile(name)
+        valid = _check_type(kind)
+
+        def check(elem, path=path, valid=valid, name=name):
+            found = path.first(elem)
+            if found is None:
+                return [(name, "yok")] if required else []
+            text = (found.text or "").strip()
+            problem = valid(text)
+            if problem is None or (not required and not text):
+                return []
+            return [(name, problem)]
+
+        checks.append(check)
+    return checks
+
+
+class Schema:
+    """Sözlükten derlenmiş ürün şeması."""
+
+    def __init__(self, spec: Dict):
+        self.spec = spec
+        self._checks: List[Check] = []
+        self._checks += _field_checks(spec.get("required", {}), True)
+        self._checks += _field_checks(spec.get("optional", {}), False)
+        for group, group_spec in spec.get("groups", {}).items():
+            self._checks.append(self._group_check(group, group_spec))
+
+    @staticmethod
+    def _group_check(group: str, spec: Dict) -> Check:
+        path = xml_backend.Path.compile(group)
+        minimum = spec.get("min", 0)
+        item = group.rsplit("/", 1)[-1]
+        inner = _field_checks(spec.get("required", {}), True) + _field_checks(spec.get("optional", {}), False)
+
+        def check(elem):
+            members = path.all(elem)
+            problems = [] if len(members) >= minimum else [(group, f"en az {minimum} olmalı, {len(members)} var")]
+            for n, member in enumerate(members, 1):
+                for c in inner:
+                    problems.extend((f"{item}#{n}/{name}", detail) for name, detail in c(member))
+            return problems
+
+        return check
+
+    def problems(self, product) -> List[Problem]:
+        found: List[Problem] = []
+        for check in self._checks:
+            found.extend(check(product))
+        return found
+
+
+def load_schema(name_or_path: str) -> Schema:
+    if name_or_path in SCHEMAS:
+        return Schema(SCHEMAS[name_or_path])
+    with open(name_or_path, encoding="utf-8") as fh:
+        return Schema(json.load(fh))
+
+
+class QuarantineStage:
+    """Şemadan geçemeyen ürünleri karantinaya yazar.
+
+    accept() False dönerse ürün çıktıya yazılmamalıdır. Karantina dosyası
+    ilk sorunlu üründe eklemeli (append) açılır: önceki çalıştırmaların
+    kayıtları korunur, çünkü karantinaya alınan ürün çıktı feed'inde yoktur
+    ve tek kopyası bu dosyadadır. Kayıtlar "at" zamanıyla ayrılır.
+    """
+
+    def __init__(self, schema: Schema, path: str = QUARANTINE_FILE):
+        self.schema = schema
+        self.path = path
+        self.accepted = 0
+        self.quarantined = 0
+        self.reasons: Dict[str, int] = {}
+        self._fh = None
+        self._started = datetime.now().isoformat(timespec="seconds")
+
+    def accept(self, product) -> bool:
+        problems = self.schema.problems(product)
+        if not problems:
+            self.accepted += 1
+            return True
+        self.quarantined += 1
+        for field, detail in problems:
+            # Varyant sırası ve değerden bağımsız sebep: "Variant/VariantStock tamsayı değil"
+            key = f"{re.sub(r'#[0-9]+', '', field)} {detail.split(':')[0]}"
+            self.reasons[key] = self.reasons.get(key, 0) + 1
+        if self._fh is None:
+            self._fh = open(self.path, "a", encoding="utf-8")
+        record = {
+            "at": self._started,
+            "code": (product.findtext("ProductCode") or "").strip(),
+            "reasons": [f"<{field}> {detail}" for field, detail in problems],
+            "xml": xml_backend.tostring(product),
+        }
+        self._fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return False
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+def quarantine_feed(input_file: str, output_file: str, schema: Schema,
+                    quarantine_path: str = QUARANTINE_FILE) -> QuarantineStage:
+    stage = QuarantineStage(schema, quarantine_path)
+    reader = FeedReader(input_file)
+    try:
+        with ProductWriter.like(output_file, reader) as writer:
+            for product in reader:
+                if stage.accept(product):
+                    writer.write(product)
+    finally:
+        stage.close()
+    return stage
+
+
+def print_summary(stage: QuarantineStage) -> None:
+    print(f"🧪 {stage.accepted} ürün geçti, 🚧 {stage.quarantined} ürün karantinada")
+    for reason, count in sorted(stage.reasons.items(), key=lambda item: -item[1])[:10]:
+        print(f"  • {reason}: {count}")
+    if stage.quarantined:
+        print(f"📝 Karantina: {stage.path}")
+
+
+def main():
+    input_file = sys.argv[1] if len(sys.argv) >= 2 else SOURCE_XML
+    # Varsayılan çıktı girdinin yanına yazılır; karantinaya alınan ürünler girdiden silinmez
+    output_file = sys.argv[2] if len(sys.argv) >= 3 else f"{os.path.splitext(input_file)[0]}_valid.xml"
+    schema = load_schema(sys.argv[3] if len(sys.argv) >= 4 else "source")
+    quarantine_path = sys.argv[4] if len(sys.argv) >= 5 else QUARANTINE_FILE
+
+    print_summary(quarantine_feed(input_file, output_file, schema, quarantine_path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+
+"""
+Feed XML'leri için akış (streaming) tabanlı okuma/yazma yardımcıları.
+
+Scriptlerin çoğu tüm dosyayı ET.parse ile belleğe alıp sonunda tree.write ile
+yeniden yazıyor. Bu modül <Products><Product>... yapısını ürün ürün okur
+(iterparse) ve ürün ürün yazar; böylece birden fazla düzenleme tek geçişte
+yapılabilir ve bellek kullanımı ürün sayısından bağımsız kalır.
+
+Çıktı, ET.indent(space="  ") + tree.write(xml_declaration=True) ile üretilen
+dosyayla aynı biçimdedir. Ayrıştırma ve serileştirme xml_backend üzerinden
+yapılır (lxml kuruluysa lxml, değilse ElementTree).
+
+Sadece birkaç alana bakan okuyucular (stok, barkod, fark) FeedReader'a üst
+seviye alan listesi ve koşul verebilir. Ayrıştırma her zaman C seviyesindeki
+iterparse ile yapılır (lxml'de tag= filtresiyle sadece Product olayları
+Python'a gelir) ve ürün ağacı tam kurulur; ne ElementTree ne lxml alt ağaç
+atlamayı C seviyesinde sunar, her olay için Python geri çağrısı çalıştıran
+hedef (target) ayrıştırıcı ise atladığı ağaç kurma işinden daha pahalı.
+Koşul ve alan seçimi kurulan ürüne uygulanır: ayrıştırma süresini
+kısaltmaz, ürünleri bellekte tutan okuyucuların (fark) açıklama/resim
+taşımamasını sağlar.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+import xml_backend
+
+PRODUCT_TAG = "Product"
+INDENT = "  "
+XML_DECLARATION = "<?xml version='1.0' encoding='utf-8'?>\n"
+
+
+# Sık kullanılan üst seviye alan seçimleri
+PROJECTIONS: Dict[str, Tuple[str, ...]] = {
+    "stock": ("ProductCode", "StockQuantity", "Quantity", "Variants"),
+    "variants": ("ProductCode", "Variants"),
+    "category": ("ProductCode", "Category", "MainCategory", "SubCategory", "Categories"),
+    "barcodes": ("ProductCode", "Barcode", "Gtin", "Variants"),
+}
+
+
+def top_level_fields(fields: Iterable[str]) -> frozenset:
+    """'Variants/Variant/VariantStock' gibi yolların üst seviye alanları ({'Variants'})."""
+    return frozenset(field.strip("/").split("/", 1)[0] for field in fields)
+
+
+def _prune(product, keep: frozenset) -> None:
+    """Seçilmeyen üst seviye alanları kaldırır; seçilen alanların alt ağacı olduğu gibi kalır."""
+    for child in list(product):
+        if child.tag not in keep:
+            product.remove(child)
+
+
+class FeedReader:
+    """<Products> kökü altındaki <Product> elementlerini tek tek döndürür.
+
+    Kök elementin adı ve öznitelikleri (ör. Version="1.00") oluşturulurken
+    okunur; yazarken aynen korunabilsin diye `tag` ve `attrib` olarak saklanır.
+    Döndürülen ürün kökten ayrılır, yani bellekte biriken bir ağaç olmaz.
+
+    Sadece okuma yapan işler için:
+      fields     ürünlerde sadece bu üst seviye alanlar bırakılır (ör. PROJECTIONS["stock"];
+                 'Variants/Variant/X' yolu Variants'ın tamamını tutar); ayrıştırma
+                 süresi değişmez, bellekte çok ürün tutan işler (fark) açıklama/resim taşımaz
+      where      {"ProductStatus": "True"} gibi üst seviye alan koşulları; tutmayan
+                 ürün atlanır (koşul alanları ürüne dahil edilir)
+      predicate  projeksiyon uygulanmış ürün üzerinde son filtre
+    Projeksiyonlu ürünler eksik alan içerdiğinden feed'i yeniden yazmak için
+    kullanılmamalıdır.
+    """
+
+    def __init__(self, source, product_tag: str = PRODUCT_TAG,
+                 fields: Optional[Iterable[str]] = None,
+                 where: Optional[Dict[str, object]] = None,
+                 predicate: Optional[Callable] = None):
+        self.source = source
+        self.product_tag = product_tag
+        self.dropped = 0
+        self.where: Dict[str, frozenset] = {
+            name: frozenset([value] if isinstance(value, str) else map(str, value))
+            for name, value in (where or {}).items()
+        }
+        self.predicate = predicate
+        self.projection: Optional[frozenset] = None
+        if fields is not None:
+            self.projection = top_level_fields(list(fields) + list(self.where))
+        self._pending: Optional[ET.Element] = None
+        if xml_backend.USE_LXML:
+            self._init_tagged(source)
+        else:
+            self._init_iterparse(source)
+
+    def _init_tagged(self, source) -> None:
+        # lxml: sadece Product kapanışları Python'a gelir; kök ilk ürünün ebeveyni
+        self._events = xml_backend.iterparse(source, events=("end",), tag=self.product_tag)
+        for _, elem in self._events:
+            self._pending = elem
+            break
+        self._root = self._pending.getparent() if self._pending is not None else self._events.root
+        if self._root is None:
+            raise ValueError(f"Boş XML: {source}")
+        self.tag: str = self._root.tag
+        self.attrib: Dict[str, str] = dict(self._root.attrib)
+
+    def _init_iterparse(self, source) -> None:
+        self._events = xml_backend.iterparse(source, events=("start", "end"))
+        self._root = None
+        for event, elem in self._events:
+            if event == "start":
+                self._root = elem
+                break
+        if self._root is None:
+            raise ValueError(f"Boş XML: {source}")
+        self.tag = self._root.tag
+        self.attrib = dict(self._root.attrib)
+
+    def __iter__(self) -> Iterator[ET.Element]:
+        products = self._iter_tagged() if xml_backend.USE_LXML else self._iter_events()
+        if not self.where and self.projection is None and self.predicate is None:
+            yield from products
+            return
+        for product in products:
+            if self.where and not self._matches(product):
+                self.dropped += 1
+                continue
+            if self.projection is not None:
+                _prune(product, self.projection)
+            if self.predicate is not None and not self.predicate(product):
+                self.dropped += 1
+                continue
+            yield product
+
+    def _matches(self, product) -> bool:
+        for name, allowed in self.where.items():
+            value = product.findtext(name)
+            if value is None or value.strip() not in allowed:
+                return False
+        return True
+
+    def _iter_tagged(self) -> Iterator[ET.Element]:
+        root = self._root
+        pending, self._pending = self._pending, None
+        elements = self._events if pending is None else itertools.chain([(None, pending)], self._events)
+        for _, elem in elements:
+            if elem.getparent() is not root:
+                continue  # ürün içinde aynı adlı element
+            root.remove(elem)
+            elem.tail = None
+            yield elem
+
+    def _iter_events(self) -> Iterator[ET.Element]:
+        root = self._root
+        depth = 1
+        for event, elem in self._events:
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 1 and elem.tag == self.product_tag:
+                root.remove(elem)
+                elem.tail = None
+                yield elem
+            elif depth == 1:
+                # Ürün dışındaki kök çocuklarını da biriktirme
+                root.remove(elem)
+
+
+def iter_products(source, product_tag: str = PRODUCT_TAG, **options) -> Iterator[ET.Element]:
+    """Kök özniteliklerine ihtiyaç yoksa kısa yol; options FeedReader'a geçer."""
+    return iter(FeedReader(source, product_tag, **options))
+
+
+def open_tag(tag: str, attrib: Dict[str, str]) -> str:
+    return empty_root(tag, attrib)[:-3] + ">"
+
+
+def empty_root(tag: str, attrib: Dict[str, str]) -> str:
+    return ET.tostring(ET.Element(tag, attrib), encoding="unicode")
+
+
+def serialize_product(product: ET.Element) -> str:
+    """Ürünü kök altındaki girintisiyle, satır sonu dahil serileştirir."""
+    product.tail = None
+    xml_backend.indent(product, space=INDENT, level=1)
+    return INDENT + xml_backend.tostring(product) + "\n"
+
+
+class ProductWriter:
+    """Ürünleri tek tek pretty-print ederek yazar.
+
+    Dosya önce `<path>.tmp` olarak yazılır ve close() ile yerine taşınır;
+    bu sayede aynı dosya hem girdi hem çıktı olarak kullanılabilir.
+    """
+
+    def __init__(self, path: str, tag: str = "Products", attrib: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.tag = tag
+        self.attrib = attrib or {}
+        self.count = 0
+        self._tmp_path = f"{path}.tmp"
+        self._fh = open(self._tmp_path, "w", encoding="utf-8")
+        self._fh.write(XML_DECLARATION)
+
+    @classmethod
+    def like(cls, path: str, reader: FeedReader) -> "ProductWriter":
+        """Okunan feed'in kök adı ve öznitelikleriyle yazıcı açar."""
+        return cls(path, reader.tag, reader.attrib)
+
+    def write(self, product: ET.Element) -> None:
+        if self.count == 0:
+            self._fh.write(open_tag(self.tag, self.attrib) + "\n")
+        self._fh.write(serialize_product(product))
+        self.count += 1
+
+    def close(self) -> None:
+        if self._fh.closed:
+            return
+        if self.count == 0:
+            self._fh.write(empty_root(self.tag, self.attrib))
+        else:
+            self._fh.write(f"</{self.tag}>")
+        self._fh.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        """Yarım kalan çıktıyı siler, hedef dosyaya dokunmaz."""
+        if not self._fh.closed:
+            self._fh.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def __enter__(self) -> "ProductWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -22,6 +22,8 @@ import sys
 import xml.etree.ElementTree as ET
 from typing import Dict
 
+from description_parser import DescriptionProcessor
+
 FINAL_XML = "stokmont_final_sdstep_titles_buyingprice_barcode_pretty.xml"
 SOURCE_XML = "wagoon_source_pretty.xml"
 
@@ -69,6 +71,7 @@ def clean_cdata_text(text: str | None) -> str:
 
 def fix_categories():
     src_categories = load_source_categories()
+    descriptions = DescriptionProcessor()
 
     tree = ET.parse(FINAL_XML)
     root = tree.getroot()
@@ -134,17 +137,10 @@ def fix_categories():
                 main_cat = ""
 
         # Description'dan alt kategori çıkar (ör. "Kategori: Erkek Ayakkabı")
+        # Aynı açıklama bir kez ayrıştırılır (içerik hash'i ile önbellek)
         desc_el = p.find("Description")
-        if desc_el is not None and desc_el.text:
-            desc_text = html.unescape(desc_el.text)  # CDATA içinden çıkar
-            if "Kategori:" in desc_text:
-                start = desc_text.find("Kategori:") + len("Kategori:")
-                end = desc_text.find("<br />", start)
-                if end == -1:
-                    end = len(desc_text)
-                sub_from_desc = desc_text[start:end].strip()
-                if sub_from_desc and not sub_cat:
-                    sub_cat = sub_from_desc
+        if desc_el is not None and desc_el.text and not sub_cat:
+            sub_cat = descriptions.parse(desc_el.text).attributes.get("Kategori", "")
 
         main_cat_el.text = main_cat
         sub_cat_el.text = sub_cat
@@ -4,41 +4,28 @@ XML'deki Volume alanını güncelleme scripti.
 Stokmont formatına göre Volume = 2 yapılır.
 """
 
-import xml.etree.ElementTree as ET
+from feed_rules import apply_rules
+import xml_backend
+from xml_backend import Path
 
-def update_volume_in_xml(input_file, output_file, volume_value="2"):
-    """XML'deki Volume alanını günceller"""
-
-    # XML'i yükle
-    tree = ET.parse(input_file)
-    root = tree.getroot()
-
-    product_count = 0
+# Doğrulama sorguları bir kez derlenir (lxml varsa XPath)
+ALL_PRODUCTS = Path.compile('.//Product')
+PRODUCTS_WITH_VOLUME_2 = Path.compile('.//Product[Volume="2"]')
+PRODUCTS_WITH_DESI = Path.compile('.//Product[Desi]')
 
-    # Her ürün için Volume alanı güncelle
-    for product in root.findall('.//Product'):
-        product_count += 1
-
-        # Volume elementini bul ve güncelle
-        volume_elem = product.find('Volume')
-        if volume_elem is not None:
-            old_value = volume_elem.text
-            volume_elem.text = volume_value
-
-            if product_count <= 3:
-                pc = product.findtext('ProductCode', 'N/A')
-                print(f"✅ Ürün {pc}: Volume {old_value} → {volume_value}")
+def update_volume_in_xml(input_file, output_file, volume_value="2"):
+    """XML'deki Volume alanını günceller ve Desi alanını kaldırır (tek geçiş)"""
 
-    # Desi alanını kaldır (Stokmont formatında yok)
-    for product in root.findall('.//Product'):
-        desi_elem = product.find('Desi')
-        if desi_elem is not None:
-            product.remove(desi_elem)
-            print("🗑️  Desi alanı kaldırıldı (Stokmont formatında yok)")
+    # Desi alanı Stokmont formatında yok
+    rules = [
+        {"op": "set", "field": "Volume", "value": volume_value, "create": False},
+        {"op": "delete", "field": "Desi"},
+    ]
+    plan = apply_rules(input_file, output_file, rules)
 
-    # XML'i kaydet
-    ET.indent(root, space='  ', level=0)
-    tree.write(output_file, encoding='utf-8', xml_declaration=True)
+    product_count = plan.stats["__products__"]
+    if plan.stats["delete:Desi"]:
+        print(f"🗑️  {plan.stats['delete:Desi']} üründen Desi alanı kaldırıldı (Stokmont formatında yok)")
 
     print(f"\n✅ {product_count} üründe Volume = {volume_value} yapıldı")
     print(f"💾 Dosya kaydedildi: {output_file}")
@@ -54,12 +41,12 @@ def main():
 
     print("\n🔍 Doğrulama yapılıyor...")
     # Doğrulama
-    tree = ET.parse(output_file)
+    tree = xml_backend.parse(output_file)
     root = tree.getroot()
 
-    total_products = len(root.findall('.//Product'))
-    products_with_volume_2 = len(root.findall('.//Product[Volume="2"]'))
-    products_with_desi = len(root.findall('.//Product[Desi]'))
+    total_products = ALL_PRODUCTS.count(root)
+    products_with_volume_2 = PRODUCTS_WITH_VOLUME_2.count(root)
+    products_with_desi = PRODUCTS_WITH_DESI.count(root)
 
     print(f"📊 Toplam ürün: {total_products}")
     print(f"✅ Volume=2 olan ürün: {products_with_volume_2}")
@@ -3,25 +3,28 @@
 1. Replace all WG- with SD- in ProductCode and VariantCode
 2. Add unique query parameters to image URLs to avoid buybox conflicts
 """
-import xml.etree.ElementTree as ET
 import random
 import string
 
+import xml_backend
+from xml_backend import Path
+
+# Image1..Image10 yolları bir kez derlenir (lxml varsa XPath)
+IMAGE_PATHS = [Path.compile(f'Image{i}') for i in range(1, 11)]
+
 def generate_unique_suffix():
     """Generate a unique 8-character alphanumeric string"""
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
 
-def pretty_write(elem: ET.Element, path: str):
-    # Use ET.indent for clean formatting without extra blank lines
-    ET.indent(elem, space='  ', level=0)
-    tree = ET.ElementTree(elem)
-    tree.write(path, encoding='utf-8', xml_declaration=True)
+def pretty_write(elem, path: str):
+    # Same output as ET.indent + tree.write, with lxml when available
+    xml_backend.write(elem, path)
 
 def main():
     in_file = 'stokmont_final_sdstep_titles_buyingprice_barcode_pretty.xml'
     out_file = 'stokmont_final_sdstep_titles_buyingprice_barcode_pretty.xml'
     
-    tree = ET.parse(in_file)
+    tree = xml_backend.parse(in_file)
     root = tree.getroot()
     
     code_changes = 0
@@ -36,8 +39,8 @@ def main():
         
         # 2. Add unique parameters to image URLs
         unique_param = generate_unique_suffix()
-        for i in range(1, 11):  # Image1 to Image10
-            img_elem = product.find(f'Image{i}')
+        for image_path in IMAGE_PATHS:  # Image1 to Image10
+            img_elem = image_path.first(product)
             if img_elem is not None and img_elem.text:
                 # Add unique query parameter
                 separator = '&' if '?' in img_elem.text else '?'
@@ -7,6 +7,8 @@ Benzersiz ve çakışmayan barkod üretimi için gelişmiş script.
 - EAN-13 formatına uygun checksum hesaplar
 """
 
+import os
+import sys
 import xml.etree.ElementTree as ET
 import time
 import random
@@ -149,12 +151,20 @@ def update_xml_with_new_barcodes(input_file, output_file, method="sequence"):
     print(f"🔢 Toplam yeni barkod: {product_count + variant_count}")
     print(f"💾 Çıktı dosyası: {output_file}")
 
-def main():
+def main(method=None):
     input_file = 'stokmont_final_sdstep_titles_buyingprice_barcode_pretty.xml'
     output_file = 'stokmont_final_sdstep_titles_buyingprice_barcode_pretty_NEW.xml'
     
     print("🚀 Benzersiz Barkod Üretici")
     print("=" * 50)
+
+    # Cron/daemon altında (terminal yoksa) soru sorulmaz, varsayılan: sequence
+    if method is None and (os.environ.get("WAGOON_NONINTERACTIVE") or not sys.stdin.isatty()):
+        method = "sequence"
+    if method is not None:
+        update_xml_with_new_barcodes(input_file, output_file, method)
+        return
+
     print("1. Sequence-based (önerilen)")
     print("2. Time-based (ultra benzersiz)")
     
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+
+"""
+Feed'deki resim URL'lerinin gerçekten açılıp açılmadığını kontrol eder.
+
+validate_final_xml Image1'in dolu olmasını istiyor ama adresin çalışıp
+çalışmadığına bakmıyor; kırık resimler yüklemelerin reddedilmesinin sık
+nedenlerinden. Bu modül URL'leri asyncio ile, harici kütüphane olmadan
+kontrol eder:
+
+  - önce HEAD; sunucu HEAD'i desteklemiyorsa (403/405/501) Range: bytes=0-0
+    ile GET
+  - host başına eşzamanlı bağlantı sınırı ve keep-alive bağlantı havuzu
+  - yönlendirmeler (en fazla MAX_REDIRECTS) takip edilir
+  - sonuçlar (durum kodu, content-type, boyut) URL anahtarıyla SQLite'ta
+    saklanır; TTL dolmamış URL'ler tekrar sorgulanmaz, kırık olanlar daha
+    kısa sürede (FAILED_TTL) yeniden denenir
+
+2xx dönen ve content-type'ı image/ olan adres sağlamdır.
+
+Kullanım: python image_check.py [feed.xml]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import ssl
+import sys
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import quote, urljoin, urlsplit
+
+FINAL_XML = "stokmont_final_sdstep_titles_buyingprice_barcode_pretty.xml"
+IMAGE_CACHE = "image_cache.sqlite"
+
+TTL = 7 * 24 * 3600
+FAILED_TTL = 3600
+PER_HOST = 6
+TOTAL = 32
+TIMEOUT = 15.0
+MAX_REDIRECTS = 5
+USER_AGENT = "wagoon-image-check/1.0"
+
+# HEAD desteklemeyen sunucular için GET'e düşülen durum kodları
+HEAD_FALLBACK = (403, 405, 501)
+REDIRECTS = (301, 302, 303, 307, 308)
+IMAGE_FIELDS = [f"Image{i}" for i in range(1, 11)]
+
+
+class ImageStatus(NamedTuple):
+    url: str
+    status: int  # 0: bağlantı/zaman aşımı hatası
+    content_type: str
+    size: int  # bilinmiyorsa -1
+    error: str
+    checked_at: float
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300 and self.content_type.startswith("image/")
+
+    def describe(self) -> str:
+        if self.error:
+            return self.error
+        if not 200 <= self.status < 300:
+            return f"HTTP {self.status}"
+        return f"resim değil ({self.content_type or 'content-type yok'})"
+
+
+def collect_image_urls(products) -> List[Tuple[str, str]]:
+    """(url, ProductCode) çiftleri; final formatta Image1..10, kaynakta PictureUrl."""
+    pairs: List[Tuple[str, str]] = []
+    for product in products:
+        code = (product.findtext("ProductCode") or "").strip()
+        for field in IMAGE_FIELDS:
+            url = (product.findtext(field) or "").strip()
+            if url:
+                pairs.append((url, code))
+        for elem in product.iterfind("Pictures/PictureUrl"):
+            url = (elem.text or "").strip()
+            if url:
+                pairs.append((url, code))
+    return pairs
+
+
+class ImageCache:
+    """URL -> son kontrol sonucu."""
+
+    def __init__(self, path: str = IMAGE_CACHE, ttl: float = TTL, failed_ttl: float = FAILED_TTL):
+        self.ttl = ttl
+        self.failed_ttl = failed_ttl
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS images (url TEXT PRIMARY KEY, status INTEGER, content_type TEXT,"
+            " size INTEGER, error TEXT, checked_at REAL) WITHOUT ROWID"
+        )
+
+    def fresh(self, urls: Iterable[str], now: Optional[float] = None) -> Dict[str, ImageStatus]:
+        now = time.time() if now is None else now
+        found: Dict[str, ImageStatus] = {}
+        for url in urls:
+            row = self.conn.execute("SELECT * FROM images WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                continue
+            status = ImageStatus(*row)
+            if now - status.checked_at < (self.ttl if status.ok else self.failed_ttl):
+                found[url] = status
+        return found
+
+    def store(self, results: Iterable[ImageStatus]) -> None:
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?)", results)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "ImageCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _Response(NamedTuple):
+    status: int
+    headers: Dict[str, str]
+
+
+class HttpPool:
+    """Host başına sınırlı, keep-alive bağlantı havuzu (HTTP/1.1, sadece başlıklar)."""
+
+    def __init__(self, per_host: int = PER_HOST, timeout: float = TIMEOUT):
+        self.per_host = per_host
+        self.timeout = timeout
+        self._limits: Dict[Tuple[str, str, int], asyncio.Semaphore] = {}
+        self._idle: Dict[Tuple[str, str, int], List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self._ssl = ssl.create_default_context()
+
+    @staticmethod
+    def _key(url: str) -> Tuple[str, str, int]:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Desteklenmeyen URL: {url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        return parts.scheme, parts.hostname, port
+
+    async def _connect(self, key):
+        scheme, host, port = key
+        return await asyncio.open_connection(host, port, ssl=self._ssl if scheme == "https" else None)
+
+    async def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None) -> _Response:
+        key = self._key(url)
+        limit = self._limits.setdefault(key, asyncio.Semaphore(self.per_host))
+        async with limit:
+            idle = self._idle.setdefault(key, [])
+            while True:
+                reused = bool(idle)
+                conn = idle.pop() if reused else await asyncio.wait_for(self._connect(key), self.timeout)
+                try:
+                    response, reusable = await asyncio.wait_for(self._exchange(conn, method, url, headers), self.timeout)
+                    break
+                except (ConnectionError, asyncio.IncompleteReadError, EOFError):
+                    conn[1].close()
+                    if not reused:
+                        raise
+                    # Sunucu boştaki bağlantıyı kapatmış olabilir: yeni bağlantıyla tekrar
+                except BaseException:
+                    conn[1].close()
+                    raise
+            if reusable:
+                idle.append(conn)
+            else:
+                conn[1].close()
+            return response
+
+    async def _exchange(self, conn, method: str, url: str, headers: Optional[Dict[str, str]]):
+        reader, writer = conn
+        parts = urlsplit(url)
+        target = quote(parts.path or "/", safe="/%:@!$&'()*+,;=-._~")
+        if parts.query:
+            target += "?" + quote(parts.query, safe="/%:@!$&'()*+,;=-._~?")
+        host = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {host}", f"User-Agent: {USER_AGENT}", "Accept: image/*"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise EOFError("Sunucu bağlantıyı kapattı")
+        version, status = status_line.decode("latin-1").split(None, 2)[:2]
+        response_headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version == "HTTP/1.1" and response_headers.get("connection", "").lower() != "close"
+        if method == "HEAD" or int(status) in (204, 304):
+            return _Response(int(status), response_headers), keep_alive
+        # GET gövdesi: küçükse okunup bağlantı tekrar kullanılır, değilse kapatılır
+        length = response_headers.get("content-length")
+        if keep_alive and length is not None and int(length) <= 65536 and "transfer-encoding" not in response_headers:
+            await reader.readexactly(int(length))
+            return _Response(int(status), response_headers), True
+        return _Response(int(status), response_headers), False
+
+    async def close(self) -> None:
+        for conns in self._idle.values():
+            for _, writer in conns:
+                writer.close()
+        self._idle.clear()
+
+
+def _size(headers: Dict[str, str]) -> int:
+    content_range = headers.get("content-range", "")
+    if "/" in content_range and content_range.rsplit("/", 1)[1].isdigit():
+        return int(content_range.rsplit("/", 1)[1])
+    length = headers.get("content-length", "")
+    return int(length) if length.isdigit() else -1
+
+
+class ImageChecker:
+    def __init__(self, per_host: int = PER_HOST, total: int = TOTAL, timeout: float = TIMEOUT):
+        self.per_host = per_host
+        self.total = total
+        self.timeout = timeout
+
+    async def _check(self, pool: HttpPool, limit: asyncio.Semaphore, url: str) -> ImageStatus:
+        async with limit:
+            current = url
+            try:
+                for _ in range(MAX_REDIRECTS + 1):
+                    response = await pool.request("HEAD", current)
+                    if response.status in HEAD_FALLBACK:
+                        response = await pool.request("GET", current, {"Range": "bytes=0-0"})
+                    location = response.headers.get("location")
+                    if response.status in REDIRECTS and location:
+                        current = urljoin(current, location)
+                        continue
+                    content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+                    return ImageStatus(url, response.status, content_type, _size(response.headers), "", time.time())
+                return ImageStatus(url, 0, "", -1, "çok fazla yönlendirme", time.time())
+            except asyncio.TimeoutError:
+                return ImageStatus(url, 0, "", -1, "zaman aşımı", time.time())
+            except (OSError, ValueError, EOFError, asyncio.IncompleteReadError) as e:
+                return ImageStatus(url, 0, "", -1, f"{type(e).__name__}: {e}", time.time())
+
+    async def check_many(self, urls: Sequence[str]) -> List[ImageStatus]:
+        pool = HttpPool(self.per_host, self.timeout)
+        limit = asyncio.Semaphore(self.total)
+        try:
+            return await asyncio.gather(*(self._check(pool, limit, url) for url in urls))
+        finally:
+            await pool.close()
+
+
+def check_images(urls: Iterable[str], cache_path: Optional[str] = IMAGE_CACHE, ttl: float = TTL,
+                 checker: Optional[ImageChecker] = None) -> Dict[str, ImageStatus]:
+    """URL'leri kontrol eder; önbellekte taze sonucu olanlar sorgulanmaz.
+
+    cache_path=None önbelleği kapatır.
+    """
+    unique = list(dict.fromkeys(urls))
+    cache = ImageCache(cache_path, ttl) if cache_path else None
+    try:
+        results = cache.fresh(unique) if cache else {}
+        pending = [url for url in unique if url not in results]
+        if pending:
+            checked = asyncio.run((checker or ImageChecker()).check_many(pending))
+            if cache:
+                cache.store(checked)
+            results.update((status.url, status) for status in checked)
+        return results
+    finally:
+        if cache:
+            cache.close()
+
+
+def image_errors(pairs: Sequence[Tuple[str, str]], results: Dict[str, ImageStatus]) -> List[str]:
+    return [
+        f"Resim açılmıyor: {url} ({results[url].describe()}) - ürün: {owner}"
+        for url, owner in pairs
+        if not results[url].ok
+    ]
+
+
+def main():
+    from feed_stream import iter_products
+
+    path = sys.argv[1] if len(sys.argv) >= 2 else FINAL_XML
+    pairs = collect_image_urls(iter_products(path, fields=["ProductCode", "Pictures", *IMAGE_FIELDS]))
+    started = time.perf_counter()
+    results = check_images(url for url, _ in pairs)
+    elapsed = time.perf_counter() - started
+    errors = image_errors(pairs, results)
+    print(f"🖼️  {len(results)} farklı resim URL'si kontrol edildi ({elapsed:.1f} sn)")
+    for e in errors:
+        print(e)
+    if errors:
+        print(f"HATA! {len(errors)} kırık resim.")
+        sys.exit(1)
+    print("✅ Tüm resimler erişilebilir.")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,9 @@ source_root = source_tree.getroot()
 # ProductCode -> Color eşlemesi
 product_colors = {}
 for product in source_root.findall('Product'):
-    code = product.find('ProductCode').text
+    code = product.findtext('ProductCode')
     color = product.find('Color')
-    if color is not None:
+    if code and color is not None:
         product_colors[code] = color.text
 
 # Hedef XML'i yükle
@@ -17,13 +17,15 @@ target_tree = ET.parse('stokmont_final_sdstep_titles_buyingprice_barcode_pretty.
 target_root = target_tree.getroot()
 
 for product in target_root.findall('Product'):
-    code = product.find('ProductCode').text
+    code = product.findtext('ProductCode')
+    if not code:
+        continue  # bozuk ürün: atla, bütün çalıştırmayı düşürme
     # SD- yi WG- ye çevirerek eşleştir
     source_code = code.replace('SD-', 'WG-')
     color = product_colors.get(source_code, None)
     if color:
         # Varyantlara renk ekle
-        for variant in product.find('Variants').findall('Variant'):
+        for variant in product.iterfind('Variants/Variant'):
             # Eğer zaten renk varyantı varsa ekleme
             if not any((vn.text or '').lower() == 'renk' for vn in variant.findall('*') if vn.tag.startswith('VariantName')):
                 # İlk boş VariantName/Value slotunu bul
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+
+"""
+Aynı Wagoon kaynağından birden fazla mağaza feed'i: kaynak bir kez ayrıştırılır.
+
+Her mağaza için bütün script zincirini ayrı ayrı çalıştırmak kaynağı N kez
+okuyup ayrıştırmak demekti. Burada ana işlem kaynağı bir kez ayrıştırır,
+gc.freeze() ile çöp toplayıcının sayfalara dokunmasını engeller ve her
+mağazayı fork edilmiş ayrı bir işçi işlemde çalıştırır. İşçiler ayrıştırılmış
+ağacı copy-on-write olarak paylaşır; bir işçinin ürünlerde yaptığı
+değişiklik sadece kendi kopyasını etkiler. fork olmayan platformlarda
+mağazalar sırayla, ağacın kopyası üzerinde çalışır.
+
+Yapılandırma (JSON):
+
+  {"source": "wagoon_source_pretty.xml",
+   "stores": [
+     {"name": "stepday", "output": "stores/stepday.xml",
+      "where": {"ProductStatus": ["True"]},
+      "code_prefix": {"from": "WG-", "to": "SD-"},
+      "rewrite": {"fields": ["ProductName"], "rules": [{"find": "Wagoon", "replace": "StepDay"}]},
+      "rules": [{"op": "set", "field": "Brand", "value": "StepDay"}, {"op": "delete", "field": "BuyingPrice"}],
+      "price": {"fields": ["ProductPrice"], "multiplier": 1.15, "add": 0, "ending": "0.90"},
+      "canonical": "source"}]}
+
+rules ve rewrite satır içi ya da dosya yolu olabilir (feed_rules/feed_rewrite
+biçimi). Aşamalar bu sırayla uygulanır: where, code_prefix, rewrite, rules,
+price, canonical.
+
+Kullanım: python multi_store.py magazalar.json [işçi_sayısı]
+"""
+
+from __future__ import annotations
+
+import copy
+import gc
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from decimal import ROUND_FLOOR, ROUND_HALF_UP, Decimal
+from typing import Dict, List, Optional, Sequence
+
+from feed_canonical import load_profile, parse_decimal, write_sorted
+from feed_rewrite import Rewriter, load_table
+from feed_rules import compile_rules, load_rules
+from feed_stream import FeedReader, ProductWriter
+
+SOURCE_XML = "wagoon_source_pretty.xml"
+CODE_FIELDS = ("ProductCode", "Variants/Variant/VariantCode")
+PRICE_FIELDS = ("ProductPrice",)
+
+# fork öncesi ana işlemde doldurulur; işçiler copy-on-write olarak okur
+_SHARED: Dict = {}
+
+
+class PriceStage:
+    """Fiyat alanlarına çarpan/ek uygular; istenirse kuruş kısmını sabitler (x.90)."""
+
+    def __init__(self, spec: Dict):
+        self.fields = tuple(spec.get("fields", PRICE_FIELDS))
+        self.multiplier = Decimal(str(spec.get("multiplier", 1)))
+        self.add = Decimal(str(spec.get("add", 0)))
+        self.ending = None if spec.get("ending") is None else Decimal(str(spec["ending"]))
+        self.changed = 0
+
+    def price(self, value: Decimal) -> Decimal:
+        value = value * self.multiplier + self.add
+        if self.ending is not None:
+            # 1034.97 -> 1034.90; bitiş değerin üstündeyse bir alt birime iner
+            whole = value.to_integral_value(rounding=ROUND_FLOOR)
+            value = whole + self.ending if whole + self.ending <= value else whole - 1 + self.ending
+        return value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+    def apply(self, product) -> bool:
+        changed = False
+        for field in self.fields:
+            for elem in product.iterfind(field):
+                value = parse_decimal((elem.text or "").strip())
+                if value is None:
+                    continue
+                elem.text = str(self.price(value))
+                changed = True
+        self.changed += changed
+        return changed
+
+
+class StoreProfile:
+    """Tek mağazanın derlenmiş aşamaları."""
+
+    def __init__(self, spec: Dict):
+        if not spec.get("name") or not spec.get("output"):
+            raise ValueError(f"Mağaza için 'name' ve 'output' zorunlu: {spec}")
+        self.name: str = spec["name"]
+        self.output: str = spec["output"]
+        self.where = {field: {str(v) for v in (values if isinstance(values, list) else [values])}
+                      for field, values in spec.get("where", {}).items()}
+        self.steps = []
+        self.rule_plan = None
+        if spec.get("code_prefix"):
+            old, new = spec["code_prefix"]["from"], spec["code_prefix"]["to"]
+            rewriter = Rewriter([{"regex": "^" + re.escape(old), "replace": new}], CODE_FIELDS)
+            self.steps.append(rewriter.apply)
+        if spec.get("rewrite"):
+            table = spec["rewrite"]
+            if isinstance(table, str):
+                rules, fields = load_table(table)
+            else:
+                rules, fields = table.get("rules", []), table.get("fields")
+            self.steps.append(Rewriter(rules, fields).apply if fields else Rewriter(rules).apply)
+        if spec.get("rules"):
+            rules = spec["rules"]
+            self.rule_plan = compile_rules(load_rules(rules) if isinstance(rules, str) else rules)
+            self.steps.append(self.rule_plan.apply)
+        if spec.get("price"):
+            self.steps.append(PriceStage(spec["price"]).apply)
+        self.canonical = load_profile(spec["canonical"]) if spec.get("canonical") else None
+        if self.canonical is not None:
+            self.steps.append(self.canonical.apply)
+
+    def accepts(self, product) -> bool:
+        return all((product.findtext(field) or "").strip() in allowed for field, allowed in self.where.items())
+
+    def run(self, products: Sequence, tag: str, attrib: Dict[str, str]) -> Dict:
+        started = time.perf_counter()
+        directory = os.path.dirname(self.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with ProductWriter(self.output, tag, attrib) as writer:
+            selected = []
+            for product in products:
+                if self.where and not self.accepts(product):
+                    continue
+                for step in self.steps:
+                    step(product)
+                if self.canonical is None:
+                    writer.write(product)
+                else:
+                    selected.append(product)
+            if self.canonical is not None:
+                write_sorted(writer, selected, self.canonical)
+        result = {"name": self.name, "output": self.output, "products": writer.count,
+                  "seconds": time.perf_counter() - started, "pid": os.getpid()}
+        if self.rule_plan is not None:
+            result["rules"] = dict(self.rule_plan.stats)
+        return result
+
+
+def load_config(path: str) -> Dict:
+    with open(path, encoding="utf-8") as fh:
+        config = json.load(fh)
+    if not config.get("stores"):
+        raise ValueError(f"{path}: 'stores' listesi boş")
+    return config
+
+
+def _run_store(index: int) -> Dict:
+    """İşçi: fork ile gelen ürün ağacını kendi kopyası olarak değiştirir."""
+    profile = StoreProfile(_SHARED["stores"][index])
+    return profile.run(_SHARED["products"], _SHARED["tag"], _SHARED["attrib"])
+
+
+def run_stores(config: Dict, workers: Optional[int] = None) -> List[Dict]:
+    """Kaynağı bir kez ayrıştırır, her mağazayı ayrı işlemde çalıştırır; sonuçlar config sırasıyla."""
+    stores = config["stores"]
+    for spec in stores:
+        StoreProfile(spec)  # hatalı yapılandırma fork öncesi yakalansın
+
+    started = time.perf_counter()
+    reader = FeedReader(config.get("source", SOURCE_XML))
+    products = list(reader)
+    _SHARED.update(products=products, tag=reader.tag, attrib=reader.attrib, stores=stores,
+                   parse_seconds=time.perf_counter() - started)
+
+    workers = min(workers or os.cpu_count() or 1, len(stores))
+    if len(stores) == 1 or "fork" not in multiprocessing.get_all_start_methods():
+        results = []
+        for spec in stores:
+            own = products if len(stores) == 1 else [copy.deepcopy(p) for p in products]
+            results.append(StoreProfile(spec).run(own, reader.tag, reader.attrib))
+        return results
+
+    gc.freeze()
+    try:
+        context = multiprocessing.get_context("fork")
+        # maxtasksperchild=1: her mağaza ağacın el değmemiş kopyasıyla, ana işlemden yeni fork edilen
+        # bir işçide çalışır (ProcessPoolExecutor fork ile bunu desteklemiyor)
+        with context.Pool(workers, maxtasksperchild=1) as pool:
+            return pool.map(_run_store, range(len(stores)), chunksize=1)
+    finally:
+        gc.unfreeze()
+
+
+def print_summary(results: List[Dict], elapsed: float) -> None:
+    print(f"🏬 {len(results)} mağaza, kaynak bir kez ayrıştırıldı ({_SHARED.get('parse_seconds', 0):.2f} sn), "
+          f"toplam {elapsed:.2f} sn")
+    for result in results:
+        print(f"  • {result['name']}: {result['products']} ürün → {result['output']} ({result['seconds']:.2f} sn)")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Kullanım: python multi_store.py magazalar.json [işçi_sayısı]")
+        sys.exit(2)
+    workers = int(sys.argv[2]) if len(sys.argv) >= 3 else None
+    started = time.perf_counter()
+    results = run_stores(load_config(sys.argv[1]), workers)
+    print_summary(results, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
@@ -41,9 +41,9 @@ source_root = source_tree.getroot()
 # ProductCode -> Normalized Color eşlemesi
 product_colors = {}
 for product in source_root.findall('Product'):
-    code = product.find('ProductCode').text
+    code = product.findtext('ProductCode')
     color = product.find('Color')
-    if color is not None:
+    if code and color is not None:
         product_colors[code] = normalize_renk(color.text)
 
 # Hedef XML'i yükle
@@ -51,11 +51,13 @@ target_tree = ET.parse('stokmont_final_sdstep_titles_buyingprice_barcode_pretty.
 target_root = target_tree.getroot()
 
 for product in target_root.findall('Product'):
-    code = product.find('ProductCode').text
+    code = product.findtext('ProductCode')
+    if not code:
+        continue  # bozuk ürün: atla, bütün çalıştırmayı düşürme
     source_code = code.replace('SD-', 'WG-')
     color = product_colors.get(source_code, None)
     if color:
-        for variant in product.find('Variants').findall('Variant'):
+        for variant in product.iterfind('Variants/Variant'):
             # Renk varyantı varsa güncelle, yoksa ekle
             renk_var = False
             for i in range(1, 6):
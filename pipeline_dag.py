@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+
+"""
+Aşama bağımlılık grafiği (DAG) ile çalıştırıcı ve aşama çıktılarının önbelleği.
+
+Scriptler arasındaki sıra bugün sadece kafalarda: add_color,
+move_color_to_variant'tan önce çalışmalı; fix_categories kaynak feed'e
+ihtiyaç duyar; validate en sonda çalışır. Burada her aşama okuduğu ve
+yazdığı dosyaları (ve bilgi amaçlı alanları) bildirir; bağımlılıklar
+bildirim sırasından çıkarılır:
+
+  - bir dosyayı okuyan aşama, o dosyayı kendisinden önce yazan son aşamayı bekler
+  - bir dosyayı yazan aşama, önceki yazanı ve o yazandan sonraki okuyanları
+    bekler (scriptlerin çoğu final XML'i yerinde değiştirdiği için)
+  - "after" ile ek bağımlılık verilebilir
+
+Birbirini beklemeyen aşamalar paralel çalışır. Her aşamanın çıktısı, girdi
+dosyalarının hash'i + aşamanın kod sürümü (script ve import ettiği yerel
+modüllerin hash'i, ayrıca "version") + komut satırından oluşan bir anahtarla
+.pipeline_cache/ altında saklanır. Anahtar daha önce görüldüyse aşama
+çalışmaz, çıktısı önbellekten geri yüklenir; yani sadece gerçek bir
+değişikliğin aşağısındaki aşamalar yeniden çalışır. Yerinde değiştirilen
+dosyalar her çalıştırmada zincir başındaki hallerine döndürülür (bkz.
+StageCache.rewind), böylece anahtarlar çalıştırmalar arasında tutarlıdır.
+Çıktısı olmayan aşamalar (validate) için başarılı sonuç ve ekran çıktısı
+saklanır.
+
+Aşama tanımı (JSON listesi ya da {"stages": [...]}):
+
+  {"name": "add_color", "run": ["add_color.py"],
+   "inputs": ["wagoon_source_pretty.xml", "stokmont_final_...xml"],
+   "outputs": ["stokmont_final_...xml"],
+   "fields": {"reads": ["Color"], "writes": ["Color"]},
+   "after": [], "version": "1"}
+
+Kullanım: python pipeline_dag.py [pipeline.json] [plan|run] [--force aşama ...]
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+FINAL_XML = "stokmont_final_sdstep_titles_buyingprice_barcode_pretty.xml"
+SOURCE_XML = "wagoon_source.xml"
+SOURCE_PRETTY_XML = "wagoon_source_pretty.xml"
+CACHE_DIR = ".pipeline_cache"
+
+DEFAULT_PIPELINE: List[Dict] = [
+    {"name": "pretty_source", "run": ["pretty_wagoon_source.py"],
+     "inputs": [SOURCE_XML], "outputs": [SOURCE_PRETTY_XML]},
+    {"name": "add_color", "run": ["add_color.py"],
+     "inputs": [SOURCE_PRETTY_XML, FINAL_XML], "outputs": [FINAL_XML],
+     "fields": {"reads": ["Color"], "writes": ["Color"]}},
+    {"name": "normalize_colors", "run": ["normalize_colors.py"],
+     "inputs": [SOURCE_PRETTY_XML, FINAL_XML], "outputs": [FINAL_XML],
+     "fields": {"reads": ["Color"], "writes": ["Color"]}},
+    {"name": "move_color_to_variant", "run": ["move_color_to_variant.py"],
+     "inputs": [SOURCE_PRETTY_XML, FINAL_XML], "outputs": [FINAL_XML],
+     "fields": {"reads": ["Color"], "writes": ["Variants/Variant"]}},
+    {"name": "fix_categories", "run": ["fix_categories.py"],
+     "inputs": [SOURCE_PRETTY_XML, FINAL_XML], "outputs": [FINAL_XML],
+     "fields": {"reads": ["Categories/CategoryPath"], "writes": ["Category"]}},
+    {"name": "add_desi_info", "run": ["add_desi_info.py"],
+     "inputs": [FINAL_XML], "outputs": [FINAL_XML], "fields": {"writes": ["Desi"]}},
+    {"name": "add_gtins", "run": ["add_gtins.py"],
+     "inputs": [SOURCE_PRETTY_XML, FINAL_XML], "outputs": [FINAL_XML],
+     "fields": {"reads": ["Gtin"], "writes": ["Gtin", "Variants/Variant/Gtin"]}},
+    {"name": "validate", "run": ["validate_final_xml.py"], "inputs": [FINAL_XML], "outputs": []},
+]
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def local_imports(script: str, root: str = ".") -> List[str]:
+    """Script'in (dolaylı olarak) import ettiği, root altındaki modül dosyaları."""
+    seen: List[str] = []
+    pending = [script]
+    while pending:
+        path = pending.pop()
+        if path in seen or not os.path.exists(path):
+            continue
+        seen.append(path)
+        with open(path, encoding="utf-8") as fh:
+            tree = ast.parse(fh.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                candidate = os.path.join(root, name.split(".")[0] + ".py")
+                if os.path.exists(candidate):
+                    pending.append(candidate)
+    return sorted(seen)
+
+
+class Stage:
+    def __init__(self, spec: Dict, position: int):
+        if not spec.get("name") or not spec.get("run"):
+            raise ValueError(f"Aşama #{position} için 'name' ve 'run' zorunlu")
+        self.name: str = spec["name"]
+        self.run: List[str] = [str(a) for a in spec["run"]]
+        self.inputs: List[str] = list(spec.get("inputs", []))
+        self.outputs: List[str] = list(spec.get("outputs", []))
+        self.fields: Dict[str, List[str]] = spec.get("fields", {})
+        self.after: List[str] = list(spec.get("after", []))
+        self.version: str = str(spec.get("version", ""))
+        self.code: List[str] = list(spec.get("code", []))
+        self.deps: Set[str] = set()
+
+    def command(self) -> List[str]:
+        return [sys.executable, *self.run] if self.run[0].endswith(".py") else list(self.run)
+
+    def code_version(self) -> str:
+        digest = hashlib.sha256(self.version.encode("utf-8"))
+        files = set(self.code)
+        if self.run[0].endswith(".py"):
+            files.update(local_imports(self.run[0]))
+        for path in sorted(files):
+            digest.update(path.encode("utf-8") + b"\0" + file_hash(path).encode("ascii"))
+        return digest.hexdigest()
+
+    def cache_key(self) -> str:
+        """Girdi içerikleri + kod sürümü + komut; girdi eksikse FileNotFoundError."""
+        digest = hashlib.sha256()
+        digest.update(json.dumps([self.name, self.run, self.outputs]).encode("utf-8"))
+        digest.update(self.code_version().encode("ascii"))
+        for path in self.inputs:
+            digest.update(path.encode("utf-8") + b"\0" + file_hash(path).encode("ascii"))
+        return digest.hexdigest()
+
+
+def build_graph(stages: Sequence[Stage]) -> Dict[str, Stage]:
+    """Bildirim sırasından okuma/yazma bağımlılıklarını çıkarır."""
+    by_name: Dict[str, Stage] = {}
+    last_writer: Dict[str, str] = {}
+    readers_since: Dict[str, List[str]] = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Aşama adı tekrar ediyor: {stage.name}")
+        for name in stage.after:
+            if name not in by_name:
+                raise ValueError(f"{stage.name}: 'after' içindeki {name} daha önce tanımlanmalı")
+            stage.deps.add(name)
+        for path in stage.inputs:
+            if path in last_writer:
+                stage.deps.add(last_writer[path])
+        for path in stage.outputs:
+            if path in last_writer:
+                stage.deps.add(last_writer[path])
+            stage.deps.update(r for r in readers_since.get(path, ()) if r != stage.name)
+        for path in stage.inputs:
+            readers_since.setdefault(path, []).append(stage.name)
+        for path in stage.outputs:
+            last_writer[path] = stage.name
+            readers_since[path] = []
+        by_name[stage.name] = stage
+    return by_name
+
+
+def downstream(graph: Dict[str, Stage], names: Iterable[str]) -> Set[str]:
+    result = set(names)
+    changed = True
+    while changed:
+        changed = False
+        for stage in graph.values():
+            if stage.name not in result and stage.deps & result:
+                result.add(stage.name)
+                changed = True
+    return result
+
+
+class StageCache:
+    """Aşama sonuçları: .pipeline_cache/stages/<anahtar>.json + içerik adresli çıktı blob'ları."""
+
+    def __init__(self, root: str = CACHE_DIR):
+        self.root = root
+        self.objects = os.path.join(root, "objects")
+        self.stages = os.path.join(root, "stages")
+        os.makedirs(self.objects, exist_ok=True)
+        os.makedirs(self.stages, exist_ok=True)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.stages, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        path = self._entry_path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as fh:
+            entry = json.load(fh)
+        if all(self.has(digest) for digest in entry["outputs"].values()):
+            return entry
+        return None
+
+    def store(self, path: str) -> str:
+        """Dosyayı blob olarak saklar; hash'ini döner."""
+        digest = file_hash(path)
+        blob = os.path.join(self.objects, digest)
+        if not os.path.exists(blob):
+            shutil.copyfile(path, f"{blob}.tmp")
+            os.replace(f"{blob}.tmp", blob)
+        return digest
+
+    def has(self, digest: str) -> bool:
+        return os.path.exists(os.path.join(self.objects, digest))
+
+    def place(self, digest: str, path: str) -> bool:
+        """Blob'u path'e yazar; içerik zaten aynıysa dokunmaz."""
+        if os.path.exists(path) and file_hash(path) == digest:
+            return False
+        shutil.copyfile(os.path.join(self.objects, digest), f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+        return True
+
+    def put(self, key: str, stage: Stage, log: str) -> Dict:
+        outputs = {path: self.store(path) for path in stage.outputs}
+        entry = {"stage": stage.name, "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "outputs": outputs, "log": log}
+        with open(f"{self._entry_path(key)}.tmp", "w", encoding="utf-8") as fh:
+            json.dump(entry, fh, ensure_ascii=False)
+        os.replace(f"{self._entry_path(key)}.tmp", self._entry_path(key))
+        return entry
+
+    def restore(self, entry: Dict) -> int:
+        return sum(self.place(digest, path) for path, digest in entry["outputs"].items())
+
+    # --- yerinde değiştirilen dosyalar -------------------------------------
+    #
+    # Scriptler final XML'i yerinde değiştirdiği için bir sonraki çalıştırmada
+    # dosya, zincirin ilk aşamasının değil son aşamasının çıktısıdır. Her
+    # çıktı dosyasının çalıştırma başındaki hali (base) ve sonundaki hali
+    # (final) saklanır; dosya hâlâ geçen çalıştırmanın final'i ise zincir
+    # base'den başlatılır. Dosya dışarıdan değiştiyse yeni base odur.
+
+    def _state_path(self) -> str:
+        return os.path.join(self.root, "state.json")
+
+    def load_state(self) -> Dict[str, Dict]:
+        if not os.path.exists(self._state_path()):
+            return {}
+        with open(self._state_path(), encoding="utf-8") as fh:
+            return json.load(fh)
+
+    def save_state(self, state: Dict[str, Dict]) -> None:
+        with open(f"{self._state_path()}.tmp", "w", encoding="utf-8") as fh:
+            json.dump(state, fh, indent=2)
+        os.replace(f"{self._state_path()}.tmp", self._state_path())
+
+    def rewind(self, paths: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Çıktı dosyalarını zincir başındaki hallerine döndürür; path -> base hash."""
+        state = self.load_state()
+        bases: Dict[str, Optional[str]] = {}
+        for path in paths:
+            current = file_hash(path) if os.path.exists(path) else None
+            previous = state.get(path, {})
+            if current is not None and current == previous.get("final") and previous.get("base") \
+                    and self.has(previous["base"]):
+                self.place(previous["base"], path)
+                bases[path] = previous["base"]
+            else:
+                bases[path] = self.store(path) if current is not None else None
+        return bases
+
+    def record(self, bases: Dict[str, Optional[str]]) -> None:
+        state = self.load_state()
+        for path, base in bases.items():
+            state[path] = {"base": base, "final": file_hash(path) if os.path.exists(path) else None}
+        self.save_state(state)
+
+
+class StageResult:
+    __slots__ = ("name", "status", "seconds", "log")
+
+    def __init__(self, name: str, status: str, seconds: float = 0.0, log: str = ""):
+        self.name = name
+        self.status = status    # ran | cached | failed | skipped
+        self.seconds = seconds
+        self.log = log
+
+
+def _execute(stage: Stage, cache: StageCache, force: bool) -> StageResult:
+    started = time.perf_counter()
+    try:
+        key = stage.cache_key()
+    except FileNotFoundError as e:
+        return StageResult(stage.name, "failed", 0.0, f"Girdi yok: {e.filename}")
+    entry = None if force else cache.get(key)
+    if entry is not None:
+        cache.restore(entry)
+        return StageResult(stage.name, "cached", time.perf_counter() - started, entry["log"])
+    env = dict(os.environ, WAGOON_NONINTERACTIVE="1")
+    proc = subprocess.run(stage.command(), capture_output=True, text=True, env=env, stdin=subprocess.DEVNULL)
+    log = proc.stdout + proc.stderr
+    if proc.returncode != 0:
+        return StageResult(stage.name, "failed", time.perf_counter() - started, log)
+    cache.put(key, stage, log)
+    return StageResult(stage.name, "ran", time.perf_counter() - started, log)
+
+
+def run_pipeline(specs: Sequence[Dict], workers: Optional[int] = None, force: Sequence[str] = (),
+                 cache_dir: str = CACHE_DIR, on_result=None) -> List[StageResult]:
+    """Aşamaları bağımlılık sırasıyla, bağımsız olanları paralel çalıştırır."""
+    graph = build_graph([Stage(spec, i) for i, spec in enumerate(specs, 1)])
+    forced = downstream(graph, force) if force else set()
+    cache = StageCache(cache_dir)
+    bases = cache.rewind(sorted({path for stage in graph.values() for path in stage.outputs}))
+    try:
+        return _schedule(graph, cache, workers, forced, on_result)
+    finally:
+        cache.record(bases)
+
+
+def _schedule(graph: Dict[str, Stage], cache: StageCache, workers: Optional[int], forced: Set[str],
+              on_result) -> List[StageResult]:
+    done: Dict[str, StageResult] = {}
+    pending = dict(graph)
+    running = {}
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if any(dep not in done for dep in stage.deps):
+                    continue
+                del pending[name]
+                if any(done[dep].status in ("failed", "skipped") for dep in stage.deps):
+                    done[name] = StageResult(name, "skipped")
+                    if on_result:
+                        on_result(done[name])
+                    continue
+                running[pool.submit(_execute, stage, cache, name in forced)] = name
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                result = future.result()
+                done[running.pop(future)] = result
+                if on_result:
+                    on_result(result)
+    return [done[name] for name in graph]
+
+
+def load_pipeline(path: Optional[str]) -> List[Dict]:
+    if path is None:
+        return DEFAULT_PIPELINE
+    with open(path, encoding="utf-8") as fh:
+        data = json.load(fh)
+    return data.get("stages", []) if isinstance(data, dict) else data
+
+
+STATUS_ICONS = {"ran": "▶️ ", "cached": "♻️ ", "failed": "❌", "skipped": "⏭️ "}
+
+
+def print_result(result: StageResult) -> None:
+    print(f"{STATUS_ICONS[result.status]} {result.name}: {result.status} ({result.seconds:.2f} sn)")
+    if result.status == "failed" and result.log:
+        for line in result.log.strip().splitlines()[-10:]:
+            print(f"     {line}")
+
+
+def print_plan(specs: Sequence[Dict]) -> None:
+    graph = build_graph([Stage(spec, i) for i, spec in enumerate(specs, 1)])
+    level: Dict[str, int] = {}
+    for name, stage in graph.items():
+        level[name] = 1 + max((level[d] for d in stage.deps), default=0)
+    for name, stage in graph.items():
+        deps = ", ".join(sorted(stage.deps)) or "-"
+        fields = stage.fields.get("writes")
+        print(f"  {level[name]:2}. {name:24} ← {deps}" + (f"  (yazar: {', '.join(fields)})" if fields else ""))
+
+
+def main():
+    args = sys.argv[1:]
+    force: List[str] = []
+    if "--force" in args:
+        i = args.index("--force")
+        force, args = args[i + 1:], args[:i]
+    path = next((a for a in args if a.endswith(".json")), None)
+    specs = load_pipeline(path)
+    if "plan" in args:
+        print_plan(specs)
+        return
+    started = time.perf_counter()
+    results = run_pipeline(specs, force=force, on_result=print_result)
+    counts = {s: sum(r.status == s for r in results) for s in STATUS_ICONS}
+    print(f"📊 {counts['ran']} çalıştı, {counts['cached']} önbellekten, {counts['failed']} hata, "
+          f"{counts['skipped']} atlandı - {time.perf_counter() - started:.2f} sn")
+    sys.exit(1 if counts["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
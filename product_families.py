@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+
+"""
+Renk seçeneklerini (colorway) model ailelerine gruplama.
+
+Kaynak her rengi ayrı bir ürün olarak modelliyor (WG-500-BEYAZ, WG-500-HAKİ,
+...); ortak model numarası ProductName içinde duruyor ("WG500"). Aralarında
+bir ilişki olmadığı için ortak içerik (açıklama, kategori, fiyat) her renk
+için ayrı ayrı işleniyor ve saklanıyor.
+
+Her ürün için üç hash anahtarı üretilir:
+
+  stem:  ProductCode'un rakam içeren ilk parçasına kadarki kısmı (WG-500)
+  model: ProductName içindeki harf+rakam model kodu (WG500)
+  name:  renk kelimeleri çıkarılmış, Türkçe katlanmış ad
+
+Aynı anahtarı paylaşan ürünler birleşim-bul (union-find) ile aynı aileye
+girer; anahtar başına bir sözlük araması yapıldığı için süre ürün sayısıyla
+doğrusala yakındır. Ailede bütün üyelerde aynı olan alanlar "ortak alan"
+olarak çıkarılır.
+
+Aile indeksi (JSON) aşamaların ortak alanları aile başına bir kez
+işlemesine (FamilyMemo) ve çıktıların ebeveyn/varyant hiyerarşisi
+yayınlamasına (FamilyStage -> ParentCode, hierarchy) yarar.
+
+Kullanım: python product_families.py [feed.xml] [families.json]
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from feed_records import GROUP_FIELDS
+from feed_stream import iter_products
+from search_index import fold, terms
+
+SOURCE_XML = "wagoon_source_pretty.xml"
+FAMILIES_JSON = "families.json"
+PARENT_FIELD = "ParentCode"
+
+# Ürün başına değişen, aile ortak alanı sayılmayacak alanlar
+MEMBER_FIELDS = frozenset((
+    "ProductId", "ProductCode", "ProductName", "Gtin", "Barcode", "Color",
+    "StockQuantity", "Quantity", "ProductSameColors", PARENT_FIELD,
+))
+
+COLOR_WORDS = frozenset(fold(w) for w in (
+    "Beyaz", "Siyah", "Kömür", "Gri", "Füme", "Mor", "Haki", "Lacivert", "Mavi", "Kırmızı", "Bordo",
+    "Sarı", "Pembe", "Yeşil", "Turuncu", "Kahve", "Kahverengi", "Taba", "Bej", "Krem", "Camel",
+    "Vizon", "Ekru", "Antrasit", "Hardal", "Pudra", "Lila", "Gümüş", "Altın", "Bronz", "Açık", "Koyu",
+))
+
+_MODEL = re.compile(r"\b([A-Za-z]{1,4})[- ]?(\d{2,5}[A-Za-z]?)\b")
+
+
+def code_stem(code: str) -> Optional[str]:
+    """'WG-500-BEYAZ' -> 'WG-500'; rakamlı parça yoksa None."""
+    parts = code.split("-")
+    for i, part in enumerate(parts):
+        if any(ch.isdigit() for ch in part):
+            return "-".join(parts[:i + 1]) if i + 1 < len(parts) else None
+    return None
+
+
+def model_token(name: str) -> Optional[str]:
+    """'Wagoon  WG500 Köpekbalığı ...' -> 'WG500'."""
+    match = _MODEL.search(name)
+    return (match.group(1) + match.group(2)).upper() if match else None
+
+
+def name_key(name: str, color: str = "") -> Optional[str]:
+    """Renk kelimeleri çıkarılmış katlanmış ad; model kodu yoksa None (çok genel)."""
+    words = [w for w in terms(name) if w not in COLOR_WORDS and w not in terms(color)]
+    if not any(ch.isdigit() for w in words for ch in w):
+        return None
+    return " ".join(words)
+
+
+def family_keys(code: str, name: str, color: str = "") -> List[str]:
+    keys = []
+    stem = code_stem(code)
+    if stem:
+        keys.append(f"stem:{fold(stem)}")
+    model = model_token(name)
+    if model:
+        keys.append(f"model:{model}")
+    named = name_key(name, color)
+    if named:
+        keys.append(f"name:{named}")
+    return keys
+
+
+def _leaf_fields(product) -> Dict[str, str]:
+    """Üst seviye yapraklar ve Categories/CategoryPath gibi grup yaprakları."""
+    found: Dict[str, str] = {}
+    for child in product:
+        if len(child) == 0:
+            if child.tag not in MEMBER_FIELDS:
+                found[child.tag] = (child.text or "").strip()
+        elif child.tag in GROUP_FIELDS:
+            for leaf in child:
+                found[f"{child.tag}/{leaf.tag}"] = (leaf.text or "").strip()
+    return found
+
+
+class _DisjointSet:
+    def __init__(self):
+        self.parent: List[int] = []
+
+    def add(self) -> int:
+        self.parent.append(len(self.parent))
+        return len(self.parent) - 1
+
+    def find(self, i: int) -> int:
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, a: int, b: int) -> None:
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+
+class FamilyIndex:
+    """ProductCode -> aile ve aile -> üyeler/ortak alanlar."""
+
+    def __init__(self, families: Dict[str, Dict]):
+        self.families = families
+        self.by_code: Dict[str, str] = {
+            member["code"]: family_id for family_id, family in families.items() for member in family["members"]
+        }
+
+    @classmethod
+    def build(cls, products: Iterable) -> "FamilyIndex":
+        sets = _DisjointSet()
+        first_with_key: Dict[str, int] = {}
+        members: List[Dict] = []
+        fields: List[Dict[str, str]] = []
+        for product in products:
+            code = (product.findtext("ProductCode") or "").strip()
+            if not code:
+                continue
+            name = " ".join((product.findtext("ProductName") or "").split())
+            color = (product.findtext("Color") or "").strip()
+            i = sets.add()
+            members.append({"code": code, "name": name, "color": color, "model": model_token(name)})
+            fields.append(_leaf_fields(product))
+            for key in family_keys(code, name, color):
+                j = first_with_key.setdefault(key, i)
+                if j != i:
+                    sets.union(i, j)
+
+        groups: Dict[int, List[int]] = {}
+        for i in range(len(members)):
+            groups.setdefault(sets.find(i), []).append(i)
+
+        families: Dict[str, Dict] = {}
+        for indices in groups.values():
+            group = [members[i] for i in indices]
+            models = Counter(m["model"] for m in group if m["model"])
+            family_id = models.most_common(1)[0][0] if models else (code_stem(group[0]["code"]) or group[0]["code"])
+            if family_id in families:
+                family_id = group[0]["code"]
+            first = fields[indices[0]]
+            common = {f: v for f, v in first.items() if all(fields[i].get(f) == v for i in indices[1:])}
+            families[family_id] = {
+                "members": [{"code": m["code"], "color": m["color"]} for m in group],
+                "shared": common,
+            }
+        return cls(families)
+
+    @classmethod
+    def from_feed(cls, source, **options) -> "FamilyIndex":
+        return cls.build(iter_products(source, **options))
+
+    @classmethod
+    def load(cls, path: str = FAMILIES_JSON) -> "FamilyIndex":
+        with open(path, encoding="utf-8") as fh:
+            return cls(json.load(fh)["families"])
+
+    def save(self, path: str = FAMILIES_JSON) -> None:
+        with open(f"{path}.tmp", "w", encoding="utf-8") as fh:
+            json.dump({"families": self.families}, fh, ensure_ascii=False, indent=1)
+        os.replace(f"{path}.tmp", path)
+
+    def family_of(self, code: str) -> Optional[str]:
+        return self.by_code.get(code)
+
+    def members(self, family_id: str) -> List[str]:
+        return [m["code"] for m in self.families[family_id]["members"]]
+
+    def shared(self, family_id: str) -> Dict[str, str]:
+        return self.families[family_id]["shared"]
+
+    def hierarchy(self, min_size: int = 1) -> List[Dict]:
+        """Ebeveyn/varyant listesi: ebeveyn ortak alanları, çocuklar kod ve renk."""
+        return [
+            {"parent": family_id, "shared": family["shared"], "children": family["members"]}
+            for family_id, family in sorted(self.families.items())
+            if len(family["members"]) >= min_size
+        ]
+
+    def __len__(self) -> int:
+        return len(self.families)
+
+
+class FamilyMemo:
+    """Ortak alandan türetilen değeri aile başına bir kez hesaplar.
+
+        memo = FamilyMemo(index)
+        parsed = memo.get(product, "FullDescription", descriptions.parse)
+
+    Alan ailede ortak değilse (ya da ürün ailesizse) değer her ürün için hesaplanır.
+    """
+
+    def __init__(self, index: FamilyIndex):
+        self.index = index
+        self._cache: Dict[Tuple[str, str, Callable], object] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, product, field: str, compute: Callable[[str], object]):
+        value = (product.findtext(field) or "").strip()
+        family_id = self.index.family_of((product.findtext("ProductCode") or "").strip())
+        if family_id is None or self.index.shared(family_id).get(field) != value:
+            self.misses += 1
+            return compute(value)
+        key = (family_id, field, compute)
+        if key in self._cache:
+            self.hits += 1
+            return self._cache[key]
+        self.misses += 1
+        result = self._cache[key] = compute(value)
+        return result
+
+
+class FamilyStage:
+    """Pipeline aşaması: ürüne ailesinin kodunu (ParentCode) yazar."""
+
+    def __init__(self, index: FamilyIndex, field: str = PARENT_FIELD, min_size: int = 2):
+        self.index = index
+        self.field = field
+        self.min_size = min_size
+        self.assigned = 0
+
+    def apply(self, product) -> bool:
+        family_id = self.index.family_of((product.findtext("ProductCode") or "").strip())
+        if family_id is None or len(self.index.families[family_id]["members"]) < self.min_size:
+            return False
+        elem = product.find(self.field)
+        if elem is None:
+            elem = product.makeelement(self.field, {})
+            product.append(elem)
+        if elem.text == family_id:
+            return False
+        elem.text = family_id
+        self.assigned += 1
+        return True
+
+
+def print_summary(index: FamilyIndex, products: int) -> None:
+    sizes = Counter(len(f["members"]) for f in index.families.values())
+    multi = sum(n for size, n in sizes.items() if size > 1)
+    print(f"👪 {products} ürün → {len(index)} aile ({multi} aile birden fazla renkli, "
+          f"en büyük {max(sizes) if sizes else 0} üye)")
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) >= 2 else SOURCE_XML
+    output = sys.argv[2] if len(sys.argv) >= 3 else FAMILIES_JSON
+    index = FamilyIndex.from_feed(source)
+    index.save(output)
+    print_summary(index, len(index.by_code))
+    print(f"💾 Aile indeksi: {output}")
+
+
+if __name__ == "__main__":
+    main()
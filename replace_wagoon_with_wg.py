@@ -1,22 +1,8 @@
-import xml.etree.ElementTree as ET
+from feed_rewrite import rewrite_feed
 
-# XML'i yükle
-tree = ET.parse('stokmont_final_sdstep_titles_buyingprice_barcode_pretty.xml')
-root = tree.getroot()
+FINAL_XML = 'stokmont_final_sdstep_titles_buyingprice_barcode_pretty.xml'
 
-# Tüm elementlerde text değiştir
-def replace_text(element):
-    if element.text:
-        element.text = element.text.replace('Wagoon', 'WG')
-    if element.tail:
-        element.tail = element.tail.replace('Wagoon', 'WG')
-    for child in element:
-        replace_text(child)
+# Tüm elementlerde text değiştir (fields=None: ürün içindeki bütün metinler)
+rewriter = rewrite_feed(FINAL_XML, FINAL_XML, [{'find': 'Wagoon', 'replace': 'WG'}], fields=None)
 
-replace_text(root)
-
-# Pretty print ile kaydet
-ET.indent(tree, space="  ", level=0)
-tree.write('stokmont_final_sdstep_titles_buyingprice_barcode_pretty.xml', encoding='utf-8', xml_declaration=True)
-
-print("Tüm 'Wagoon' kelimeleri 'WG' ile değiştirildi.")
\ No newline at end of file
+print(f"Tüm 'Wagoon' kelimeleri 'WG' ile değiştirildi. ({rewriter.counts['Wagoon']} değişiklik)")
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+
+"""
+Ürün adı, açıklama ve özellikleri için tam metin arama indeksi (SQLite FTS5).
+
+ProductName ("Wagoon WG500 Köpekbalığı Beyaz Unisex ...") ve FullDescription
+HTML'inde bugün sadece grep ile arama yapılabiliyor. Bu modül indeksi
+pipeline geçişi sırasında (SearchStage) ya da bir feed'den kurar:
+
+  - metin Türkçe kurallarla küçültülür ve katlanır (I->ı, İ->i, sonra
+    ı/ğ/ş/ç/ö/ü -> i/g/s/c/o/u); "kopekbaligi", "KÖPEKBALIĞI" ve
+    "köpekbalığı" aynı terimdir
+  - açıklama description_parser ile (içerik hash'ine göre memoize) düz
+    metne ve özelliklere ayrılır
+  - FTS5 tablosu sütun düzeyinde (detail=column) tutulur, 2 ve 3 harflik
+    önek indeksleri vardır; değişmeyen ürünler yeniden yazılmaz, feed'den
+    kalkan ürünler indeksten silinir
+
+Sorgular bm25 ile sıralanır (kod ve ad, açıklamadan daha ağır); her terim
+varsayılan olarak önek araması yapar ("köpek" -> köpekbalığı).
+
+Kullanım: python search_index.py build [feed.xml] | python search_index.py "arama metni"
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+import sys
+import time
+from typing import List, NamedTuple, Optional
+
+from description_parser import DescriptionProcessor
+from feed_stream import iter_products
+
+SOURCE_XML = "wagoon_source_pretty.xml"
+SEARCH_DB = "search_index.sqlite"
+
+DESCRIPTION_FIELDS = ("FullDescription", "Description")
+EXTRA_FIELDS = ("Color", "Brand", "Category", "CategoryName", "CategoryPath", "ManufacturerName")
+# bm25 sütun ağırlıkları: code, name, description, attributes
+WEIGHTS = (4.0, 3.0, 1.0, 2.0)
+
+_FOLD = str.maketrans({"ı": "i", "ğ": "g", "ş": "s", "ç": "c", "ö": "o", "ü": "u", "â": "a", "î": "i", "û": "u"})
+_TERMS = re.compile(r"\w+")
+
+
+def fold(text: str) -> str:
+    """Türkçe duyarlı küçültme + aksan katlama."""
+    return text.replace("I", "ı").replace("İ", "i").lower().translate(_FOLD)
+
+
+def terms(text: str) -> List[str]:
+    return _TERMS.findall(fold(text))
+
+
+class Hit(NamedTuple):
+    code: str
+    name: str
+    score: float
+
+
+class SearchIndex:
+    def __init__(self, path: str = SEARCH_DB):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY, code TEXT UNIQUE NOT NULL, name TEXT, digest TEXT, generation INTEGER
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS fts USING fts5(
+                code, name, description, attributes,
+                tokenize = 'unicode61 remove_diacritics 0', prefix = '2 3', detail = column
+            );
+            """
+        )
+        self.generation = (self.conn.execute("SELECT MAX(generation) FROM docs").fetchone()[0] or 0) + 1
+        self.added = self.updated = self.unchanged = 0
+
+    def add(self, code: str, name: str, description: str, attributes: str) -> None:
+        """Ürünü indeksler; metni değişmediyse sadece görüldü olarak işaretler."""
+        columns = (fold(code), fold(name), fold(description), fold(attributes))
+        digest = hashlib.blake2b("\x1f".join(columns).encode("utf-8"), digest_size=16).hexdigest()
+        row = self.conn.execute("SELECT id, digest FROM docs WHERE code = ?", (code,)).fetchone()
+        if row is not None and row[1] == digest:
+            self.conn.execute("UPDATE docs SET generation = ? WHERE id = ?", (self.generation, row[0]))
+            self.unchanged += 1
+            return
+        if row is None:
+            doc_id = self.conn.execute(
+                "INSERT INTO docs (code, name, digest, generation) VALUES (?, ?, ?, ?)",
+                (code, name, digest, self.generation),
+            ).lastrowid
+            self.added += 1
+        else:
+            doc_id = row[0]
+            self.conn.execute(
+                "UPDATE docs SET name = ?, digest = ?, generation = ? WHERE id = ?",
+                (name, digest, self.generation, doc_id),
+            )
+            self.conn.execute("DELETE FROM fts WHERE rowid = ?", (doc_id,))
+            self.updated += 1
+        self.conn.execute("INSERT INTO fts (rowid, code, name, description, attributes) VALUES (?, ?, ?, ?, ?)",
+                          (doc_id, *columns))
+
+    def commit(self, prune: bool = True) -> int:
+        """Değişiklikleri yazar; prune=True ise bu geçişte görülmeyen ürünleri siler."""
+        removed = 0
+        if prune:
+            stale = [row[0] for row in self.conn.execute(
+                "SELECT id FROM docs WHERE generation < ?", (self.generation,))]
+            self.conn.executemany("DELETE FROM fts WHERE rowid = ?", ((i,) for i in stale))
+            self.conn.executemany("DELETE FROM docs WHERE id = ?", ((i,) for i in stale))
+            removed = len(stale)
+        self.conn.commit()
+        if self.added or self.updated or removed:
+            self.conn.execute("INSERT INTO fts (fts) VALUES ('optimize')")
+            self.conn.commit()
+        return removed
+
+    @staticmethod
+    def match_expression(query: str, prefix: bool = True) -> str:
+        return " ".join(f'"{term}"*' if prefix else f'"{term}"' for term in terms(query))
+
+    def search(self, query: str, limit: int = 20, prefix: bool = True) -> List[Hit]:
+        expression = self.match_expression(query, prefix)
+        if not expression:
+            return []
+        rows = self.conn.execute(
+            f"SELECT d.code, d.name, bm25(fts, {', '.join(map(str, WEIGHTS))}) AS score"
+            " FROM fts JOIN docs d ON d.id = fts.rowid WHERE fts MATCH ? ORDER BY score LIMIT ?",
+            (expression, limit),
+        )
+        return [Hit(code, name, -score) for code, name, score in rows]
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class SearchStage:
+    """Pipeline aşaması: ürün elementini indekse ekler, ürünü değiştirmez."""
+
+    def __init__(self, index: SearchIndex, descriptions: Optional[DescriptionProcessor] = None):
+        self.index = index
+        self.descriptions = descriptions or DescriptionProcessor()
+
+    def apply(self, product) -> bool:
+        code = (product.findtext("ProductCode") or "").strip()
+        if not code:
+            return False
+        text = next((product.findtext(f) for f in DESCRIPTION_FIELDS if product.findtext(f)), "")
+        parsed = self.descriptions.parse(text)
+        extras = [product.findtext(f) or product.findtext(f"*/{f}") or "" for f in EXTRA_FIELDS]
+        attributes = " ".join([*parsed.attributes.values(), *extras])
+        variant_values = " ".join(v.text or "" for v in product.iterfind("Variants/Variant/VariantValue"))
+        self.index.add(code, (product.findtext("ProductName") or "").strip(),
+                       " ".join(parsed.lines), f"{attributes} {variant_values}")
+        return False
+
+
+def build_index(feed: str, path: str = SEARCH_DB) -> SearchIndex:
+    index = SearchIndex(path)
+    stage = SearchStage(index)
+    for product in iter_products(feed):
+        stage.apply(product)
+    index.commit()
+    return index
+
+
+def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == "build":
+        feed = sys.argv[2] if len(sys.argv) >= 3 else SOURCE_XML
+        started = time.perf_counter()
+        index = build_index(feed)
+        print(f"🔎 {len(index)} ürün indekslendi ({index.added} yeni, {index.updated} güncellendi, "
+              f"{index.unchanged} aynı) - {time.perf_counter() - started:.2f} sn")
+        index.close()
+        return
+    if len(sys.argv) < 2:
+        print('Kullanım: python search_index.py build [feed.xml] | python search_index.py "arama metni"')
+        sys.exit(2)
+    index = SearchIndex()
+    started = time.perf_counter()
+    hits = index.search(" ".join(sys.argv[1:]))
+    elapsed = (time.perf_counter() - started) * 1000
+    for hit in hits:
+        print(f"{hit.score:7.2f}  {hit.code:24} {hit.name}")
+    print(f"📊 {len(hits)} sonuç ({elapsed:.1f} ms)")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
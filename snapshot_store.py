@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+
+"""
+Yayınlanan feed'ler için içerik adresli snapshot deposu.
+
+Her çalıştırma final XML'in üzerine yazıyor; geçmiş yok, ama her günün tam
+kopyasını saklamak da israf. Depo her ürünü ayrı bir blob olarak saklar:
+
+  snapshots/objects/ab/cdef...   zlib ile sıkıştırılmış ürün XML'i,
+                                 adı içeriğin sha256'sı
+  snapshots/manifests/<ad>.json  kök etiketi/öznitelikleri ve sıralı
+                                 (ProductCode, hash) listesi
+  snapshots/CURRENT              en son yayınlanan (ya da geri dönülen) snapshot
+
+Değişmeyen ürün her gün aynı hash'i verir ve bir kez saklanır. Blob, ürünün
+ProductWriter'ın yazdığı biçimdeki (girintili) serileştirmesidir; bu yüzden
+bir snapshot blob'ları sırayla birleştirerek akış halinde, orijinal dosyayla
+bayt bayt aynı olarak yeniden kurulabilir. "X ürünü en son ne zaman
+değişti" sorusu sadece manifest'lerden cevaplanır.
+
+Kullanım: python snapshot_store.py save|list|rebuild|rollback|history|gc [...]
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import zlib
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from feed_stream import FeedReader, XML_DECLARATION, empty_root, open_tag, serialize_product
+import xml_backend
+
+FINAL_XML = "stokmont_final_sdstep_titles_buyingprice_barcode_pretty.xml"
+STORE_DIR = "snapshots"
+
+
+class SnapshotStore:
+    """Blob ve manifest dosyalarından oluşan depo."""
+
+    def __init__(self, root: str = STORE_DIR):
+        self.root = root
+        self.objects = os.path.join(root, "objects")
+        self.manifests_dir = os.path.join(root, "manifests")
+        os.makedirs(self.objects, exist_ok=True)
+        os.makedirs(self.manifests_dir, exist_ok=True)
+
+    # --- blob'lar ---------------------------------------------------------
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects, digest[:2], digest[2:])
+
+    def put(self, data: bytes) -> Tuple[str, bool]:
+        """Blob'u saklar; (hash, yeni mi) döner."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            return digest, False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(zlib.compress(data, 6))
+        os.replace(tmp, path)
+        return digest, True
+
+    def get(self, digest: str) -> bytes:
+        with open(self._object_path(digest), "rb") as fh:
+            return zlib.decompress(fh.read())
+
+    # --- manifest'ler -----------------------------------------------------
+
+    def _manifest_path(self, name: str) -> str:
+        if not name or os.sep in name or (os.altsep and os.altsep in name) or name.startswith("."):
+            raise ValueError(f"Geçersiz snapshot adı: {name!r}")
+        return os.path.join(self.manifests_dir, f"{name}.json")
+
+    def load(self, name: str) -> Dict:
+        path = self._manifest_path(name)
+        if not os.path.exists(path):
+            raise KeyError(f"Snapshot yok: {name}")
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+
+    def names(self) -> List[str]:
+        """Snapshot adları, oluşturulma sırasıyla."""
+        manifests = [self.load(f[:-5]) for f in os.listdir(self.manifests_dir) if f.endswith(".json")]
+        return [m["name"] for m in sorted(manifests, key=lambda m: (m["created"], m["name"]))]
+
+    @property
+    def current(self) -> Optional[str]:
+        path = os.path.join(self.root, "CURRENT")
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as fh:
+            return fh.read().strip() or None
+
+    def _set_current(self, name: str) -> None:
+        path = os.path.join(self.root, "CURRENT")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as fh:
+            fh.write(name + "\n")
+        os.replace(f"{path}.tmp", path)
+
+    def save(self, feed_path: str, name: Optional[str] = None) -> Dict:
+        """Feed'i akış halinde okuyup snapshot olarak kaydeder."""
+        name = name or datetime.now().strftime("%Y%m%d-%H%M%S")
+        if os.path.exists(self._manifest_path(name)):
+            raise ValueError(f"Snapshot zaten var: {name}")
+        reader = FeedReader(feed_path)
+        products: List[List[str]] = []
+        new_blobs = 0
+        for product in reader:
+            code = (product.findtext("ProductCode") or "").strip()
+            digest, new = self.put(serialize_product(product).encode("utf-8"))
+            products.append([code, digest])
+            new_blobs += new
+        manifest = {
+            "name": name,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "source": os.path.basename(feed_path),
+            "tag": reader.tag,
+            "attrib": reader.attrib,
+            "new_blobs": new_blobs,
+            "products": products,
+        }
+        tmp = f"{self._manifest_path(name)}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(manifest, fh, ensure_ascii=False)
+        os.replace(tmp, self._manifest_path(name))
+        self._set_current(name)
+        return manifest
+
+    def rebuild(self, name: str, output_path: str) -> int:
+        """Snapshot'ı feed dosyası olarak yazar; ürün sayısını döner."""
+        manifest = self.load(name)
+        tmp = f"{output_path}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(XML_DECLARATION.encode("utf-8"))
+            if not manifest["products"]:
+                fh.write(empty_root(manifest["tag"], manifest["attrib"]).encode("utf-8"))
+            else:
+                fh.write((open_tag(manifest["tag"], manifest["attrib"]) + "\n").encode("utf-8"))
+                for _, digest in manifest["products"]:
+                    fh.write(self.get(digest))
+                fh.write(f"</{manifest['tag']}>".encode("utf-8"))
+        os.replace(tmp, output_path)
+        return len(manifest["products"])
+
+    def products(self, name: str) -> Iterator:
+        """Snapshot'ın ürünlerini element olarak döndürür (dosya yazmadan)."""
+        for _, digest in self.load(name)["products"]:
+            yield xml_backend.fromstring(self.get(digest))
+
+    def rollback(self, name: str, target: str = FINAL_XML) -> int:
+        """Hedef feed'i snapshot'tan yeniden kurar ve CURRENT'ı ona çeker."""
+        count = self.rebuild(name, target)
+        self._set_current(name)
+        return count
+
+    def history(self, code: str) -> Iterator[Tuple[str, str, str]]:
+        """Ürünün değiştiği snapshot'lar: (ad, tarih, olay) - olay added/changed/removed."""
+        previous: Optional[str] = None
+        for name in self.names():
+            manifest = self.load(name)
+            digest = next((d for c, d in manifest["products"] if c == code), None)
+            if digest != previous:
+                event = "added" if previous is None else "removed" if digest is None else "changed"
+                yield name, manifest["created"], event
+            previous = digest
+
+    def last_changed(self, code: str) -> Optional[Tuple[str, str, str]]:
+        last = None
+        for last in self.history(code):
+            pass
+        return last
+
+    def gc(self) -> int:
+        """Hiçbir manifest'in kullanmadığı blob'ları siler."""
+        used = {digest for name in self.names() for _, digest in self.load(name)["products"]}
+        removed = 0
+        for prefix in os.listdir(self.objects):
+            directory = os.path.join(self.objects, prefix)
+            for rest in os.listdir(directory):
+                if prefix + rest not in used:
+                    os.remove(os.path.join(directory, rest))
+                    removed += 1
+        return removed
+
+    def delete(self, name: str) -> None:
+        """Manifest'i siler; blob'lar gc ile temizlenir."""
+        os.remove(self._manifest_path(name))
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("save", "list", "rebuild", "rollback", "history", "gc"):
+        print("Kullanım: python snapshot_store.py save [feed.xml] [ad] | list | rebuild ad çıktı.xml | "
+              "rollback ad [feed.xml] | history ProductCode | gc")
+        sys.exit(2)
+    command = sys.argv[1]
+    store = SnapshotStore()
+
+    if command == "save":
+        feed = sys.argv[2] if len(sys.argv) >= 3 else FINAL_XML
+        manifest = store.save(feed, sys.argv[3] if len(sys.argv) >= 4 else None)
+        print(f"📸 {manifest['name']}: {len(manifest['products'])} ürün, {manifest['new_blobs']} yeni blob")
+    elif command == "list":
+        current = store.current
+        for name in store.names():
+            manifest = store.load(name)
+            mark = "*" if name == current else " "
+            print(f"{mark} {name}  {manifest['created']}  {len(manifest['products'])} ürün, {manifest['new_blobs']} yeni blob")
+    elif command == "rebuild":
+        count = store.rebuild(sys.argv[2], sys.argv[3])
+        print(f"🧱 {sys.argv[2]}: {count} ürün → {sys.argv[3]}")
+    elif command == "rollback":
+        target = sys.argv[3] if len(sys.argv) >= 4 else FINAL_XML
+        count = store.rollback(sys.argv[2], target)
+        print(f"⏪ {target} → {sys.argv[2]} ({count} ürün)")
+    elif command == "history":
+        for name, created, event in store.history(sys.argv[2]):
+            print(f"{created}  {name}  {event}")
+    else:
+        print(f"🧹 {store.gc()} kullanılmayan blob silindi")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+"""
+Ürün stoku (StockQuantity/Quantity) ile varyant stoklarının
+(VariantStock/VariantQuantity) toplamını uzlaştırır.
+
+Kaynakta ürün seviyesinde bir StockQuantity (ör. 50) ve varyant başına
+VariantStock değerleri var; bunların toplamı her zaman tutmuyor.
+fix_missing_variants VariantStock'u VariantQuantity'ye taşıyor ama ürünün
+Quantity'si olduğu gibi kalıyor.
+
+Politikalar:
+  sum     ürün stoku = varyant stokları toplamı (varyantlar doğru kabul edilir)
+  min     ürün stoku = min(ürün stoku, varyant toplamı) (fazla satış olmasın)
+  source  değerlere dokunulmaz, sadece uyumsuzluklar raporlanır
+
+Her ürün için toplam tek bir sum(map(...)) ile alınır; aşama akış halinde
+çalıştığı için her stok güncelleme döngüsünde koşturulabilir. Uyumsuzluklar
+isteğe bağlı olarak CSV raporuna yazılır.
+
+Kullanım: python stock_reconcile.py [girdi.xml] [çıktı.xml] [sum|min|source] [rapor.csv]
+"""
+
+from __future__ import annotations
+
+import csv
+import sys
+from decimal import Decimal, InvalidOperation
+from typing import List, NamedTuple, Optional
+
+from feed_stream import FeedReader, ProductWriter
+
+FINAL_XML = "stokmont_final_sdstep_titles_buyingprice_barcode_pretty.xml"
+
+POLICIES = ("sum", "min", "source")
+PRODUCT_STOCK_FIELDS = ("StockQuantity", "Quantity")
+VARIANT_STOCK_FIELDS = ("VariantStock", "VariantQuantity")
+MAX_STOCK_DIGITS = 18
+
+
+class Mismatch(NamedTuple):
+    code: str
+    product_stock: int
+    variant_total: int
+    written: int
+    note: str
+
+
+def _stock(text: Optional[str]) -> Optional[int]:
+    """'12', '12.0', '12,5' -> tamsayı; sayı olmayan, sonsuz/NaN ya da 1e999 gibi değer için None."""
+    try:
+        value = Decimal((text or "").strip().replace(",", "."))
+    except InvalidOperation:
+        return None
+    if not value.is_finite() or value.adjusted() > MAX_STOCK_DIGITS:
+        return None
+    return int(value)
+
+
+def _variant_stock(variant) -> Optional[str]:
+    """Varyantın stok alanı her varyantta ayrı bulunur (VariantStock ya da VariantQuantity)."""
+    for field in VARIANT_STOCK_FIELDS:
+        text = variant.findtext(field)
+        if text is not None:
+            return text
+    return None
+
+
+class ReconcileStage:
+    """Ürün elementlerinde stokları politikaya göre uzlaştıran aşama."""
+
+    def __init__(self, policy: str = "sum"):
+        if policy not in POLICIES:
+            raise ValueError(f"Bilinmeyen politika: {policy} ({', '.join(POLICIES)})")
+        self.policy = policy
+        self.mismatches: List[Mismatch] = []
+        self.products = 0
+        self.updated = 0
+
+    def apply(self, product) -> bool:
+        self.products += 1
+        variants = product.findall("Variants/Variant")
+        if not variants:
+            return False
+        stocks = [_variant_stock(v) for v in variants]
+        product_elem = next((e for e in map(product.find, PRODUCT_STOCK_FIELDS) if e is not None), None)
+        if product_elem is None or all(text is None for text in stocks):
+            return False
+
+        values = [_stock(text) for text in stocks]
+        note = ""
+        if None in values:
+            note = "sayısal olmayan varyant stoku"
+        if any(v is not None and v < 0 for v in values):
+            note = note or "negatif varyant stoku"
+        total = sum(v for v in values if v is not None and v > 0)
+        current = _stock(product_elem.text)
+        if current is not None and current == total and not note:
+            return False
+
+        if self.policy == "sum":
+            target = total
+        elif self.policy == "min":
+            target = total if current is None else min(current, total)
+        else:
+            target = current if current is not None else total
+        code = (product.findtext("ProductCode") or "").strip()
+        self.mismatches.append(Mismatch(code, -1 if current is None else current, total, target, note))
+
+        if self.policy == "source" or str(target) == (product_elem.text or "").strip():
+            return False
+        product_elem.text = str(target)
+        self.updated += 1
+        return True
+
+    def write_report(self, path: str) -> None:
+        with open(path, "w", newline="", encoding="utf-8") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(["ProductCode", "ProductStock", "VariantTotal", "Written", "Note"])
+            writer.writerows(self.mismatches)
+
+
+def reconcile_feed(input_file: str, output_file: str, policy: str = "sum") -> ReconcileStage:
+    stage = ReconcileStage(policy)
+    reader = FeedReader(input_file)
+    with ProductWriter.like(output_file, reader) as writer:
+        for product in reader:
+            stage.apply(product)
+            writer.write(product)
+    return stage
+
+
+def main():
+    input_file = sys.argv[1] if len(sys.argv) >= 2 else FINAL_XML
+    output_file = sys.argv[2] if len(sys.argv) >= 3 else input_file
+    policy = sys.argv[3] if len(sys.argv) >= 4 else "sum"
+    report = sys.argv[4] if len(sys.argv) >= 5 else None
+
+    stage = reconcile_feed(input_file, output_file, policy)
+    print(f"📦 {stage.products} ürün | ⚠️ {len(stage.mismatches)} uyumsuz | ✏️ {stage.updated} güncellendi (politika: {policy})")
+    for m in stage.mismatches[:5]:
+        print(f"  • {m.code}: ürün {m.product_stock}, varyant toplamı {m.variant_total} → {m.written} {m.note}")
+    if report:
+        stage.write_report(report)
+        print(f"📝 Rapor: {report}")
+
+
+if __name__ == "__main__":
+    main()
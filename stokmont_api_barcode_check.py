@@ -7,13 +7,15 @@ NOT: Bu script Stokmont API dokümantasyonu olmadan yazılmıştır.
 Gerçek API endpoint'leri ve authentication bilgileri gerekecektir.
 """
 
-import requests
 import json
 import time
 from typing import List, Dict
 
 class StokmontAPI:
     def __init__(self, api_key: str, base_url: str = "https://api.stokmont.com"):
+        # requests sadece API gerçekten kullanıldığında yüklenir (CLI açılışı hızlı kalsın)
+        import requests
+
         self.api_key = api_key
         self.base_url = base_url
         self.session = requests.Session()
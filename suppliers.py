@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+
+"""
+Çoklu tedarikçi girişi: biçim adaptörleri, paralel okuma ve birleştirme.
+
+Araç zinciri tek bir Wagoon <Products><Product> feed'ini varsayıyor. Yeni
+tedarikçiler CSV ve JSON gönderiyor. Her biçim için bir adaptör, dosyayı
+ortak kayıt modeline (feed_records.ProductRecord) çevirir:
+
+  xml   Wagoon biçiminde feed (feed_records.iter_records)
+  csv   her satır bir varyant; aynı ürün koduna sahip satırlar tek ürün olur
+  json  ürün listesi (ya da {"products": [...]}) veya JSON Lines
+
+Tedarikçiler ayrı işlemlerde (ProcessPoolExecutor) paralel okunur, ürünler
+ProductCode ile birleştirilir ve sonuç Wagoon biçiminde tek bir feed olarak
+yazılır; mevcut dönüşümler bu feed üzerinde bir kez çalışır.
+
+Tedarikçi dosyası (JSON):
+
+  {
+    "suppliers": [
+      {"name": "wagoon", "format": "xml", "path": "wagoon_source.xml", "priority": 10},
+      {"name": "acme", "format": "csv", "path": "acme.csv", "priority": 5,
+       "code_prefix": "AC-",
+       "columns": {"sku": "ProductCode", "title": "ProductName", "price": "ProductPrice"},
+       "variant_columns": {"size": "VariantValue", "qty": "VariantStock"},
+       "variant_defaults": {"VariantName": "Numara"}}
+    ],
+    "merge": {"StockQuantity": "sum", "VariantStock": "sum", "BuyingPrice": "min"}
+  }
+
+Birleştirme kuralları alan başına: priority (varsayılan; en yüksek öncelikli
+dolu değer, farklı değerler çakışma olarak raporlanır), sum, min, max.
+Varyantlar (VariantValue ya da sıra) anahtarıyla birleştirilir.
+
+Kullanım: python suppliers.py tedarikçiler.json [çıktı.xml]
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal, DecimalException
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from feed_canonical import parse_decimal
+from feed_records import ProductRecord, iter_records
+from feed_stream import ProductWriter
+
+SOURCE_PRETTY_XML = "wagoon_source_pretty.xml"
+ROOT_ATTRIB = {"Version": "1.00"}
+MERGE_RULES = ("priority", "sum", "min", "max")
+
+
+class Adapter:
+    """Tedarikçi dosyasını ProductRecord akışına çeviren temel sınıf."""
+
+    format = ""
+
+    def __init__(self, spec: Dict):
+        self.spec = spec
+        self.name = spec.get("name") or os.path.basename(spec["path"])
+        self.path = spec["path"]
+        self.priority = spec.get("priority", 0)
+        self.code_prefix = spec.get("code_prefix", "")
+
+    def records(self) -> Iterator[ProductRecord]:
+        raise NotImplementedError
+
+    def read(self) -> Iterator[ProductRecord]:
+        for record in self.records():
+            code = record.fields.get("ProductCode", "").strip()
+            if not code:
+                continue
+            if self.code_prefix and not code.startswith(self.code_prefix):
+                record.fields["ProductCode"] = self.code_prefix + code
+            yield record
+
+
+class XmlAdapter(Adapter):
+    format = "xml"
+
+    def records(self) -> Iterator[ProductRecord]:
+        return iter_records(self.path, product_tag=self.spec.get("product_tag", "Product"))
+
+
+class _MappedAdapter(Adapter):
+    """Düz satır/nesne alanlarını eşleme tablolarıyla kayda çevirenler için ortak kısım."""
+
+    def __init__(self, spec: Dict):
+        super().__init__(spec)
+        self.columns: Dict[str, str] = spec.get("columns", {})
+        self.variant_columns: Dict[str, str] = spec.get("variant_columns", {})
+        self.variant_defaults: Dict[str, str] = spec.get("variant_defaults", {})
+        self.picture_columns: List[str] = spec.get("picture_columns", [])
+
+    def _build(self, rows: Iterable[Dict[str, object]]) -> Iterator[ProductRecord]:
+        """Aynı ürün koduna sahip satırlar tek kayıtta toplanır (dosya sırası korunur)."""
+        code_column = next((c for c, f in self.columns.items() if f == "ProductCode"), "ProductCode")
+        records: Dict[str, ProductRecord] = {}
+        for row in rows:
+            code = str(row.get(code_column) or "").strip()
+            if not code:
+                continue
+            record = records.get(code)
+            if record is None:
+                fields = {f: str(row.get(c) or "").strip() for c, f in self.columns.items()}
+                pictures = [str(row[c]).strip() for c in self.picture_columns if row.get(c)]
+                record = records[code] = ProductRecord(fields, [], pictures)
+            if self.variant_columns:
+                variant = dict(self.variant_defaults)
+                variant.update((f, str(row.get(c) or "").strip()) for c, f in self.variant_columns.items())
+                if any(variant.values()):
+                    record.variants.append(variant)
+        return iter(records.values())
+
+
+class CsvAdapter(_MappedAdapter):
+    format = "csv"
+
+    def records(self) -> Iterator[ProductRecord]:
+        with open(self.path, newline="", encoding=self.spec.get("encoding", "utf-8-sig")) as fh:
+            rows = csv.DictReader(fh, delimiter=self.spec.get("delimiter", ","))
+            yield from self._build(rows)
+
+
+class JsonAdapter(_MappedAdapter):
+    """Ürün listesi; ürünlerin varyantları variants_key altında olabilir ya da düz satırlar."""
+
+    format = "json"
+
+    def _rows(self) -> Iterator[Dict]:
+        variants_key = self.spec.get("variants_key")
+        with open(self.path, encoding="utf-8") as fh:
+            if self.path.endswith(".jsonl"):
+                items: Iterable = (json.loads(line) for line in fh if line.strip())
+            else:
+                data = json.load(fh)
+                items = data.get(self.spec.get("products_key", "products"), []) if isinstance(data, dict) else data
+            for item in items:
+                nested = item.get(variants_key) if variants_key else None
+                if not nested:
+                    yield item
+                    continue
+                for variant in nested:
+                    yield {**item, **variant}
+
+    def records(self) -> Iterator[ProductRecord]:
+        return self._build(self._rows())
+
+
+ADAPTERS = {cls.format: cls for cls in (XmlAdapter, CsvAdapter, JsonAdapter)}
+
+
+def make_adapter(spec: Dict) -> Adapter:
+    fmt = spec.get("format") or os.path.splitext(spec["path"])[1].lstrip(".").lower()
+    if fmt == "jsonl":
+        fmt = "json"
+    if fmt not in ADAPTERS:
+        raise ValueError(f"Bilinmeyen tedarikçi biçimi: {fmt} ({', '.join(ADAPTERS)})")
+    return ADAPTERS[fmt](spec)
+
+
+def _ingest(spec: Dict) -> Tuple[str, List[ProductRecord]]:
+    """İşçi işlemde bir tedarikçiyi okur (ProcessPoolExecutor hedefi)."""
+    adapter = make_adapter(spec)
+    return adapter.name, list(adapter.read())
+
+
+def ingest_parallel(specs: List[Dict], workers: Optional[int] = None) -> List[Tuple[str, List[ProductRecord]]]:
+    """Tedarikçileri ayrı işlemlerde okur; sonuçlar spec sırasıyla döner."""
+    workers = workers or min(len(specs), os.cpu_count() or 1)
+    if workers <= 1 or len(specs) == 1:
+        return [_ingest(spec) for spec in specs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_ingest, specs))
+
+
+class Conflict(NamedTuple):
+    code: str
+    field: str
+    chosen: str
+    chosen_from: str
+    other: str
+    other_from: str
+
+
+def _format(number: Decimal, like: str) -> str:
+    """Toplamı, birleştirilen ilk değerin ondalık hane sayısıyla yazar (1.029,00 -> 2 hane)."""
+    sample = parse_decimal(like.strip())
+    decimals = max(0, -sample.as_tuple().exponent) if sample is not None else 2
+    try:
+        return format(number.quantize(Decimal(1).scaleb(-decimals)), "f")
+    except DecimalException:
+        return like
+
+
+class Merger:
+    """Öncelik sırasına göre ürün ve varyant birleştirici."""
+
+    def __init__(self, rules: Optional[Dict[str, str]] = None):
+        self.rules = rules or {}
+        for field, rule in self.rules.items():
+            if rule not in MERGE_RULES:
+                raise ValueError(f"Bilinmeyen birleştirme kuralı: {field}={rule} ({', '.join(MERGE_RULES)})")
+        self.conflicts: List[Conflict] = []
+
+    def _merge_fields(self, code: str, sources: List[Tuple[str, Dict[str, str]]]) -> Dict[str, str]:
+        merged: Dict[str, str] = {}
+        origin: Dict[str, str] = {}
+        numbers: Dict[str, List[Decimal]] = {}
+        for supplier, fields in sources:
+            for field, value in fields.items():
+                rule = self.rules.get(field, "priority")
+                if rule != "priority":
+                    # parse_decimal: 1.029,00 / 1,029.00 biçimleri; sonsuz/NaN değerler None
+                    number = parse_decimal(value.strip()) if value else None
+                    if number is not None:
+                        numbers.setdefault(field, []).append(number)
+                    merged.setdefault(field, value)
+                    continue
+                if not merged.get(field):
+                    if value or field not in merged:
+                        merged[field] = value
+                        origin[field] = supplier
+                elif value and value != merged[field] and field != "ProductCode":
+                    self.conflicts.append(Conflict(code, field, merged[field], origin[field], value, supplier))
+        for field, values in numbers.items():
+            rule = self.rules[field]
+            total = sum(values) if rule == "sum" else min(values) if rule == "min" else max(values)
+            merged[field] = _format(total, merged[field])
+        return merged
+
+    def merge(self, code: str, candidates: List[Tuple[str, ProductRecord]]) -> ProductRecord:
+        """candidates öncelik sırasında (yüksekten düşüğe) verilir."""
+        if len(candidates) == 1:
+            return candidates[0][1]
+        fields = self._merge_fields(code, [(s, r.fields) for s, r in candidates])
+        grouped: Dict[str, List[Tuple[str, Dict[str, str]]]] = {}
+        for supplier, record in candidates:
+            for n, variant in enumerate(record.variants, 1):
+                key = variant.get("VariantValue") or variant.get("VariantValue1") or str(n)
+                grouped.setdefault(key, []).append((supplier, variant))
+        variants = [self._merge_fields(f"{code}/{key}", sources) for key, sources in grouped.items()]
+        pictures = list(dict.fromkeys(url for _, r in candidates for url in r.pictures))
+        return ProductRecord(fields, variants, pictures)
+
+
+def merge_suppliers(batches: List[Tuple[str, List[ProductRecord]]], priorities: Dict[str, int],
+                    merger: Merger) -> Iterator[ProductRecord]:
+    """Ürünleri koduna göre birleştirir; sıra, en öncelikli tedarikçiden başlayarak ilk görülme sırasıdır."""
+    ordered = sorted(batches, key=lambda batch: -priorities.get(batch[0], 0))
+    candidates: Dict[str, List[Tuple[str, ProductRecord]]] = {}
+    for supplier, records in ordered:
+        for record in records:
+            candidates.setdefault(record.code, []).append((supplier, record))
+    for code, found in candidates.items():
+        yield merger.merge(code, found)
+
+
+def load_config(path: str) -> Dict:
+    with open(path, encoding="utf-8") as fh:
+        config = json.load(fh)
+    base = os.path.dirname(os.path.abspath(path))
+    for spec in config.get("suppliers", []):
+        if not os.path.isabs(spec["path"]):
+            spec["path"] = os.path.join(base, spec["path"])
+    return config
+
+
+def merged_records(config: Dict, workers: Optional[int] = None) -> Tuple[Iterator[ProductRecord], Merger, Dict[str, int]]:
+    """(birleşik kayıtlar, birleştirici, tedarikçi başına ürün sayısı)."""
+    specs = config.get("suppliers", [])
+    if not specs:
+        raise ValueError("Tedarikçi listesi boş")
+    batches = ingest_parallel(specs, workers)
+    priorities = {make_adapter(spec).name: spec.get("priority", 0) for spec in specs}
+    merger = Merger(config.get("merge"))
+    counts = {name: len(records) for name, records in batches}
+    return merge_suppliers(batches, priorities, merger), merger, counts
+
+
+def write_merged(config: Dict, output_file: str, workers: Optional[int] = None):
+    records, merger, counts = merged_records(config, workers)
+    with ProductWriter(output_file, "Products", ROOT_ATTRIB) as writer:
+        for record in records:
+            writer.write(record.to_element())
+    return writer.count, merger, counts
+
+
+def print_summary(count: int, merger: Merger, counts: Dict[str, int]) -> None:
+    print(f"🔀 {count} ürün birleştirildi ({', '.join(f'{n}: {c}' for n, c in counts.items())})")
+    if merger.conflicts:
+        print(f"⚠️  {len(merger.conflicts)} çakışma (öncelikli değer kullanıldı):")
+        for c in merger.conflicts[:10]:
+            print(f"  • {c.code} {c.field}: {c.chosen!r} ({c.chosen_from}) ≠ {c.other!r} ({c.other_from})")
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Kullanım: python suppliers.py tedarikçiler.json [çıktı.xml]")
+        sys.exit(2)
+    output_file = sys.argv[2] if len(sys.argv) >= 3 else SOURCE_PRETTY_XML
+    count, merger, counts = write_merged(load_config(sys.argv[1]), output_file)
+    print_summary(count, merger, counts)
+    print(f"💾 Dosya kaydedildi: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+from apply_buybox_to_stokmont import BuyboxProtectionTransformer
+from description_parser import parse_description
+
+SOURCE_DESCRIPTION = (
+    "<p>Marka: Wagoon<br />Kategori: Erkek Ayakkabı<br />Ürün Malzemesi : %100 Vegan"
+    "<br />İç Astar : %100 Pamuk<br />Topuk Boyu : 3 Cm</p>"
+)
+EXPECTED = {
+    "Marka": "Wagoon",
+    "Kategori": "Erkek Ayakkabı",
+    "Malzeme": "%100 Vegan",
+    "İç Astar": "%100 Pamuk",
+    "Topuk Boyu": "3 Cm",
+}
+
+
+def test_source_description():
+    assert dict(parse_description(SOURCE_DESCRIPTION).attributes) == EXPECTED
+
+
+def test_enhanced_final_description():
+    # Escape edilmiş gövde + düz <p style="display:none;"> imzası bir arada
+    enhanced = BuyboxProtectionTransformer().enhance_description(SOURCE_DESCRIPTION, "SD-500-BEYAZ")
+    assert "&lt;p&gt;" in enhanced and "<p style=" in enhanced
+    parsed = parse_description(enhanced)
+    assert dict(parsed.attributes) == EXPECTED
+    assert "SDSTEP-" in parsed.lines[-1]
+
+
+def test_escaped_cdata_description():
+    escaped = SOURCE_DESCRIPTION.replace("<", "&lt;").replace(">", "&gt;")
+    assert dict(parse_description(f"<![CDATA[{escaped}]]>").attributes) == EXPECTED
+
+
+def test_breaks_inside_text_data():
+    parsed = parse_description("<div>Marka: Wagoon&#60;br /&#62;Kategori: Terlik&#60;/p&#62;</div>")
+    assert parsed.attributes["Marka"] == "Wagoon"
+    assert parsed.attributes["Kategori"] == "Terlik"
@@ -0,0 +1,107 @@
+import asyncio
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from image_check import ImageChecker, check_images
+
+IMAGE = b"\xff\xd8\xff\xe0" + b"0" * 1020
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    ranged_gets = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, headers=(), body=b""):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        if self.path == "/ok.jpg":
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Length", str(len(IMAGE)))
+            self.end_headers()
+        elif self.path == "/no-head.jpg":
+            self._reply(405)
+        elif self.path == "/moved.jpg":
+            self._reply(301, [("Location", "/ok.jpg")])
+        else:
+            self._reply(404)
+
+    def do_GET(self):
+        if self.path == "/no-head.jpg" and self.headers.get("Range") == "bytes=0-0":
+            type(self).ranged_gets += 1
+            self._reply(206, [("Content-Type", "image/png"), ("Content-Range", f"bytes 0-0/{len(IMAGE)}")], IMAGE[:1])
+        else:
+            self._reply(404)
+
+
+@pytest.fixture(scope="module")
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _check(*urls):
+    results = asyncio.run(ImageChecker(timeout=5).check_many(list(urls)))
+    return {status.url: status for status in results}
+
+
+def test_head_ok(base_url):
+    status = _check(f"{base_url}/ok.jpg")[f"{base_url}/ok.jpg"]
+    assert status.ok
+    assert (status.status, status.content_type, status.size) == (200, "image/jpeg", len(IMAGE))
+
+
+def test_head_not_allowed_falls_back_to_ranged_get(base_url):
+    before = _Handler.ranged_gets
+    status = _check(f"{base_url}/no-head.jpg")[f"{base_url}/no-head.jpg"]
+    assert status.ok
+    assert (status.status, status.content_type, status.size) == (206, "image/png", len(IMAGE))
+    assert _Handler.ranged_gets == before + 1
+
+
+def test_redirect_is_followed(base_url):
+    status = _check(f"{base_url}/moved.jpg")[f"{base_url}/moved.jpg"]
+    assert status.ok and status.status == 200
+
+
+def test_not_found(base_url):
+    status = _check(f"{base_url}/missing.jpg")[f"{base_url}/missing.jpg"]
+    assert not status.ok
+    assert status.status == 404 and not status.error
+
+
+def test_connection_refused():
+    url = f"http://127.0.0.1:{_closed_port()}/ok.jpg"
+    status = _check(url)[url]
+    assert not status.ok
+    assert status.status == 0 and status.error
+
+
+def test_all_at_once_without_cache(base_url):
+    urls = [f"{base_url}/ok.jpg", f"{base_url}/no-head.jpg", f"{base_url}/moved.jpg", f"{base_url}/missing.jpg"]
+    results = check_images(urls, cache_path=None)
+    assert [results[url].ok for url in urls] == [True, True, True, False]
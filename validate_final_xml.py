@@ -1,11 +1,33 @@
+import os
 import xml.etree.ElementTree as ET
 import re
 
+from barcode_index import INDEX_DB, BarcodeIndex, collect_barcodes, is_valid_gtin
+from feed_schema import Schema, decimal_value
+
 def is_ean13(barcode):
-    return bool(re.fullmatch(r"\d{13}", barcode))
+    # 13 hane + GS1 kontrol hanesi
+    return is_valid_gtin(barcode, lengths=(13,))
+
+def is_not_positive(price):
+    # Eksik ya da sayı olmayan fiyat (ör. "abc") şema kontrolünde raporlanır
+    value = decimal_value(price)
+    return value is not None and value <= 0
+
+FINAL_XML = "stokmont_final_sdstep_titles_buyingprice_barcode_pretty.xml"
+
+REQUIRED_FIELDS = ["ProductCode","ProductName","Quantity","Price","Currency","TaxRate","Barcode","Category","Description","Image1","Brand"]
+
+VALIDATION_SCHEMA = Schema({
+    "required": {**{tag: "text" for tag in REQUIRED_FIELDS}, "Price": "decimal"},
+    "groups": {"Variants/Variant": {"min": 1, "required": {"VariantPrice": "decimal"}}},
+})
 
-def main():
-    path = "stokmont_final_sdstep_titles_buyingprice_barcode_pretty.xml"
+def validate(path=FINAL_XML, check_images=False):
+    """Feed'i kontrol eder; (hatalar, ürün sayısı, varyant sayısı, barkod sayısı) döner
+
+    check_images=True ise resim URL'leri ağ üzerinden de kontrol edilir (image_check).
+    """
     tree = ET.parse(path)
     root = tree.getroot()
     errors = []
@@ -14,22 +36,21 @@ def main():
     barcodes = set()
     for product in root.findall(".//Product"):
         product_count += 1
-        # 1. Zorunlu alanlar (text içeriği olan)
-        for tag in ["ProductCode","ProductName","Quantity","Price","Currency","TaxRate","Barcode","Category","Description","Image1","Brand"]:
-            if product.find(tag) is None or not (product.find(tag).text or '').strip():
-                errors.append(f"Eksik alan: <{tag}> ürün: {ET.tostring(product, encoding='unicode')[:100]}")
-        
-        # Variants element varlık kontrolü (text değil, child element kontrolü)
-        variants_elem = product.find("Variants")
-        if variants_elem is None:
-            errors.append(f"Variants elementi yok: ürün: {pc}")
-        # 2. Kodlar SD ile başlıyor mu?
         pc = product.findtext("ProductCode","")
+        # 1. Zorunlu alanlar, sayı biçimleri ve varyant varlığı (feed_schema; bozuk değer hata olarak raporlanır)
+        for field, detail in VALIDATION_SCHEMA.problems(product):
+            if detail in ("yok", "boş"):
+                errors.append(f"Eksik alan: <{field}> ürün: {pc}")
+            elif field == "Variants/Variant":
+                errors.append(f"Varyant yok: ürün: {pc}")
+            else:
+                errors.append(f"<{field}> {detail} - ürün: {pc}")
+        # 2. Kodlar SD ile başlıyor mu?
         if not pc.startswith("SD-"):
             errors.append(f"ProductCode SD ile başlamıyor: {pc}")
         # 3. Fiyat BuyingPrice'dan mı? (kontrol: Price ile VariantPrice aynı ve 0'dan büyük)
         price = product.findtext("Price","")
-        if not price or float(price.replace(",",".") or 0) <= 0:
+        if is_not_positive(price):
             errors.append(f"Price hatalı: {price} - ürün: {pc}")
         # 4. Barkodlar
         barcode = product.findtext("Barcode","")
@@ -47,17 +68,14 @@ def main():
             img = product.findtext(f"Image{i}","")
             if img and not re.search(r"[?&]sd=", img):
                 errors.append(f"Image{i} unique parametre yok: {img} - ürün: {pc}")
-        # 7. Varyantlar
-        variants = product.find("Variants")
-        if variants is None or not list(variants):
-            errors.append(f"Varyant yok: ürün: {pc}")
-        for variant in variants.findall("Variant"):
+        # 7. Varyantlar (Variants yoksa 1. adımda raporlandı)
+        for variant in product.findall("Variants/Variant"):
             variant_count += 1
             vcode = variant.findtext("VariantCode","")
             if not vcode.startswith("SD-"):
                 errors.append(f"VariantCode SD ile başlamıyor: {vcode}")
             vprice = variant.findtext("VariantPrice","")
-            if not vprice or float(vprice.replace(",",".") or 0) <= 0:
+            if is_not_positive(vprice):
                 errors.append(f"VariantPrice hatalı: {vprice} - ürün: {pc}")
             vbarcode = variant.findtext("Barcode","")
             if not is_ean13(vbarcode):
@@ -65,13 +83,29 @@ def main():
             if vbarcode in barcodes:
                 errors.append(f"Varyant barkod tekrar ediyor: {vbarcode}")
             barcodes.add(vbarcode)
-    print(f"Toplam ürün: {product_count}, toplam varyant: {variant_count}, toplam barkod: {len(barcodes)}")
+    # 8. Önceki snapshot'larda başka ürüne verilmiş barkodlar
+    if os.path.exists(INDEX_DB):
+        with BarcodeIndex(INDEX_DB) as index:
+            conflicts = index.check(collect_barcodes(root.findall(".//Product")))
+        for code, owner, old_owner, snapshot in conflicts["history"]:
+            errors.append(f"Barkod daha önce başka ürüne verilmiş: {code} - {owner} (önceki: {old_owner}, snapshot {snapshot})")
+    # 9. Resim URL'leri gerçekten açılıyor mu?
+    if check_images:
+        from image_check import check_images as check_image_urls, collect_image_urls, image_errors
+        pairs = collect_image_urls(root.findall(".//Product"))
+        errors.extend(image_errors(pairs, check_image_urls(url for url, _ in pairs)))
+    return errors, product_count, variant_count, len(barcodes)
+
+def main(path=FINAL_XML, check_images=False):
+    errors, product_count, variant_count, barcode_count = validate(path, check_images)
+    print(f"Toplam ürün: {product_count}, toplam varyant: {variant_count}, toplam barkod: {barcode_count}")
     if errors:
         print(f"HATA! {len(errors)} problem bulundu:")
         for e in errors:
             print(e)
     else:
         print("Tüm kontroller geçti. XML pazar yerleri ve Stokmont için %100 UYUMLU!")
+    return not errors
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+
+"""
+Tekrar eden feed değerleri için değer havuzları (interning) ve sözlük
+kodlamalı (dictionary encoded) sütun tabloları.
+
+1509 varyantta VariantName hep "Numara", numaralar "30".."45", Tax "10",
+CategoryPath/ManufacturerName neredeyse sabit; ama ElementTree her tekrar için
+ayrı bir str tutuyor. Milyon varyantlık bir feed'de bu, belleğin önemli bir
+kısmı demek.
+
+  ValuePool    alan başına değer -> küçük tamsayı kodu; aynı değer için her
+               zaman aynı (paylaşılan) str nesnesini döndürür
+  FeedPools    düşük kardinaliteli alanların havuzları; feed_records ayrıştırma
+               sırasında bunları kullanır
+  ColumnTable  sütun bazlı tablo; metin sütunları sözlük + array kodları,
+               sayısal sütunlar array olarak tutulur ve ikili dosyaya yazılır
+
+Renk/kategori eşleme gibi eşitlik ağırlıklı aşamalar ValuePool.translate ile
+her farklı değer için fonksiyonu bir kez çalıştırır.
+
+Kullanım: python value_pools.py [feed.xml] [çıktı.col]
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import sys
+from array import array
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from feed_records import ProductRecord, iter_records
+
+SOURCE_XML = "wagoon_source_pretty.xml"
+
+# Havuza alınan düşük kardinaliteli alanlar (kaynak + Stokmont formatı)
+PRODUCT_POOL_FIELDS = (
+    "Color", "Tax", "TaxRate", "Currency", "ProductStatus", "Brand",
+    "CategoryId", "CategoryName", "CategoryPath", "Category", "MainCategory", "SubCategory",
+    "ManufacturerId", "ManufacturerName", "Volume", "Desi",
+)
+VARIANT_POOL_FIELDS = (
+    "VariantName", "VariantValue",
+    "VariantName1", "VariantValue1", "VariantName2", "VariantValue2",
+)
+
+COLUMN_MAGIC = b"WGCOL1\n"
+
+
+class ValuePool:
+    """Değer <-> kod sözlüğü."""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+        for value in values:
+            self.encode(value)
+
+    def encode(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def intern(self, value: str) -> str:
+        """Havuzdaki paylaşılan str nesnesini döndürür."""
+        return self.values[self.encode(value)]
+
+    def decode(self, code: int) -> str:
+        return self.values[code]
+
+    def translate(self, fn: Callable[[str], str]) -> List[str]:
+        """fn'i her farklı değer için bir kez uygular; sonuç koda göre indekslenir."""
+        return [fn(value) for value in self.values]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __contains__(self, value: str) -> bool:
+        return value in self._codes
+
+
+class FeedPools:
+    """Alan adı -> ValuePool."""
+
+    def __init__(self, product_fields: Sequence[str] = PRODUCT_POOL_FIELDS,
+                 variant_fields: Sequence[str] = VARIANT_POOL_FIELDS):
+        self.product: Dict[str, ValuePool] = {f: ValuePool() for f in product_fields}
+        self.variant: Dict[str, ValuePool] = {f: ValuePool() for f in variant_fields}
+
+    def intern_product(self, fields: Dict[str, str]) -> None:
+        for name, pool in self.product.items():
+            value = fields.get(name)
+            if value is not None:
+                fields[name] = pool.intern(value)
+
+    def intern_variant(self, fields: Dict[str, str]) -> None:
+        for name, pool in self.variant.items():
+            value = fields.get(name)
+            if value is not None:
+                fields[name] = pool.intern(value)
+
+    def pool(self, field: str) -> ValuePool:
+        pool = self.product.get(field)
+        # boş ValuePool da yanlış (falsy) sayılır; sadece alan yoksa varyanta bakılır
+        return pool if pool is not None else self.variant[field]
+
+    def summary(self) -> Dict[str, int]:
+        sizes = {name: len(pool) for name, pool in self.product.items() if len(pool)}
+        sizes.update({name: len(pool) for name, pool in self.variant.items() if len(pool)})
+        return sizes
+
+
+def _typecode(size: int) -> str:
+    if size < 1 << 8:
+        return "B"
+    if size < 1 << 16:
+        return "H"
+    return "I"
+
+
+# array("q") sınırları
+_INT_MIN, _INT_MAX = -(1 << 63), (1 << 63) - 1
+
+
+def _to_int(value: Optional[str]) -> Optional[int]:
+    """Sayısal sütun değeri; boş değer 0, okunamayan/sonsuz/aralık dışı değer None."""
+    value = (value or "").strip()
+    if not value:
+        return 0
+    try:
+        number = Decimal(value.replace(",", "."))
+    except InvalidOperation:
+        return None
+    if not number.is_finite() or number.adjusted() > 18:
+        return None
+    number = int(number)
+    return number if _INT_MIN <= number <= _INT_MAX else None
+
+
+class ColumnTable:
+    """Sözlük kodlamalı sütun tablosu.
+
+    Metin sütunları `dictionaries[ad]` + `columns[ad]` (kod dizisi), sayısal
+    sütunlar sadece `columns[ad]` ile tutulur. Sayıya çevrilemeyen değerler
+    0 yazılır ve `invalid[ad]` içinde sayılır.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.columns: Dict[str, array] = {}
+        self.dictionaries: Dict[str, List[str]] = {}
+        self.invalid: Dict[str, int] = {}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, str]], text_fields: Sequence[str],
+                  int_fields: Sequence[str] = (), pools: Optional[Dict[str, ValuePool]] = None) -> "ColumnTable":
+        pools = dict(pools or {})
+        # boş ValuePool da yanlış (falsy) sayılır; sadece havuz yoksa yenisi açılır
+        text_pools = {f: pools[f] if pools.get(f) is not None else ValuePool() for f in text_fields}
+        codes: Dict[str, List[int]] = {f: [] for f in text_fields}
+        ints: Dict[str, array] = {f: array("q") for f in int_fields}
+        table = cls()
+        for row in rows:
+            for field, pool in text_pools.items():
+                codes[field].append(pool.encode(row.get(field, "")))
+            for field, column in ints.items():
+                number = _to_int(row.get(field))
+                if number is None:
+                    table.invalid[field] = table.invalid.get(field, 0) + 1
+                    number = 0
+                column.append(number)
+            table.rows += 1
+        for field, pool in text_pools.items():
+            table.dictionaries[field] = list(pool.values)
+            table.columns[field] = array(_typecode(len(pool)), codes[field])
+        table.columns.update(ints)
+        return table
+
+    def decoded(self, field: str) -> List[str]:
+        values = self.dictionaries[field]
+        return [values[code] for code in self.columns[field]]
+
+    def save(self, path: str) -> None:
+        names = list(self.columns)
+        header = {
+            "rows": self.rows,
+            "columns": [
+                {"name": n, "typecode": self.columns[n].typecode, "dictionary": self.dictionaries.get(n)}
+                for n in names
+            ],
+        }
+        blob = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        with open(path, "wb") as fh:
+            fh.write(COLUMN_MAGIC)
+            fh.write(struct.pack("<I", len(blob)))
+            fh.write(blob)
+            for name in names:
+                fh.write(self.columns[name].tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> "ColumnTable":
+        with open(path, "rb") as fh:
+            if fh.read(len(COLUMN_MAGIC)) != COLUMN_MAGIC:
+                raise ValueError(f"Sütun dosyası değil: {path}")
+            (size,) = struct.unpack("<I", fh.read(4))
+            header = json.loads(fh.read(size).decode("utf-8"))
+            table = cls()
+            table.rows = header["rows"]
+            for col in header["columns"]:
+                column = array(col["typecode"])
+                column.fromfile(fh, table.rows)
+                table.columns[col["name"]] = column
+                if col["dictionary"] is not None:
+                    table.dictionaries[col["name"]] = col["dictionary"]
+        return table
+
+
+def variant_table(records: Iterable[ProductRecord], pools: Optional[FeedPools] = None) -> ColumnTable:
+    """Varyant başına bir satır: ürün sırası, kodlar, havuzlu alanlar ve stok.
+
+    Varyantı olmayan ürünler tabloda yer almaz; `product_row` sütunu satırı
+    kaydın feed içindeki sırasına bağlar.
+    """
+    def rows():
+        for n, record in enumerate(records):
+            for variant in record.variants:
+                row = dict(variant)
+                row["ProductCode"] = record.code
+                row["product_row"] = str(n)
+                yield row
+
+    pool_map = dict(pools.variant) if pools is not None else {}
+    text_fields = ["ProductCode", "VariantCode", "VariantName", "VariantValue"]
+    return ColumnTable.from_rows(rows(), text_fields, ("product_row", "VariantStock"), pool_map)
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) >= 2 else SOURCE_XML
+    out_path = sys.argv[2] if len(sys.argv) >= 3 else None
+
+    pools = FeedPools()
+    records = list(iter_records(path, pools))
+    table = variant_table(records, pools)
+
+    print(f"📦 Ürün: {len(records)} | Varyant: {table.rows}")
+    for name, count in table.invalid.items():
+        print(f"  ⚠️ {name}: {count} sayısal olmayan değer 0 yazıldı")
+    for name, size in pools.summary().items():
+        print(f"  • {name}: {size} farklı değer")
+    if out_path:
+        table.save(out_path)
+        print(f"💾 Sütun dosyası: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
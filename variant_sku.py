@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+
+"""
+Benzersiz ve kalıcı varyant SKU'ları üretir.
+
+Wagoon kaynağında bir ürünün bütün varyantları aynı VariantCode'u taşıyor
+(WG-500-BEYAZ'ın bütün numaraları 'WG-500-BEYAZ'). fix_missing_variants ve
+fix_variants_guaranteed bunu aynen kopyaladığı için VariantCode anahtar olarak
+kullanılamıyor.
+
+Bu aşama tek geçişte her varyant için ProductCode + varyant değerlerinden
+(VariantValue ya da VariantValue1..n; yoksa VariantId) bir SKU türetir:
+
+  WG-500-BEYAZ + Numara=40  ->  WG-500-BEYAZ-40
+
+Çakışmalar bellekteki iki sözlükle (kimlik -> SKU, SKU -> kimlik) O(1)
+tespit edilir ve deterministik olarak -2, -3 ... son ekiyle çözülür. Atamalar
+SQLite indeksinde saklanır; aynı varyant sonraki çalıştırmalarda hep aynı
+SKU'yu alır.
+
+Kullanım: python variant_sku.py [girdi.xml] [çıktı.xml]
+"""
+
+from __future__ import annotations
+
+import re
+import sqlite3
+import sys
+import unicodedata
+from typing import Dict, List, Tuple
+
+from feed_stream import FeedReader, ProductWriter
+
+SOURCE_XML = "wagoon_source_pretty.xml"
+SKU_DB = "variant_skus.sqlite"
+SKU_FIELD = "VariantCode"
+
+_UNSAFE = re.compile(r"[^0-9A-Z.]+")
+
+
+def _slug(value: str) -> str:
+    """SKU parçası: ASCII'ye katlanmış büyük harf ('Gümüş' -> 'GUMUS', 'ışık' -> 'ISIK')."""
+    ascii_text = unicodedata.normalize("NFKD", value.replace("ı", "i")).encode("ascii", "ignore").decode()
+    return _UNSAFE.sub("-", ascii_text.upper()).strip("-")
+
+
+def variant_identity(product_code: str, variant, occurrence: int = 1) -> Tuple[str, str]:
+    """(kimlik, temel SKU) çifti.
+
+    Kimlik, varyantı çalıştırmalar arasında tanımlar: VariantId varsa o,
+    yoksa varyant değerleri. Aynı üründe aynı kimlik tekrar ederse
+    (VariantId'siz, aynı VariantValue) occurrence (2, 3, ...) kimliğe eklenir;
+    böylece ikinci varyant birincinin SKU'sunu almaz.
+    """
+    values: List[str] = []
+    value = variant.findtext("VariantValue")
+    if value:
+        values.append(value.strip())
+    for i in range(1, 6):
+        value = variant.findtext(f"VariantValue{i}")
+        if value:
+            values.append(value.strip())
+    variant_id = (variant.findtext("VariantId") or "").strip()
+
+    suffix = "-".join(filter(None, (_slug(v) for v in values)))
+    if not suffix:
+        suffix = f"V{variant_id}" if variant_id else "STD"
+    identity = f"{product_code}#id={variant_id}" if variant_id else f"{product_code}#{'|'.join(values)}"
+    if occurrence > 1:
+        identity = f"{identity}#{occurrence}"
+    return identity, f"{product_code}-{suffix}"
+
+
+class SkuIndex:
+    """Kalıcı kimlik <-> SKU eşlemesi."""
+
+    def __init__(self, path: str = SKU_DB):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS skus (identity TEXT PRIMARY KEY, sku TEXT NOT NULL UNIQUE) WITHOUT ROWID"
+        )
+        self.by_identity: Dict[str, str] = dict(self.conn.execute("SELECT identity, sku FROM skus"))
+        self.by_sku: Dict[str, str] = {sku: identity for identity, sku in self.by_identity.items()}
+        self._new: List[Tuple[str, str]] = []
+        self.collisions = 0
+
+    def assign(self, identity: str, base: str) -> str:
+        sku = self.by_identity.get(identity)
+        if sku is not None:
+            return sku
+        sku = base
+        n = 1
+        while sku in self.by_sku:
+            n += 1
+            sku = f"{base}-{n}"
+        if n > 1:
+            self.collisions += 1
+        self.by_identity[identity] = sku
+        self.by_sku[sku] = identity
+        self._new.append((identity, sku))
+        return sku
+
+    def commit(self) -> int:
+        """Yeni atamaları yazar; yazılan kayıt sayısını döner."""
+        with self.conn:
+            self.conn.executemany("INSERT INTO skus VALUES (?, ?)", self._new)
+        written = len(self._new)
+        self._new = []
+        return written
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class SkuStage:
+    """Ürün elementlerindeki varyantlara SKU yazan aşama."""
+
+    def __init__(self, index: SkuIndex, field: str = SKU_FIELD):
+        self.index = index
+        self.field = field
+        self.assigned = 0
+
+    def apply(self, product) -> int:
+        product_code = (product.findtext("ProductCode") or "").strip()
+        if not product_code:
+            return 0
+        changed = 0
+        seen: Dict[str, int] = {}
+        for variant in product.iterfind("Variants/Variant"):
+            identity, base = variant_identity(product_code, variant)
+            seen[identity] = seen.get(identity, 0) + 1
+            if seen[identity] > 1:
+                identity, base = variant_identity(product_code, variant, seen[identity])
+            sku = self.index.assign(identity, base)
+            elem = variant.find(self.field)
+            if elem is None:
+                elem = variant.makeelement(self.field, {})
+                variant.insert(0, elem)
+            if elem.text != sku:
+                elem.text = sku
+                changed += 1
+        self.assigned += changed
+        return changed
+
+
+def assign_skus(input_file: str, output_file: str, index_path: str = SKU_DB, field: str = SKU_FIELD) -> SkuStage:
+    index = SkuIndex(index_path)
+    stage = SkuStage(index, field)
+    reader = FeedReader(input_file)
+    try:
+        with ProductWriter.like(output_file, reader) as writer:
+            for product in reader:
+                stage.apply(product)
+                writer.write(product)
+        index.commit()
+    finally:
+        index.close()
+    return stage
+
+
+def main():
+    input_file = sys.argv[1] if len(sys.argv) >= 2 else SOURCE_XML
+    output_file = sys.argv[2] if len(sys.argv) >= 3 else input_file
+
+    stage = assign_skus(input_file, output_file)
+    print(f"🏷️  {stage.assigned} varyant koduna SKU yazıldı ({len(stage.index.by_sku)} kayıtlı SKU, {stage.index.collisions} çakışma çözüldü)")
+    print(f"💾 Dosya kaydedildi: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
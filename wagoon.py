@@ -0,0 +1,669 @@
+#!/usr/bin/env python3
+
+"""
+Wagoon/Stokmont feed araçları için tek giriş noktası.
+
+  python wagoon.py ingest wagoon_source.xml -o wagoon_source_pretty.xml --repair --schema source
+  python wagoon.py transform final.xml --rules kurallar.json --rewrite tablo.json --canonical final
+  python wagoon.py validate final.xml
+  python wagoon.py diff dun.xml bugun.xml --outbox outbox
+  python wagoon.py outbox read --consumer erp --commit
+  python wagoon.py export final.xml --columns varyantlar.col --where ProductStatus=True
+  python wagoon.py stores magazalar.json --workers 4
+  python wagoon.py pipeline --plan
+  python wagoon.py families wagoon_source_pretty.xml --hierarchy aileler.json
+  python wagoon.py categories map taksonomi.csv wagoon_source_pretty.xml
+  python wagoon.py split final.xml --max-bytes 5M --gzip
+  python wagoon.py stats final.xml --locate SD-500-BEYAZ
+  python wagoon.py snapshot save final.xml
+  python wagoon.py serve --port 8765
+  python wagoon.py search "köpekbalığı beyaz" (indeks: search --build feed.xml)
+  python wagoon.py sync barcodes final.xml
+
+Alt komut modülleri sadece o komut çalıştığında import edilir; `validate`
+HTTP ya da ağır kütüphaneleri hiç yüklemez. --non-interactive (ya da
+WAGOON_NONINTERACTIVE=1) ile hiçbir adım kullanıcıdan girdi beklemez; cron ve
+servis altında çalıştırmak için kullanılır. Çıkış kodu: 0 başarılı,
+1 doğrulama/iş hatası, 2 kullanım hatası.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+
+FINAL_XML = "stokmont_final_sdstep_titles_buyingprice_barcode_pretty.xml"
+SOURCE_XML = "wagoon_source.xml"
+SOURCE_PRETTY_XML = "wagoon_source_pretty.xml"
+
+
+def quarantine_gate(args):
+    """--schema verildiyse şemadan geçemeyen ürünleri karantinaya alan aşama."""
+    if not args.schema:
+        return None
+    from feed_schema import QuarantineStage, load_schema
+
+    return QuarantineStage(load_schema(args.schema), args.quarantine)
+
+
+def close_gate(gate) -> None:
+    if gate is None:
+        return
+    from feed_schema import print_summary
+
+    gate.close()
+    print_summary(gate)
+
+
+def cmd_ingest(args) -> int:
+    from feed_stream import FeedReader, ProductWriter
+
+    if args.suppliers:
+        from suppliers import ROOT_ATTRIB, load_config, merged_records
+
+        records, merger, counts = merged_records(load_config(args.suppliers), args.workers)
+        products = (record.to_element() for record in records)
+        writer = ProductWriter(args.output, "Products", ROOT_ATTRIB)
+    else:
+        source = args.source
+        if args.repair:
+            from feed_repair import RepairingReader
+
+            source = RepairingReader(args.source)
+        products = FeedReader(source)
+        writer = ProductWriter.like(args.output, products)
+    gate = quarantine_gate(args)
+    try:
+        with writer:
+            for product in products:
+                if gate is None or gate.accept(product):
+                    writer.write(product)
+    finally:
+        close_gate(gate)
+        if args.repair and not args.suppliers:
+            source.close()
+    print(f"📥 {writer.count} ürün okundu → {args.output}")
+    if args.suppliers:
+        from suppliers import print_summary
+
+        print_summary(writer.count, merger, counts)
+    if args.repair and not args.suppliers:
+        print(f"🩹 Onarımlar - {source.summary()}")
+    return 0
+
+
+def cmd_transform(args) -> int:
+    from feed_stream import FeedReader, ProductWriter
+
+    if args.schema and not args.output:
+        # karantinaya alınan ürünler yerinde yazılan feed'den kalıcı olarak düşerdi
+        print("--schema ile -o/--output gerekli: girdi feed'inin üzerine yazılmaz")
+        return 2
+
+    steps = []
+    if args.rules:
+        from feed_rules import compile_rules, load_rules
+
+        plan = compile_rules(load_rules(args.rules))
+        steps.append(plan.apply)
+    if args.rewrite:
+        from feed_rewrite import Rewriter, load_table
+
+        rules, fields = load_table(args.rewrite)
+        rewriter = Rewriter(rules, fields)
+        steps.append(rewriter.apply)
+    if args.skus:
+        from variant_sku import SkuIndex, SkuStage
+
+        sku_index = SkuIndex(args.sku_index)
+        sku_stage = SkuStage(sku_index)
+        steps.append(sku_stage.apply)
+    if args.reconcile:
+        from stock_reconcile import ReconcileStage
+
+        reconcile = ReconcileStage(args.reconcile)
+        steps.append(reconcile.apply)
+    if args.search_index:
+        from search_index import SearchIndex, SearchStage
+
+        search_index = SearchIndex(args.search_index)
+        steps.append(SearchStage(search_index).apply)
+    if args.category_map:
+        from category_map import CategoryMap, CategoryMapStage
+
+        category_map = CategoryMap(args.category_map)
+        category_stage = CategoryMapStage(category_map)
+        category_map.close()
+        steps.append(category_stage.apply)
+    if args.families:
+        from product_families import FamilyIndex, FamilyStage
+
+        family_stage = FamilyStage(FamilyIndex.load(args.families))
+        steps.append(family_stage.apply)
+    canonical = None
+    if args.canonical:
+        from feed_canonical import load_profile, write_sorted
+
+        canonical = load_profile(args.canonical)
+        steps.append(canonical.apply)
+    if not steps:
+        print("En az bir dönüşüm gerekli: --rules, --rewrite, --skus, --reconcile, --search-index, --category-map, --families ve/veya --canonical")
+        return 2
+
+    output = args.output or args.input
+    gate = quarantine_gate(args)
+    reader = FeedReader(args.input)
+    try:
+        with ProductWriter.like(output, reader) as writer:
+            # kanonik modda ürünler sıralanmak için tutulur ve sonda yazılır
+            buffered = [] if canonical is not None else None
+            for product in reader:
+                if gate is not None and not gate.accept(product):
+                    continue
+                for step in steps:
+                    step(product)
+                if buffered is None:
+                    writer.write(product)
+                else:
+                    buffered.append(product)
+            if buffered is not None:
+                write_sorted(writer, buffered, canonical)
+    finally:
+        close_gate(gate)
+    if args.skus:
+        sku_index.commit()
+        sku_index.close()
+    if args.search_index:
+        search_index.commit()
+
+    print(f"🔄 {writer.count} ürün dönüştürüldü → {output}")
+    if args.rules:
+        from feed_rules import print_stats
+
+        plan.stats["__products__"] = writer.count
+        print_stats(plan)
+    if args.rewrite:
+        from feed_rewrite import print_counts
+
+        print_counts(rewriter)
+    if args.skus:
+        print(f"  • SKU: {sku_stage.assigned} varyant kodu, {sku_index.collisions} çakışma çözüldü")
+    if args.reconcile:
+        print(f"  • Stok: {len(reconcile.mismatches)} uyumsuz, {reconcile.updated} güncellendi ({args.reconcile})")
+        if args.reconcile_report:
+            reconcile.write_report(args.reconcile_report)
+    if args.families:
+        print(f"  • Aile: {family_stage.assigned} ürüne ParentCode yazıldı")
+    if args.category_map:
+        print(f"  • Kategori: {category_stage.mapped} ürüne pazaryeri kategorisi yazıldı, "
+              f"{sum(category_stage.missing.values())} ürünün kategorisi eşlenmemiş "
+              f"({len(category_stage.missing)} farklı kategori)")
+    if args.search_index:
+        print(f"  • Arama: {len(search_index)} ürün indekste ({search_index.added} yeni, "
+              f"{search_index.updated} güncellendi) → {args.search_index}")
+        search_index.close()
+    return 0
+
+
+def cmd_validate(args) -> int:
+    if args.barcodes_only:
+        from barcode_index import check_feed
+
+        errors, count = check_feed(args.feed, args.index)
+        for e in errors:
+            print(e)
+        print(f"📊 {count} barkod, {len(errors)} problem")
+        return 1 if errors else 0
+
+    from validate_final_xml import main as validate_main
+
+    return 0 if validate_main(args.feed, args.images) else 1
+
+
+def cmd_diff(args) -> int:
+    if args.outbox:
+        from change_outbox import Outbox, publish_diff
+
+        counts = publish_diff(Outbox(args.outbox), args.old, args.new, where=args.where)
+        print("📮 " + (", ".join(f"{k}: {v}" for k, v in sorted(counts.items())) or "Fark yok")
+              + f" → {args.outbox}")
+        return 0
+
+    from feed_diff import diff_feeds
+
+    changes = 0
+    for change in diff_feeds(args.old, args.new, where=args.where):
+        changes += 1
+        if change.kind in ("added", "removed"):
+            print(f"{change.kind:16} {change.code}")
+        else:
+            print(f"{change.kind:16} {change.code} {change.field}: {change.old} → {change.new}")
+    print(f"📊 {changes} değişiklik")
+    return 0
+
+
+def cmd_outbox(args) -> int:
+    import json
+
+    from change_outbox import Outbox
+
+    outbox = Outbox(args.dir)
+    if args.action == "read":
+        if not args.consumer:
+            print("read için --consumer gerekli")
+            return 2
+        last = None
+        for event in outbox.consume(args.consumer, args.limit):
+            print(json.dumps(event, ensure_ascii=False))
+            last = event["offset"]
+        if args.commit and last is not None:
+            outbox.commit(args.consumer, last)
+    elif args.action == "compact":
+        result = outbox.compact()
+        print(f"🗜️ {result['segments']} segment: {result['before']} → {result['after']} olay")
+    else:
+        print(f"📮 {len(outbox.segments())} segment, sıradaki offset {outbox.next_offset}")
+        for name, position in outbox.cursors().items():
+            print(f"  • {name}: {position} (en fazla {outbox.next_offset - position} olay geride)")
+    return 0
+
+
+def cmd_export(args) -> int:
+    if not args.columns:
+        print("Bir çıktı seçin: --columns")
+        return 2
+    from feed_records import iter_records
+    from value_pools import FeedPools, variant_table
+
+    pools = FeedPools()
+    from feed_stream import PROJECTIONS
+
+    records = iter_records(args.feed, pools, fields=PROJECTIONS["variants"], where=args.where)
+    table = variant_table(records, pools)
+    table.save(args.columns)
+    print(f"💾 {table.rows} varyant satırı → {args.columns}")
+    for name, count in table.invalid.items():
+        print(f"  ⚠️ {name}: {count} sayısal olmayan değer 0 yazıldı")
+    return 0
+
+
+def cmd_stores(args) -> int:
+    import time
+
+    from multi_store import load_config, print_summary, run_stores
+
+    started = time.perf_counter()
+    results = run_stores(load_config(args.config), args.workers)
+    print_summary(results, time.perf_counter() - started)
+    return 0
+
+
+def cmd_pipeline(args) -> int:
+    import time
+
+    from pipeline_dag import load_pipeline, print_plan, print_result, run_pipeline
+
+    specs = load_pipeline(args.config)
+    if args.plan:
+        print_plan(specs)
+        return 0
+    started = time.perf_counter()
+    results = run_pipeline(specs, args.workers, args.force or (), on_result=print_result)
+    counts = {s: sum(r.status == s for r in results) for s in ("ran", "cached", "failed", "skipped")}
+    print(f"📊 {counts['ran']} çalıştı, {counts['cached']} önbellekten, {counts['failed']} hata, "
+          f"{counts['skipped']} atlandı - {time.perf_counter() - started:.2f} sn")
+    return 1 if counts["failed"] else 0
+
+
+def cmd_categories(args) -> int:
+    import time
+
+    from category_map import CategoryMap, TaxonomyIndex, distinct_categories, load_taxonomy, map_categories, print_mappings
+
+    mapping = CategoryMap(args.db)
+    try:
+        if args.action == "accept":
+            if len(args.args) < 2:
+                print('Kullanım: categories accept "KATEGORİ" DÜĞÜM_ID [YOL]')
+                return 2
+            mapping.set_manual(*args.args[:3])
+            print(f"✍️  {args.args[0]} → {args.args[1]}")
+            return 0
+        if len(args.args) < 1:
+            print("Kullanım: categories map TAKSONOMİ [FEED]")
+            return 2
+        started = time.perf_counter()
+        index = TaxonomyIndex(load_taxonomy(args.args[0]), leaf_only=not args.all_nodes)
+        categories = distinct_categories(args.args[1] if len(args.args) >= 2 else SOURCE_PRETTY_XML)
+        scored = map_categories(categories, index, mapping, remap=args.remap)
+        print(f"🗂️  {len(index.nodes)} düğüm, {len(categories)} farklı kategori, {scored} puanlandı "
+              f"({time.perf_counter() - started:.2f} sn)")
+        print_mappings(categories, mapping)
+    finally:
+        mapping.close()
+    return 0
+
+
+def cmd_families(args) -> int:
+    import json
+
+    from product_families import FamilyIndex, print_summary
+
+    index = FamilyIndex.from_feed(args.feed)
+    index.save(args.output)
+    print_summary(index, len(index.by_code))
+    print(f"💾 Aile indeksi: {args.output}")
+    if args.hierarchy:
+        with open(args.hierarchy, "w", encoding="utf-8") as fh:
+            json.dump(index.hierarchy(args.min_size), fh, ensure_ascii=False, indent=2)
+        print(f"🌳 Ebeveyn/varyant hiyerarşisi: {args.hierarchy}")
+    return 0
+
+
+def cmd_split(args) -> int:
+    from feed_parts import parse_size, split_feed
+
+    max_bytes = parse_size(args.max_bytes) if args.max_bytes else None
+    if not max_bytes and not args.max_products:
+        print("Bir sınır gerekli: --max-bytes ve/veya --max-products")
+        return 2
+    prefix = args.output or os.path.splitext(args.feed)[0]
+    manifest, changed = split_feed(args.feed, prefix, max_bytes, args.max_products, args.gzip)
+    print(f"✂️  {manifest['products']} ürün → {len(manifest['parts'])} parça, {len(changed)} değişti")
+    for name in changed:
+        print(f"  🔄 {name}")
+    return 0
+
+
+def cmd_snapshot(args) -> int:
+    from snapshot_store import SnapshotStore
+
+    store = SnapshotStore(args.store)
+    if args.action == "save":
+        manifest = store.save(args.feed, args.name)
+        print(f"📸 {manifest['name']}: {len(manifest['products'])} ürün, {manifest['new_blobs']} yeni blob")
+    elif args.action == "list":
+        for name in store.names():
+            manifest = store.load(name)
+            mark = "*" if name == store.current else " "
+            print(f"{mark} {name}  {manifest['created']}  {len(manifest['products'])} ürün")
+    elif args.action in ("rebuild", "rollback"):
+        if not args.name:
+            print("Snapshot adı gerekli: --name")
+            return 2
+        if args.action == "rollback":
+            count = store.rollback(args.name, args.feed)
+        else:
+            count = store.rebuild(args.name, args.output or f"{args.name}.xml")
+        print(f"⏪ {args.name}: {count} ürün")
+    elif args.action == "history":
+        if not args.code:
+            print("Ürün kodu gerekli: --code")
+            return 2
+        for name, created, event in store.history(args.code):
+            print(f"{created}  {name}  {event}")
+    else:
+        print(f"🧹 {store.gc()} kullanılmayan blob silindi")
+    return 0
+
+
+def cmd_stats(args) -> int:
+    import time
+
+    from feed_scan import locate, stats
+
+    started = time.perf_counter()
+    counts = stats(args.feed)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"📊 {counts.pop('bytes')} bayt ({elapsed:.1f} ms, ayrıştırmadan)")
+    for tag, count in counts.items():
+        print(f"  • {tag}: {count}")
+    for code in args.locate or []:
+        found = locate(args.feed, code)
+        print(f"📍 {code}: {'bayt %d-%d' % found if found else 'bulunamadı'}")
+    if args.parse:
+        from feed_records import ProductRecord
+        from feed_scan import parallel_map
+
+        started = time.perf_counter()
+        records = parallel_map(args.feed, ProductRecord.from_element, args.workers)
+        elapsed = time.perf_counter() - started
+        variants = sum(len(r.variants) for r in records)
+        print(f"🧩 {len(records)} ürün, {variants} varyant ayrıştırıldı ({elapsed:.2f} sn)")
+    return 0
+
+
+def cmd_serve(args) -> int:
+    from catalog_service import serve
+
+    serve(None if args.feed else args.store, args.feed, args.host, args.port, args.poll)
+    return 0
+
+
+def cmd_search(args) -> int:
+    import time
+
+    from search_index import SearchIndex, build_index
+
+    if args.build:
+        started = time.perf_counter()
+        index = build_index(args.build, args.index)
+        print(f"🔎 {len(index)} ürün indekslendi ({index.added} yeni, {index.updated} güncellendi, "
+              f"{index.unchanged} aynı) - {time.perf_counter() - started:.2f} sn")
+        index.close()
+        if not args.query:
+            return 0
+    if not args.query:
+        print("Arama metni ya da --build FEED gerekli")
+        return 2
+    index = SearchIndex(args.index)
+    started = time.perf_counter()
+    hits = index.search(" ".join(args.query), args.limit, prefix=not args.exact)
+    elapsed = (time.perf_counter() - started) * 1000
+    index.close()
+    for hit in hits:
+        print(f"{hit.score:7.2f}  {hit.code:24} {hit.name}")
+    print(f"📊 {len(hits)} sonuç ({elapsed:.1f} ms)")
+    return 0 if hits else 1
+
+
+def cmd_sync(args) -> int:
+    api_key = args.api_key or os.environ.get("STOKMONT_API_KEY")
+    if not api_key:
+        print("Stokmont API anahtarı gerekli: --api-key ya da STOKMONT_API_KEY")
+        return 2
+    from barcode_index import collect_barcodes
+    from feed_stream import iter_products
+    from stokmont_api_barcode_check import StokmontAPI
+
+    barcodes = [code for code, _ in collect_barcodes(iter_products(args.feed))]
+    conflicts = StokmontAPI(api_key, args.base_url).get_conflicting_barcodes(barcodes)
+    for code in conflicts:
+        print(f"Stokmont'ta zaten var: {code}")
+    print(f"📊 {len(barcodes)} barkod kontrol edildi, {len(conflicts)} çakışma")
+    return 1 if conflicts else 0
+
+
+def where_arg(value: str):
+    """ALAN=DEĞER biçimindeki --where argümanı."""
+    field, sep, expected = value.partition("=")
+    if not sep or not field:
+        raise argparse.ArgumentTypeError(f"ALAN=DEĞER bekleniyor: {value}")
+    return field.strip(), expected.strip()
+
+
+def add_where(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--where", type=where_arg, action="append", metavar="ALAN=DEĞER",
+                   help="Sadece bu üst seviye alan değerine sahip ürünleri oku (tekrarlanabilir; "
+                        "aynı alan için verilen değerlerden biri yeterli)")
+
+
+def add_schema(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--schema", help="Ürünleri şemaya göre kontrol et: source, final ya da şema JSON dosyası")
+    p.add_argument("--quarantine", default="quarantine.jsonl", help="Şemadan geçemeyen ürünlerin eklendiği dosya (önceki kayıtlar korunur)")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="wagoon", description="Wagoon/Stokmont feed araçları")
+    parser.add_argument("--non-interactive", action="store_true",
+                        help="Kullanıcıdan hiçbir girdi bekleme (cron/servis)")
+    sub = parser.add_subparsers(dest="command", metavar="komut")
+    sub.required = True
+
+    p = sub.add_parser("ingest", help="Kaynak feed'i oku ve normalize ederek yaz")
+    p.add_argument("source", nargs="?", default=SOURCE_XML)
+    p.add_argument("-o", "--output", default=SOURCE_PRETTY_XML)
+    p.add_argument("--repair", action="store_true",
+                   help="Çift kaçışlı CDATA, geçersiz karakter ve kaçışsız '&' hatalarını okurken onar")
+    p.add_argument("--suppliers", help="Tedarikçi listesi (JSON); kaynaklar paralel okunup koda göre birleştirilir")
+    p.add_argument("--workers", type=int, help="Tedarikçi okuyan işlem sayısı")
+    add_schema(p)
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser("transform", help="Kural ve metin değiştirme tablolarını tek geçişte uygula")
+    p.add_argument("input", nargs="?", default=FINAL_XML)
+    p.add_argument("-o", "--output", help="Varsayılan: girdinin üzerine yaz")
+    p.add_argument("--rules", help="feed_rules JSON dosyası")
+    p.add_argument("--rewrite", help="feed_rewrite JSON tablosu")
+    p.add_argument("--skus", action="store_true", help="Varyantlara benzersiz, kalıcı SKU yaz")
+    p.add_argument("--sku-index", default="variant_skus.sqlite", help="Kalıcı SKU indeksi")
+    p.add_argument("--reconcile", choices=["sum", "min", "source"], help="Ürün/varyant stok uzlaştırma politikası")
+    p.add_argument("--reconcile-report", help="Stok uyumsuzluk raporu (CSV)")
+    p.add_argument("--category-map", metavar="DB",
+                   help="Kabul edilmiş kategori eşlemelerini MarketplaceCategoryId olarak yaz")
+    p.add_argument("--families", metavar="JSON", help="Aile indeksine göre ürünlere ParentCode yaz")
+    p.add_argument("--canonical", metavar="PROFİL",
+                   help="Sabit alan sırası, ProductCode sıralaması ve normalize sayı/boşluk biçimi "
+                        "(source, final ya da profil JSON'u); son adım olarak uygulanır")
+    p.add_argument("--search-index", help="Aynı geçişte tam metin arama indeksini güncelle (SQLite)")
+    add_schema(p)
+    p.set_defaults(func=cmd_transform)
+
+    p = sub.add_parser("validate", help="Final feed'i doğrula")
+    p.add_argument("feed", nargs="?", default=FINAL_XML)
+    p.add_argument("--barcodes-only", action="store_true", help="Sadece barkod/GTIN kontrolleri")
+    p.add_argument("--index", default="barcode_index.sqlite", help="Kalıcı barkod indeksi")
+    p.add_argument("--images", action="store_true", help="Resim URL'lerinin açıldığını da kontrol et (ağ erişimi)")
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser("diff", help="İki feed arasındaki farkları listele")
+    p.add_argument("old")
+    p.add_argument("new")
+    p.add_argument("--outbox", metavar="DİZİN", help="Farkları listelemek yerine olay olarak outbox'a ekle")
+    add_where(p)
+    p.set_defaults(func=cmd_diff)
+
+    p = sub.add_parser("outbox", help="Değişiklik olaylarını oku, sıkıştır, tüketici durumları")
+    p.add_argument("action", choices=["read", "compact", "status"])
+    p.add_argument("--consumer", help="Tüketici adı (read)")
+    p.add_argument("--limit", type=int, help="En fazla bu kadar olay oku")
+    p.add_argument("--commit", action="store_true", help="Okunan son olaya kadar cursor'ı ilerlet")
+    p.add_argument("--dir", default="outbox", help="Outbox dizini")
+    p.set_defaults(func=cmd_outbox)
+
+    p = sub.add_parser("export", help="Feed'i başka biçimlerde dışa aktar")
+    p.add_argument("feed", nargs="?", default=FINAL_XML)
+    p.add_argument("--columns", help="Varyant sütun dosyası (.col)")
+    add_where(p)
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("stores", help="Kaynağı bir kez ayrıştırıp birden fazla mağaza feed'i üret")
+    p.add_argument("config", help="Mağaza profilleri (JSON)")
+    p.add_argument("--workers", type=int, help="Aynı anda çalışan mağaza işlemi sayısı")
+    p.set_defaults(func=cmd_stores)
+
+    p = sub.add_parser("pipeline", help="Script zincirini bağımlılık grafiğiyle, önbellekli çalıştır")
+    p.add_argument("config", nargs="?", help="Aşama tanımları (JSON); varsayılan: yerleşik zincir")
+    p.add_argument("--plan", action="store_true", help="Çalıştırmadan aşama sırasını ve bağımlılıkları göster")
+    p.add_argument("--force", action="append", metavar="AŞAMA", help="Bu aşamayı ve aşağısını önbelleğe bakmadan çalıştır")
+    p.add_argument("--workers", type=int, help="Aynı anda çalışan aşama sayısı")
+    p.set_defaults(func=cmd_pipeline)
+
+    p = sub.add_parser("categories", help="Tedarikçi kategorilerini pazaryeri taksonomisine eşle")
+    p.add_argument("action", choices=["map", "accept"])
+    p.add_argument("args", nargs="*", help="map: TAKSONOMİ [FEED] | accept: KATEGORİ DÜĞÜM_ID [YOL]")
+    p.add_argument("--db", default="category_map.sqlite", help="Kalıcı eşleme tablosu")
+    p.add_argument("--remap", action="store_true", help="Kayıtlı (elle girilmemiş) eşlemeleri yeniden puanla")
+    p.add_argument("--all-nodes", action="store_true", help="Sadece yaprak değil bütün düğümlere eşle")
+    p.set_defaults(func=cmd_categories)
+
+    p = sub.add_parser("families", help="Renk seçeneklerini model ailelerine grupla")
+    p.add_argument("feed", nargs="?", default=SOURCE_PRETTY_XML)
+    p.add_argument("-o", "--output", default="families.json", help="Aile indeksi (JSON)")
+    p.add_argument("--hierarchy", help="Ebeveyn/varyant hiyerarşisini bu JSON dosyasına yaz")
+    p.add_argument("--min-size", type=int, default=2, help="Hiyerarşide en az bu kadar üyeli aileler")
+    p.set_defaults(func=cmd_families)
+
+    p = sub.add_parser("split", help="Feed'i yükleme limitlerine göre parçalara böl")
+    p.add_argument("feed", nargs="?", default=FINAL_XML)
+    p.add_argument("-o", "--output", help="Parça dosyası öneki (varsayılan: feed adı)")
+    p.add_argument("--max-bytes", help="Parça başına en fazla XML boyutu (ör. 5M, 500K)")
+    p.add_argument("--max-products", type=int, help="Parça başına en fazla ürün")
+    p.add_argument("--gzip", action="store_true", help="Parçaları gzip ile sıkıştır")
+    p.set_defaults(func=cmd_split)
+
+    p = sub.add_parser("stats", help="Ürün/varyant sayıları ve ürün konumları (mmap tarama)")
+    p.add_argument("feed", nargs="?", default=FINAL_XML)
+    p.add_argument("--locate", action="append", metavar="KOD", help="Ürünün bayt aralığını göster")
+    p.add_argument("--parse", action="store_true", help="Ürünleri bayt aralıklarına göre paralel ayrıştır")
+    p.add_argument("--workers", type=int, help="Ayrıştıran işlem sayısı (varsayılan: CPU sayısı)")
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser("snapshot", help="Feed geçmişi: kaydet, listele, geri dön")
+    p.add_argument("action", choices=["save", "list", "rebuild", "rollback", "history", "gc"])
+    p.add_argument("feed", nargs="?", default=FINAL_XML)
+    p.add_argument("--name", help="Snapshot adı (save için varsayılan: zaman damgası)")
+    p.add_argument("--code", help="history için ProductCode")
+    p.add_argument("-o", "--output", help="rebuild çıktısı")
+    p.add_argument("--store", default="snapshots", help="Depo dizini")
+    p.set_defaults(func=cmd_snapshot)
+
+    p = sub.add_parser("serve", help="Katalog sorgu servisi (son snapshot bellekte)")
+    p.add_argument("--store", default="snapshots", help="Snapshot deposu (CURRENT izlenir)")
+    p.add_argument("--feed", help="Snapshot yerine bu feed dosyasını yükle ve izle")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--poll", type=float, default=5.0, help="Yeni yayın kontrol aralığı (sn)")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("search", help="Ürün adı/açıklama/özelliklerde tam metin arama")
+    p.add_argument("query", nargs="*", help="Arama metni (her kelime önek olarak aranır)")
+    p.add_argument("--build", metavar="FEED", help="Önce indeksi bu feed'den kur/güncelle")
+    p.add_argument("--index", default="search_index.sqlite")
+    p.add_argument("--limit", type=int, default=20)
+    p.add_argument("--exact", action="store_true", help="Önek araması yapma, tam kelime eşleştir")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("sync", help="Dış sistemlerle eşitleme")
+    p.add_argument("target", choices=["barcodes"])
+    p.add_argument("feed", nargs="?", default=FINAL_XML)
+    p.add_argument("--api-key")
+    p.add_argument("--base-url", default="https://api.stokmont.com")
+    p.set_defaults(func=cmd_sync)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.non_interactive:
+        os.environ["WAGOON_NONINTERACTIVE"] = "1"
+    if getattr(args, "where", None):
+        where = {}
+        for field, value in args.where:
+            where.setdefault(field, []).append(value)
+        args.where = where
+    try:
+        return args.func(args)
+    except FileNotFoundError as e:
+        print(f"Dosya bulunamadı: {e.filename}")
+        return 1
+    except SyntaxError as e:
+        # ET.ParseError ve lxml XMLSyntaxError ikisi de SyntaxError
+        print(f"XML ayrıştırılamadı: {e} (tedarikçi dosyası için: ingest --repair)")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+
+"""
+XML ayrıştırma/yazma arka ucu: lxml kuruluysa lxml, değilse ElementTree.
+
+lxml'in C seviyesindeki iterparse/tostring'i büyük feed'lerde birkaç kat daha
+hızlı; ayrıca XPath ifadeleri bir kez derlenip tekrar kullanılabiliyor
+(product.find(f'Image{i}') ya da root.findall('.//Product[Volume="2"]') gibi
+her çağrıda yeniden yorumlanan aramalar yerine). lxml zorunlu değildir; yoksa
+aynı API ElementTree ile çalışır ve çıktı aynıdır.
+
+Arka uç WAGOON_XML_BACKEND=etree|lxml ortam değişkeniyle zorlanabilir.
+"""
+
+from __future__ import annotations
+
+import html
+import os
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, List, Optional
+
+try:
+    from lxml import etree as LET
+except ImportError:  # lxml opsiyonel
+    LET = None
+
+BACKEND = os.environ.get("WAGOON_XML_BACKEND") or ("lxml" if LET is not None else "etree")
+if BACKEND == "lxml" and LET is None:
+    raise ImportError("WAGOON_XML_BACKEND=lxml ama lxml kurulu değil")
+
+USE_LXML = BACKEND == "lxml"
+
+
+def iterparse(source, events=("start", "end"), tag=None):
+    """tag sadece lxml'de kullanılabilir: diğer elementlerin olayları C seviyesinde elenir."""
+    if USE_LXML:
+        return LET.iterparse(source, events=events, tag=tag, huge_tree=True, resolve_entities=False,
+                             remove_comments=True, remove_pis=True)
+    if tag is not None:
+        raise ValueError("iterparse(tag=...) ElementTree arka ucunda desteklenmiyor")
+    return ET.iterparse(source, events=events)
+
+
+def _parser():
+    # ElementTree yorum ve işlem talimatlarını (PI) atar; lxml de atsın ki iki arka uçta
+    # ağaç (ve çıktı) aynı olsun, ürün çocukları arasında str olmayan .tag çıkmasın
+    return LET.XMLParser(huge_tree=True, resolve_entities=False, remove_comments=True, remove_pis=True)
+
+
+def parse(source):
+    """Tüm dokümanı ağaç olarak okur (ElementTree ile aynı arayüz)."""
+    if USE_LXML:
+        return LET.parse(source, _parser())
+    return ET.parse(source)
+
+
+def fromstring(data):
+    if USE_LXML:
+        return LET.fromstring(data, _parser())
+    return ET.fromstring(data)
+
+
+def _is_lxml(elem) -> bool:
+    return LET is not None and isinstance(elem, LET._Element)
+
+
+def indent(elem, space: str = "  ", level: int = 0) -> None:
+    if _is_lxml(elem):
+        LET.indent(elem, space=space, level=level)
+    else:
+        ET.indent(elem, space=space, level=level)
+
+
+# ElementTree'nin '<a />' yazdığı elementler: alt düğümü olmayan ya da metni boş olanlar
+_EMPTY_ELEMENTS = (
+    LET.XPath("descendant-or-self::*[not(*|comment()|processing-instruction()) and string()='']")
+    if LET is not None else None
+)
+
+
+def _start_tag(elem) -> str:
+    """'<Tag a="1"' (kapanışsız); öznitelikler lxml ile kaçışlanır."""
+    return LET.tostring(LET.Element(elem.tag, elem.attrib), encoding="unicode")[:-2]
+
+
+def _write_lxml(elem, path, write) -> None:
+    """Boş elementlere giden yol (path) üzerindeki elementleri kendisi yazar; yol dışındaki
+    alt ağaçlar lxml'in C serileştiricisine bırakılır."""
+    if len(elem) == 0:
+        write(_start_tag(elem) + " />")
+        return
+    write(_start_tag(elem) + ">")
+    if elem.text:
+        write(html.escape(elem.text, quote=False))
+    for child in elem:
+        if child in path:
+            _write_lxml(child, path, write)
+            if child.tail:
+                write(html.escape(child.tail, quote=False))
+        else:
+            write(LET.tostring(child, encoding="unicode"))
+    write(f"</{elem.tag}>")
+
+
+def _lxml_tostring(elem) -> str:
+    empties = _EMPTY_ELEMENTS(elem)
+    if not empties:
+        return LET.tostring(elem, encoding="unicode")
+    path = set()
+    for node in empties:
+        while node is not None and node not in path:
+            path.add(node)
+            node = None if node is elem else node.getparent()
+    parts: List[str] = []
+    _write_lxml(elem, path, parts.append)
+    if elem.tail:
+        parts.append(html.escape(elem.tail, quote=False))
+    return "".join(parts)
+
+
+def tostring(elem) -> str:
+    """Elementi unicode olarak serileştirir; boş etiketler ElementTree gibi '<a />' yazılır."""
+    if _is_lxml(elem):
+        return _lxml_tostring(elem)
+    return ET.tostring(elem, encoding="unicode")
+
+
+def write(tree_or_root, path: str) -> None:
+    """ET.indent + tree.write(xml_declaration=True) eşdeğeri."""
+    root = tree_or_root.getroot() if hasattr(tree_or_root, "getroot") else tree_or_root
+    indent(root)
+    if _is_lxml(root):
+        body = tostring(root)
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write("<?xml version='1.0' encoding='utf-8'?>\n")
+            fh.write(body)
+    else:
+        ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+
+
+class Path:
+    """Bir kez derlenen, her iki arka uçta da çalışan yol ifadesi.
+
+    lxml'de etree.XPath nesnesi kullanılır; ElementTree'de ifade findall'a
+    verilir (ElementPath derlenmiş seçicileri kendi önbelleğinde tutar).
+    Basit yollar ve [Alan="değer"] / [Alan] filtreleri her iki sözdiziminde de
+    aynıdır.
+    """
+
+    __slots__ = ("expr", "_xpath")
+
+    _cache: Dict[str, "Path"] = {}
+
+    def __init__(self, expr: str):
+        self.expr = expr
+        self._xpath: Optional[Callable] = LET.XPath(expr) if USE_LXML else None
+
+    @classmethod
+    def compile(cls, expr: str) -> "Path":
+        path = cls._cache.get(expr)
+        if path is None:
+            path = cls._cache[expr] = cls(expr)
+        return path
+
+    def all(self, elem) -> List:
+        if self._xpath is not None and _is_lxml(elem):
+            return self._xpath(elem)
+        return elem.findall(self.expr)
+
+    def first(self, elem):
+        found = self.all(elem)
+        return found[0] if found else None
+
+    def text(self, elem, default: str = "") -> str:
+        found = self.first(elem)
+        if found is None:
+            return default
+        return found.text or ""
+
+    def count(self, elem) -> int:
+        return len(self.all(elem))